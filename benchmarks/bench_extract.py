@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the extract stage.
+Writes the same generated orders file plain and with each supported
+compression codec, then extracts every copy with each CSV engine, in full
+and chunked mode. Reports throughput in decompressed MB/s and rows/s and
+checks that every copy extracts to the same frame as the plain file.
+"""
+
+import argparse
+import bz2
+import gzip
+import logging
+import lzma
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to the path so we can import the etl modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl.extract import extract_orders, extract_orders_chunks, pa, zstandard
+
+def make_orders_csv(rows: int, seed: int = 0) -> bytes:
+    """Generate a raw orders CSV with a few invalid customer ids."""
+    rng = np.random.default_rng(seed)
+    customer_ids = rng.integers(1, rows // 10 + 2, rows).astype(object)
+    days = rng.integers(0, 5000, rows)
+    orders = pd.DataFrame({
+        'id': np.arange(1, rows + 1),
+        'customer_id': customer_ids,
+        'order_date': (pd.Timestamp('2012-01-01') + pd.to_timedelta(days, unit='D')).strftime('%Y-%m-%d'),
+        'total_amount': rng.normal(50, 40, rows).round(2),
+    })
+    return orders.to_csv(index=False).encode('utf-8')
+
+def compress_zstd(data: bytes) -> bytes:
+    """Compress with zstandard, or pyarrow's zstd codec without it."""
+    if zstandard is not None:
+        return zstandard.ZstdCompressor().compress(data)
+    sink = pa.BufferOutputStream()
+    with pa.CompressedOutputStream(sink, 'zstd') as stream:
+        stream.write(data)
+    return sink.getvalue().to_pybytes()
+
+# Codecs to benchmark: (file suffix, compress function). xz uses a fast
+# preset so generating the input does not dominate the run.
+CODECS = {
+    'plain': ('.csv', lambda data: data),
+    'gzip': ('.csv.gz', gzip.compress),
+    'bz2': ('.csv.bz2', bz2.compress),
+    'xz': ('.csv.xz', lambda data: lzma.compress(data, preset=1)),
+    'zstd': ('.csv.zst', compress_zstd),
+}
+
+def time_call(func, *args, **kwargs) -> tuple:
+    """Return (result, seconds) for a single call."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def read_chunks(file_path: str, chunksize: int, engine: str) -> pd.DataFrame:
+    """Stream a file in chunks and reassemble it."""
+    return pd.concat(extract_orders_chunks(file_path, chunksize=chunksize, engine=engine))
+
+def bench_codecs(rows: int, chunksize: int, engines: list) -> bool:
+    """Extract the same orders in every codec with every engine."""
+    data = make_orders_csv(rows)
+    megabytes = len(data) / 1e6
+    ok = True
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = {}
+        for codec, (suffix, compress) in CODECS.items():
+            if codec == 'zstd' and zstandard is None and pa is None:
+                print("zstd: skipped, needs zstandard or pyarrow")
+                continue
+            paths[codec] = os.path.join(temp_dir, f"orders{suffix}")
+            with open(paths[codec], 'wb') as f:
+                f.write(compress(data))
+
+        for engine in engines:
+            expected = extract_orders(paths['plain'], engine=engine)
+            expected_chunks = read_chunks(paths['plain'], chunksize, engine)
+            print(f"Extract orders, engine={engine} ({rows:,} rows, {megabytes:.1f} MB)")
+            for codec, file_path in paths.items():
+                ratio = len(data) / os.path.getsize(file_path)
+                result, seconds = time_call(extract_orders, file_path, engine=engine)
+                chunks, chunk_seconds = time_call(read_chunks, file_path, chunksize, engine)
+                identical = expected.equals(result) and expected_chunks.equals(chunks)
+                ok = ok and identical
+                print(f"  {codec:6} ratio {ratio:4.1f}x  full {megabytes / seconds:7.1f} MB/s "
+                      f"({rows / seconds:,.0f} rows/s)  chunked {megabytes / chunk_seconds:7.1f} MB/s  "
+                      f"identical: {identical}")
+    return ok
+
+def main():
+    """Run the extract benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000, help='rows to generate')
+    parser.add_argument('--chunksize', type=int, default=100_000, help='rows per chunk in chunked mode')
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    engines = ['c'] + (['pyarrow'] if pa is not None else [])
+    print("⏱️  Extract benchmarks")
+    print("=" * 50)
+    ok = bench_codecs(args.rows, args.chunksize, engines)
+    return 0 if ok else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
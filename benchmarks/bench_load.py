@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the load stage.
+Loads the same generated orders frame with each load strategy and reports
+rows per second, then compares building the typed table's secondary
+indexes before and after loading. Runs against a temporary SQLite database, and against MySQL
+too when config/db_config.json points at a reachable server.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+
+# Add the parent directory to the path so we can import the etl modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl.load import LOAD_STRATEGIES, DEFAULT_BATCH_SIZE, write_dataframe, get_db_config
+from etl.schema import create_table, create_indexes
+
+def make_orders(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Generate a cleaned orders frame."""
+    rng = np.random.default_rng(seed)
+    days = rng.integers(0, 3000, rows)
+    return pd.DataFrame({
+        'id': np.arange(1, rows + 1),
+        'customer_id': rng.integers(1, rows // 10 + 2, rows),
+        'order_date': pd.Timestamp('2017-01-01') + pd.to_timedelta(days, unit='D'),
+        'total_amount': rng.uniform(1, 500, rows).round(2),
+    })
+
+def bench_engine(name: str, engine, df: pd.DataFrame, batch_size: int) -> bool:
+    """Time every strategy on one engine and check row counts."""
+    print(f"{name} ({len(df):,} rows)")
+    baseline = None
+    ok = True
+    for strategy in LOAD_STRATEGIES:
+        table_name = f"bench_orders_{strategy}"
+        start = time.perf_counter()
+        write_dataframe(engine, df, table_name, 'replace', strategy, batch_size)
+        seconds = time.perf_counter() - start
+
+        loaded = pd.read_sql(f"SELECT COUNT(*) AS n FROM {table_name}", engine)['n'].iloc[0]
+        ok = ok and loaded == len(df)
+        baseline = baseline or seconds
+        print(f"  {strategy:<8} {seconds:.3f}s ({len(df) / seconds:,.0f} rows/s, "
+              f"{baseline / seconds:.1f}x vs to_sql, {loaded:,} rows)")
+
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"DROP TABLE {table_name}")
+    return ok
+
+def bench_indexes(engine, df: pd.DataFrame, batch_size: int):
+    """Time a typed bulk load with indexes built before versus after the rows."""
+    for label, deferred in (("indexes first", False), ("indexes after", True)):
+        table_name = "bench_orders_typed"
+        start = time.perf_counter()
+        create_table(engine, 'orders', table_name)
+        if not deferred:
+            create_indexes(engine, 'orders', table_name)
+        write_dataframe(engine, df, table_name, 'append', 'bulk', batch_size)
+        if deferred:
+            create_indexes(engine, 'orders', table_name)
+        seconds = time.perf_counter() - start
+        print(f"  {label:<14} {seconds:.3f}s ({len(df) / seconds:,.0f} rows/s)")
+
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"DROP TABLE {table_name}")
+
+def main():
+    """Run the load benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200_000, help='rows to generate')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="rows per batch for the 'batched' strategy")
+    args = parser.parse_args()
+
+    print("⏱️  Load benchmarks")
+    print("=" * 50)
+    df = make_orders(args.rows)
+
+    # Per-batch throughput is logged by the 'batched' strategy; keep the output readable
+    logging.getLogger('etl.load').setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        sqlite_engine = create_engine(f"sqlite:///{os.path.join(temp_dir, 'bench.db')}")
+        ok = bench_engine("SQLite", sqlite_engine, df, args.batch_size)
+        bench_indexes(sqlite_engine, df, args.batch_size)
+        sqlite_engine.dispose()
+
+    mysql_engine = get_db_config()
+    if mysql_engine is not None:
+        ok = bench_engine("MySQL", mysql_engine, df, args.batch_size) and ok
+        bench_indexes(mysql_engine, df, args.batch_size)
+    else:
+        print("MySQL not reachable, skipped")
+
+    return 0 if ok else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
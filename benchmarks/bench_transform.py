@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the transform stage.
+Checks that vectorized and partitioned parallel code paths produce the
+same results as the reference implementations and reports the speedup.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to the path so we can import the etl modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl.transform import validate_email, validate_emails, clean_customers, clean_orders, customer_id_mask
+from etl.id_index import IdIndex
+
+def make_emails(rows: int, seed: int = 0) -> pd.Series:
+    """Generate a mix of valid, invalid and edge-case email addresses."""
+    rng = np.random.default_rng(seed)
+    templates = np.array([
+        'user{}@example.com',
+        'first.last{}@mail.co.uk',
+        'tag+{}@domain.org',
+        'user{}@example',          # no domain extension
+        'user{}example.com',       # no @
+        '@{}example.com',          # no username
+        'user{}@.com',             # no domain
+        'user{}@example.c',        # extension too short
+        'user{}@example.com\n',    # trailing newline is accepted by $
+        'us er{}@example.com',     # whitespace
+    ])
+    picks = templates[rng.integers(0, len(templates), rows)]
+    return pd.Series([template.format(i) for i, template in enumerate(picks)])
+
+def time_call(func, *args) -> tuple:
+    """Return (result, seconds) for a single call."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def bench_email_validation(rows: int) -> bool:
+    """Compare per-row validate_email against vectorized validate_emails."""
+    emails = make_emails(rows)
+
+    expected, row_seconds = time_call(lambda s: s.apply(validate_email), emails)
+    result, vector_seconds = time_call(validate_emails, emails)
+
+    identical = expected.astype(bool).equals(result)
+    print(f"Email validation ({rows:,} rows)")
+    print(f"  per-row apply: {row_seconds:.3f}s ({rows / row_seconds:,.0f} rows/s)")
+    print(f"  vectorized:    {vector_seconds:.3f}s ({rows / vector_seconds:,.0f} rows/s)")
+    print(f"  speedup:       {row_seconds / vector_seconds:.1f}x")
+    print(f"  identical:     {identical}")
+    return identical
+
+def make_orders(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Generate an orders frame with a realistic share of invalid rows."""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, rows + 1)
+    ids[rng.random(rows) < 0.01] = 1
+    customer_ids = rng.integers(1, rows // 10 + 2, rows).astype(object)
+    customer_ids[rng.random(rows) < 0.01] = 't'
+    amounts = rng.normal(50, 40, rows).round(2)
+    days = rng.integers(0, 5000, rows)
+    return pd.DataFrame({
+        'id': ids,
+        'customer_id': customer_ids,
+        'order_date': (pd.Timestamp('2012-01-01') + pd.to_timedelta(days, unit='D')).strftime('%Y-%m-%d'),
+        'total_amount': amounts,
+    })
+
+def bench_clean_orders(rows: int) -> bool:
+    """Report clean_orders throughput with customer validation."""
+    orders = make_orders(rows)
+    customers = pd.DataFrame({'id': np.arange(1, rows // 20)})
+
+    result, seconds = time_call(clean_orders, orders, customers)
+    print(f"clean_orders ({rows:,} rows)")
+    print(f"  time:          {seconds:.3f}s ({rows / seconds:,.0f} rows/s)")
+    print(f"  kept:          {len(result):,} rows")
+    return True
+
+def bench_customer_index(rows: int, chunksize: int) -> bool:
+    """Compare per-chunk customer validation against a dataframe and a reused index."""
+    orders = make_orders(rows)
+    customer_ids = pd.to_numeric(orders['customer_id'], errors='coerce')
+    chunks = [customer_ids.iloc[start:start + chunksize] for start in range(0, rows, chunksize)]
+    ok = True
+    for name, ids in (("dense", np.arange(1, rows // 20)),
+                      ("sparse", np.random.default_rng(1).choice(rows * 100, rows // 20, replace=False))):
+        customers = pd.DataFrame({'id': ids})
+        expected, frame_seconds = time_call(lambda: [customer_id_mask(chunk, customers) for chunk in chunks])
+        index, build_seconds = time_call(IdIndex.from_values, customers['id'])
+        result, index_seconds = time_call(lambda: [customer_id_mask(chunk, index) for chunk in chunks])
+        identical = all(a.equals(b) for a, b in zip(expected, result))
+        ok = ok and identical
+        print(f"Customer validation, {name} ids ({rows:,} rows in chunks of {chunksize:,})")
+        print(f"  dataframe:     {frame_seconds:.3f}s")
+        print(f"  index:         {index_seconds:.3f}s (+{build_seconds:.3f}s to build once)")
+        print(f"  speedup:       {frame_seconds / index_seconds:.1f}x")
+        print(f"  identical:     {identical}")
+    return ok
+
+def make_customers(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Generate a customers frame with duplicate ids and emails and bad dates."""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, rows + 1)
+    ids[rng.random(rows) < 0.01] = 1
+    days = rng.integers(0, 3000, rows)
+    join_dates = (pd.Timestamp('2016-01-01') + pd.to_timedelta(days, unit='D')).strftime('%Y-%m-%d').to_numpy(dtype=object)
+    join_dates[rng.random(rows) < 0.01] = 'unknown'
+    return pd.DataFrame({
+        'id': ids.astype(str),
+        'name': [f" Customer {i} " for i in range(rows)],
+        'email': make_emails(rows, seed).str.upper(),
+        'join_date': join_dates,
+    })
+
+def bench_parallel_clean(rows: int, workers: int) -> bool:
+    """Compare serial cleaning against the partitioned process-pool transform."""
+    customers = make_customers(rows)
+    orders = make_orders(rows)
+    ok = True
+    for name, clean, args in (("clean_customers", clean_customers, (customers,)),
+                              ("clean_orders", clean_orders, (orders, customers.assign(id=customers['id'].astype(int))))):
+        expected, serial_seconds = time_call(clean, *args)
+        result, parallel_seconds = time_call(lambda: clean(*args, workers=workers))
+        identical = expected.equals(result) and expected.dtypes.equals(result.dtypes)
+        ok = ok and identical
+        print(f"{name} serial vs {workers} workers ({rows:,} rows)")
+        print(f"  serial:        {serial_seconds:.3f}s ({rows / serial_seconds:,.0f} rows/s)")
+        print(f"  parallel:      {parallel_seconds:.3f}s ({rows / parallel_seconds:,.0f} rows/s)")
+        print(f"  speedup:       {serial_seconds / parallel_seconds:.1f}x")
+        print(f"  identical:     {identical}")
+    return ok
+
+def main():
+    """Run the transform benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000, help='rows to generate')
+    parser.add_argument('--chunksize', type=int, default=10_000, help='rows per chunk for customer validation')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='partitions for the parallel transform')
+    args = parser.parse_args()
+
+    print("⏱️  Transform benchmarks")
+    print("=" * 50)
+    ok = bench_email_validation(args.rows)
+    ok = bench_clean_orders(args.rows) and ok
+    ok = bench_customer_index(args.rows, args.chunksize) and ok
+    if args.workers > 1:
+        ok = bench_parallel_clean(args.rows, args.workers) and ok
+    return 0 if ok else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+import pandas as pd
+import logging
+import os
+from typing import Callable, Optional
+
+from etl.fingerprint import file_fingerprint, fingerprint_key
+
+try:
+    import pyarrow
+    import pyarrow.feather as feather
+except ImportError:  # optional: the cache is disabled without it
+    pyarrow = None
+    feather = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = '.etl_cache'
+DEFAULT_CACHE_MAX_BYTES = 1 << 30
+
+# Bump when the cached frame layout changes so old entries are never read
+CACHE_VERSION = 1
+
+CACHE_SUFFIX = '.feather'
+
+def source_prefix(file_path: str) -> str:
+    """
+    File name prefix shared by every cache entry of one source file.
+    """
+    return fingerprint_key(os.path.abspath(file_path))[:16]
+
+def cache_entry_path(file_path: str, read_key, cache_dir: str = DEFAULT_CACHE_DIR) -> str:
+    """
+    Location of the cache entry for the current contents of file_path read
+    with read_key (anything JSON-serializable describing how it is parsed).
+    """
+    key = fingerprint_key(file_fingerprint(file_path), read_key, CACHE_VERSION,
+                          pd.__version__, pyarrow.__version__)
+    return os.path.join(cache_dir, f"{source_prefix(file_path)}-{key}{CACHE_SUFFIX}")
+
+def load_cache_entry(path: str) -> Optional[pd.DataFrame]:
+    """
+    Read a cache entry, memory-mapped, or None if it is missing or unreadable.
+    A hit marks the entry as recently used.
+    """
+    if not os.path.exists(path):
+        return None
+
+    try:
+        df = feather.read_table(path, memory_map=True).to_pandas()
+    except Exception as e:
+        logger.warning(f"Could not read cache entry {path}, re-reading source: {e}")
+        return None
+
+    os.utime(path)
+    return df
+
+def save_cache_entry(path: str, df: pd.DataFrame):
+    """
+    Write a cache entry atomically, uncompressed so it can be memory-mapped,
+    and drop older entries of the same source, which can no longer match.
+    """
+    cache_dir = os.path.dirname(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    feather.write_feather(df, temp_path, compression='uncompressed')
+    os.replace(temp_path, path)
+
+    prefix = os.path.basename(path).split('-')[0]
+    for name in os.listdir(cache_dir):
+        stale = os.path.join(cache_dir, name)
+        if name.startswith(f"{prefix}-") and name.endswith(CACHE_SUFFIX) and stale != path:
+            os.remove(stale)
+
+def evict_cache(cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_CACHE_MAX_BYTES) -> int:
+    """
+    Remove least recently used entries until the cache fits in max_bytes.
+    Returns the number of entries removed.
+    """
+    if not os.path.isdir(cache_dir):
+        return 0
+
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(CACHE_SUFFIX):
+            stat = os.stat(os.path.join(cache_dir, name))
+            entries.append((stat.st_mtime_ns, stat.st_size, name))
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        os.remove(os.path.join(cache_dir, name))
+        total -= size
+        removed += 1
+
+    if removed:
+        logger.info(f"Evicted {removed} cache entries from {cache_dir}")
+    return removed
+
+def cached_read(read: Callable[[], pd.DataFrame], file_path: str, read_key,
+                cache_dir: str = DEFAULT_CACHE_DIR,
+                max_bytes: int = DEFAULT_CACHE_MAX_BYTES) -> pd.DataFrame:
+    """
+    Return the cached frame for file_path and read_key, or call read() and
+    cache its result. Entries are keyed by the file's path, size, mtime and
+    content digest, so any change to the file is a miss. Cache errors are
+    logged and never fail the read.
+    """
+    if feather is None:
+        logger.warning("pyarrow is not installed, extract cache disabled")
+        return read()
+
+    try:
+        path = cache_entry_path(file_path, read_key, cache_dir)
+    except OSError as e:
+        logger.warning(f"Could not fingerprint {file_path}, skipping cache: {e}")
+        return read()
+
+    df = load_cache_entry(path)
+    if df is not None:
+        logger.info(f"Loaded {len(df)} rows for {file_path} from cache")
+        return df
+
+    df = read()
+    try:
+        save_cache_entry(path, df)
+        evict_cache(cache_dir, max_bytes)
+    except Exception as e:
+        logger.warning(f"Could not cache {file_path}: {e}")
+    return df
@@ -0,0 +1,124 @@
+import pandas as pd
+import numpy as np
+import logging
+import os
+from typing import Optional, Tuple
+
+from etl.fingerprint import fingerprint_key
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATE_DIR = '.etl_state'
+
+def _canonical_column(series: pd.Series) -> pd.Series:
+    """
+    Normalize a column so equal values hash equally across runs, whatever
+    dtype inference or datetime resolution produced them. Integer columns
+    are hashed as int64, since float64 cannot tell apart integers above 2**53.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.as_unit('ns')
+    if pd.api.types.is_integer_dtype(series) and not series.hasnans:
+        return series.astype('int64')
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype('float64')
+    return series.astype(object)
+
+def row_hashes(df: pd.DataFrame, key: str = 'id') -> pd.Series:
+    """
+    Stable 64-bit content hash of every row, indexed by the integer key.
+    Columns are hashed in sorted name order so column order does not matter.
+    """
+    columns = sorted(df.columns)
+    canonical = pd.DataFrame({column: _canonical_column(df[column]) for column in columns})
+    hashes = pd.util.hash_pandas_object(canonical, index=False)
+    return pd.Series(hashes.to_numpy(), index=df[key].to_numpy(dtype='int64'), name='hash')
+
+def database_state_dir(state_dir: str, db_url: str) -> str:
+    """
+    Directory under state_dir for the hash indexes of one target database,
+    so that state saved for one database is never applied to another.
+    """
+    return os.path.join(state_dir, fingerprint_key(db_url)[:16])
+
+def hash_index_path(table_name: str, state_dir: str = DEFAULT_STATE_DIR) -> str:
+    """
+    Location of the saved hash index for a table.
+    """
+    return os.path.join(state_dir, f"{table_name}_hashes.npz")
+
+def load_hash_index(table_name: str, state_dir: str = DEFAULT_STATE_DIR) -> Optional[pd.Series]:
+    """
+    Load the hash index saved by the last successful run, or None.
+    """
+    path = hash_index_path(table_name, state_dir)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with np.load(path) as data:
+            return pd.Series(data['hashes'], index=data['ids'], name='hash')
+    except Exception as e:
+        logger.warning(f"Could not read hash index {path}, treating all rows as new: {e}")
+        return None
+
+def save_hash_index(table_name: str, hashes: pd.Series, state_dir: str = DEFAULT_STATE_DIR):
+    """
+    Persist a hash index atomically so a failed run never leaves it half written.
+    """
+    os.makedirs(state_dir, exist_ok=True)
+    path = hash_index_path(table_name, state_dir)
+    temp_path = f"{path}.tmp.npz"
+    np.savez(temp_path, ids=hashes.index.to_numpy(dtype='int64'), hashes=hashes.to_numpy(dtype='uint64'))
+    os.replace(temp_path, path)
+    logger.info(f"Saved hash index for {table_name}: {len(hashes)} rows")
+
+def diff_hashes(current: pd.Series, previous: pd.Series) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compare two hash indexes with unique keys and return the
+    (inserted, updated, deleted) keys.
+    """
+    common = current.index.intersection(previous.index)
+    changed = current.loc[common].to_numpy() != previous.loc[common].to_numpy()
+
+    inserted = current.index.difference(previous.index).to_numpy()
+    updated = common[changed].to_numpy()
+    deleted = previous.index.difference(current.index).to_numpy()
+    return inserted, updated, deleted
+
+def detect_changes(df: pd.DataFrame, table_name: str, state_dir: str = DEFAULT_STATE_DIR,
+                   key: str = 'id') -> dict:
+    """
+    Split a cleaned frame into rows inserted or updated since the last
+    successful run, plus the keys of rows that were deleted.
+
+    Returns a dict with 'inserted' and 'updated' DataFrames, 'deleted' keys,
+    'counts' per change class, 'hashes' (the index to save once the load
+    succeeds) and 'first_run' (True when no previous index exists).
+    """
+    hashes = row_hashes(df, key)
+    previous = load_hash_index(table_name, state_dir)
+
+    if previous is None:
+        inserted_keys = hashes.index.to_numpy()
+        updated_keys = np.array([], dtype='int64')
+        deleted_keys = np.array([], dtype='int64')
+    else:
+        inserted_keys, updated_keys, deleted_keys = diff_hashes(hashes, previous)
+
+    keys = df[key]
+    changes = {
+        "inserted": df[keys.isin(inserted_keys)],
+        "updated": df[keys.isin(updated_keys)],
+        "deleted": deleted_keys,
+        "hashes": hashes,
+        "first_run": previous is None,
+    }
+    changes["counts"] = {
+        "inserted": len(inserted_keys),
+        "updated": len(updated_keys),
+        "deleted": len(deleted_keys),
+        "unchanged": len(df) - len(inserted_keys) - len(updated_keys),
+    }
+    logger.info(f"Changes for {table_name}: {changes['counts']}")
+    return changes
@@ -0,0 +1,67 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+# Pool types run_tasks can use. Threads suit I/O-bound work; processes
+# sidestep the GIL but need picklable tasks and results.
+EXECUTORS = ('thread', 'process')
+
+def _falsy(result: Any) -> bool:
+    return not result
+
+def _make_executor(executor: str, max_workers: int):
+    """
+    Create the pool named by executor.
+    """
+    if executor == 'thread':
+        return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='etl-task')
+    if executor == 'process':
+        return ProcessPoolExecutor(max_workers=max_workers)
+    raise ValueError(f"Unknown executor: {executor}, expected one of {EXECUTORS}")
+
+def run_tasks(tasks: Dict[str, Callable[[], Any]], max_workers: int = 2,
+              failed: Callable[[Any], bool] = _falsy, executor: str = 'thread') -> Dict[str, Any]:
+    """
+    Run independent tasks on a thread or process pool (see EXECUTORS), at
+    most max_workers at a time.
+
+    tasks maps a name to a function taking no arguments, and tasks start in
+    that order. Once a task fails (failed(result) is true) or raises, no
+    further tasks are started; tasks already running are waited for.
+    Returns the results of the tasks that ran, by name, or re-raises the
+    first exception. With max_workers=1 this is the same as calling the
+    tasks one after another and stopping at the first failure.
+    """
+    if max_workers < 1:
+        raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+
+    results = {}
+    error = None
+    stopped = False
+    queued = list(tasks.items())
+    running = {}
+    with _make_executor(executor, min(max_workers, max(len(tasks), 1))) as pool:
+        while running or (queued and not stopped):
+            # Submit lazily so nothing new starts once a task has failed
+            while queued and not stopped and len(running) < max_workers:
+                name, task = queued.pop(0)
+                running[pool.submit(task)] = name
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                    stopped = stopped or failed(results[name])
+                except Exception as e:
+                    error = error or e
+                    stopped = True
+
+    for name, _ in queued:
+        logger.info(f"Skipped {name} after an earlier task failed")
+
+    if error is not None:
+        raise error
+    return results
@@ -0,0 +1,102 @@
+import json
+import logging
+import os
+import copy
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG_PATH = 'config/etl_config.json'
+
+# Defaults used when a section or key is missing from etl_config.json
+DEFAULT_CONFIG = {
+    "data_paths": {
+        "customers": "data/customers.csv",
+        "orders": "data/orders.csv"
+    },
+    "extract": {
+        "mode": "full",
+        "chunksize": 100000,
+        "chunk_bytes": None,
+        "max_in_flight": 2,
+        "max_workers": 2,
+        "executor": "thread",
+        "engine": "c",
+        "sample_rows": 100,
+        "partition_start": None,
+        "partition_end": None,
+        "bad_lines": "fail",
+        "quarantine_dir": ".etl_quarantine"
+    },
+    "transform": {
+        "workers": 1,
+        "executor": "process",
+        "customer_index": None,
+        "customer_ids": "input"
+    },
+    "load": {
+        "mode": "replace",
+        "strategy": "to_sql",
+        "batch_size": 1000,
+        "max_parallel_tables": 2,
+        "tables": {}
+    },
+    "change_detection": {
+        "enabled": False,
+        "state_dir": ".etl_state"
+    },
+    "cache": {
+        "enabled": False,
+        "dir": ".etl_cache",
+        "max_bytes": 1073741824
+    },
+    "skip_unchanged": {
+        "enabled": False,
+        "manifest": ".etl_state/run_manifest.json"
+    },
+    "rejects": {
+        "enabled": False,
+        "dir": ".etl_rejects"
+    }
+}
+
+def _merge(defaults: dict, overrides: dict) -> dict:
+    """
+    Recursively merge overrides on top of defaults.
+    """
+    merged = copy.deepcopy(defaults)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+def load_etl_config(config_path: str = DEFAULT_CONFIG_PATH) -> dict:
+    """
+    Load the ETL configuration, falling back to defaults for missing values.
+    """
+    if not os.path.exists(config_path):
+        logger.warning(f"ETL config file not found: {config_path}, using defaults")
+        return copy.deepcopy(DEFAULT_CONFIG)
+
+    try:
+        with open(config_path, 'r') as f:
+            config = json.load(f)
+    except json.JSONDecodeError as e:
+        logger.error(f"Invalid JSON in ETL config: {e}, using defaults")
+        return copy.deepcopy(DEFAULT_CONFIG)
+
+    return _merge(DEFAULT_CONFIG, config)
+
+# Load settings that apply to the whole run rather than to one table
+RUN_LOAD_KEYS = ('tables', 'max_parallel_tables')
+
+def get_load_options(config: dict, table_name: str) -> dict:
+    """
+    Keyword options for load_to_mysql for one table.
+    Per-table settings under load.tables override the load defaults.
+    """
+    load_config = config.get('load', {})
+    options = {key: value for key, value in load_config.items() if key not in RUN_LOAD_KEYS}
+    options.update(load_config.get('tables', {}).get(table_name, {}))
+    return options
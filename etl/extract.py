@@ -1,12 +1,156 @@
 import pandas as pd
+import numpy as np
+import bz2
+import gzip
 import logging
+import lzma
 import os
-from typing import Optional
+from contextlib import contextmanager
+from functools import partial
+from typing import Iterator, List, Optional
+
+from etl.cache import cached_read, DEFAULT_CACHE_MAX_BYTES
+from etl.concurrency import run_tasks
+from etl.sources import resolve_sources, is_multi_source
+from etl.quarantine import capture_bad_lines, arrow_bad_line_handler, locate_bad_lines, write_quarantine
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # optional: only needed for the pyarrow engine
+    pa = None
+    pa_csv = None
+
+try:
+    import zstandard
+except ImportError:  # optional: pyarrow's codec is used for zstd without it
+    zstandard = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+CUSTOMER_COLUMNS = ['id', 'name', 'email', 'join_date']
+ORDER_COLUMNS = ['id', 'customer_id', 'order_date', 'total_amount']
+
+# CSV readers extract can use. 'c' is the pandas C parser; 'pyarrow' is
+# Arrow's multithreaded reader, which returns Arrow-backed string columns.
+CSV_ENGINES = ('c', 'pyarrow')
+
+def arrow_string_dtype():
+    """
+    Arrow-backed pandas string dtype with NaN for missing values, the
+    default str dtype of pandas 3, or its pd.NA variant on pandas before 2.3.
+    """
+    try:
+        return pd.StringDtype('pyarrow', na_value=np.nan)
+    except TypeError:
+        return pd.StringDtype('pyarrow')
+
+# Smallest block pyarrow reads at once when streaming; larger blocks are
+# parsed by more threads in parallel
+ARROW_MIN_BLOCK_BYTES = 1 << 20
+
+# Compressed inputs, recognised by file extension or, failing that, by
+# their leading magic bytes
+COMPRESSION_EXTENSIONS = {
+    '.gz': 'gzip',
+    '.bz2': 'bz2',
+    '.xz': 'xz',
+    '.zst': 'zstd'
+}
+COMPRESSION_MAGIC = {
+    b'\x1f\x8b': 'gzip',
+    b'BZh': 'bz2',
+    b'\xfd7zXZ\x00': 'xz',
+    b'\x28\xb5\x2f\xfd': 'zstd'
+}
+
+# Data rows parsed to check a file's structure before the full parse
+DEFAULT_SAMPLE_ROWS = 100
+
+# Number of bytes sampled from the start of a file to estimate row width
+CHUNK_SAMPLE_BYTES = 64 * 1024
+
+# Declared column types of each source, applied while parsing so the
+# transform does not have to coerce them again. Dates are parsed with a fixed
+# format; a column with values that do not match is left as text for the
+# transform to parse. A file whose values do not fit the declared dtypes is
+# read again with inferred types. Ids are int64 so that ids above 2**53 stay
+# exact; a file with missing or non-integer ids is read with inferred types.
+SOURCE_SCHEMAS = {
+    "customers": {
+        "columns": CUSTOMER_COLUMNS,
+        "dtypes": {"id": "int64", "name": "str", "email": "str"},
+        "date_formats": {"join_date": "%Y-%m-%d"}
+    },
+    "orders": {
+        "columns": ORDER_COLUMNS,
+        "dtypes": {"id": "int64", "customer_id": "int64", "total_amount": "float64"},
+        "date_formats": {"order_date": "%Y-%m-%d"}
+    }
+}
+
+def detect_compression(file_path: str) -> Optional[str]:
+    """
+    Compression codec of a file (see COMPRESSION_EXTENSIONS), or None if it
+    is plain text.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension in COMPRESSION_EXTENSIONS:
+        return COMPRESSION_EXTENSIONS[extension]
+
+    with open(file_path, 'rb') as f:
+        head = f.read(max(len(magic) for magic in COMPRESSION_MAGIC))
+    for magic, codec in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return codec
+    return None
+
+def _open_zstd(file_path: str):
+    if zstandard is not None:
+        return zstandard.ZstdDecompressor().stream_reader(open(file_path, 'rb'), closefd=True)
+    if pa is not None:
+        return pa.input_stream(file_path, compression='zstd')
+    raise ValueError(f"Reading zstd input {file_path} needs the zstandard or pyarrow package")
+
+# Streaming decompressors by codec; each returns a binary file object
+DECOMPRESSORS = {
+    'gzip': lambda file_path: gzip.open(file_path, 'rb'),
+    'bz2': lambda file_path: bz2.open(file_path, 'rb'),
+    'xz': lambda file_path: lzma.open(file_path, 'rb'),
+    'zstd': _open_zstd
+}
+
+def open_binary(file_path: str):
+    """
+    Open a file for reading its decompressed bytes.
+    """
+    codec = detect_compression(file_path)
+    if codec is None:
+        return open(file_path, 'rb')
+    return DECOMPRESSORS[codec](file_path)
+
+@contextmanager
+def open_source(file_path: str):
+    """
+    Yield what the CSV readers should read: the path itself for plain files,
+    so they can use their own I/O, or a stream decompressing the file as it
+    is read, so a compressed input is never written out to disk.
+    """
+    if detect_compression(file_path) is None:
+        yield file_path
+        return
+    with open_binary(file_path) as stream:
+        yield stream
+
+def read_header(file_path: str) -> pd.Index:
+    """
+    Column names of a CSV file, without parsing any data rows.
+    """
+    with open_source(file_path) as source:
+        return pd.read_csv(source, nrows=0).columns
+
 def validate_file_exists(file_path: str) -> bool:
     """
     Validate that the file exists and is readable.
@@ -36,22 +180,236 @@ def validate_csv_structure(df: pd.DataFrame, expected_columns: list, file_path:
     
     return True
 
-def extract_customers(file_path: str) -> pd.DataFrame:
+def read_options(file_path: str, schema: dict, typed: bool = True) -> dict:
+    """
+    Keyword arguments for pd.read_csv that apply a source schema: only the
+    declared columns are kept (see _split_usecols), dates are parsed with their formats and, when
+    typed, the declared dtypes are used. Columns missing from the file are
+    left out so that validation can report them.
+    """
+    header = set(read_header(file_path))
+    columns = set(schema['columns'])
+    options = {'usecols': lambda column: column in columns}
+
+    if typed:
+        options['dtype'] = {column: dtype for column, dtype in schema['dtypes'].items() if column in header}
+
+    date_formats = {column: fmt for column, fmt in schema['date_formats'].items() if column in header}
+    if date_formats:
+        options['parse_dates'] = list(date_formats)
+        options['date_format'] = date_formats
+    return options
+
+def _is_type_mismatch(e: Exception) -> bool:
+    """
+    Whether a read_csv error means values did not fit the declared dtypes,
+    as opposed to a malformed or empty file.
+    """
+    return isinstance(e, (ValueError, TypeError)) and not isinstance(
+        e, (pd.errors.ParserError, pd.errors.EmptyDataError))
+
+def resolve_engine(engine: str) -> str:
+    """
+    Check a CSV engine name (see CSV_ENGINES), falling back to the C engine
+    when pyarrow is not installed.
+    """
+    if engine not in CSV_ENGINES:
+        raise ValueError(f"Unknown CSV engine: {engine}, expected one of {CSV_ENGINES}")
+    if engine == 'pyarrow' and pa_csv is None:
+        logger.warning("pyarrow is not installed, using the C CSV engine")
+        return 'c'
+    return engine
+
+def tolerant_engine(engine: str) -> str:
+    """
+    CSV engine for a read that quarantines malformed lines. The C parser
+    only reports them as warnings, which are captured under a process-wide
+    lock (see capture_bad_lines), so tolerant C reads of different files
+    would run one at a time. pyarrow's row handler is used instead when it
+    is installed.
+    """
+    if engine == 'c' and pa is not None:
+        return 'pyarrow'
+    return engine
+
+def arrow_convert_options(file_path: str, schema: dict, typed: bool = True):
+    """
+    pyarrow ConvertOptions that apply a source schema, like read_options.
+    Untyped, every column is read as text: Arrow infers types from the first
+    block only, so inferred types can still fail further into the file.
+    Empty fields become nulls in string columns too, as with the C engine.
+    """
+    columns = set(schema['columns'])
+    include = [column for column in read_header(file_path) if column in columns]
+
+    if not typed:
+        return pa_csv.ConvertOptions(include_columns=include, strings_can_be_null=True,
+                                     column_types={column: pa.string() for column in include})
+
+    column_types = {column: pa.type_for_alias(dtype)
+                    for column, dtype in schema['dtypes'].items() if column in include}
+    date_formats = {column: fmt for column, fmt in schema['date_formats'].items() if column in include}
+    column_types.update({column: pa.timestamp('us') for column in date_formats})
+    return pa_csv.ConvertOptions(include_columns=include, column_types=column_types,
+                                 timestamp_parsers=sorted(set(date_formats.values())),
+                                 strings_can_be_null=True)
+
+def _arrow_error(e: Exception) -> Exception:
+    """
+    Map a pyarrow CSV error onto the pandas error the callers handle:
+    malformed rows become ParserError, conversion errors stay ValueError.
+    """
+    if str(e).startswith('CSV parse error'):
+        return pd.errors.ParserError(str(e))
+    return e
+
+def arrow_to_pandas(table) -> pd.DataFrame:
+    """
+    Convert a pyarrow table to pandas, keeping string columns in Arrow
+    memory rather than as Python objects. An integer column with nulls would
+    become float64, rounding large ids, so it is reported as a type mismatch
+    and the file is read again with inferred types, as with the C engine.
+    """
+    for name, column in zip(table.column_names, table.columns):
+        if pa.types.is_integer(column.type) and column.null_count:
+            raise ValueError(f"Integer column {name} has NA values")
+    string_dtype = arrow_string_dtype()
+    return table.to_pandas(types_mapper={pa.string(): string_dtype, pa.large_string(): string_dtype}.get)
+
+def arrow_parse_options(bad_lines: Optional[list] = None):
+    """
+    pyarrow ParseOptions that skip malformed rows into bad_lines, or the
+    defaults, which fail on them, when bad_lines is None.
+    """
+    if bad_lines is None:
+        return None
+    return pa_csv.ParseOptions(invalid_row_handler=arrow_bad_line_handler(bad_lines))
+
+def read_arrow(file_path: str, schema: dict, typed: bool = True,
+               bad_lines: Optional[list] = None) -> pd.DataFrame:
+    """
+    Read a whole CSV file with pyarrow's multithreaded reader. With a
+    bad_lines list, malformed rows are skipped and collected there.
+    """
+    try:
+        convert_options = arrow_convert_options(file_path, schema, typed)
+        with open_source(file_path) as source:
+            table = pa_csv.read_csv(source, convert_options=convert_options,
+                                    parse_options=arrow_parse_options(bad_lines))
+    except pa.ArrowInvalid as e:
+        raise _arrow_error(e) from e
+    return arrow_to_pandas(table)
+
+def read_pandas(file_path: str, options: dict, bad_lines: Optional[list] = None) -> pd.DataFrame:
+    """
+    Read a whole CSV file with the pandas C parser. With a bad_lines list,
+    malformed lines are skipped and collected there; they are captured from
+    warnings under a process-wide lock, so such reads run one at a time.
+    """
+    options, usecols = _split_usecols(options)
+    if bad_lines is None:
+        with open_source(file_path) as source:
+            return _select_columns(pd.read_csv(source, **options), usecols)
+
+    with open_source(file_path) as source, capture_bad_lines(bad_lines):
+        df = pd.read_csv(source, on_bad_lines='warn', **options)
+    return _select_columns(df, usecols)
+
+def _split_usecols(options: dict):
+    """
+    Split usecols off read_csv options. With usecols the C parser silently
+    drops surplus fields instead of failing or reporting the line, so every
+    column is parsed and the wanted ones are selected afterwards.
+    """
+    options = dict(options)
+    return options, options.pop('usecols', None)
+
+def _select_columns(df: pd.DataFrame, usecols) -> pd.DataFrame:
+    if usecols is None:
+        return df
+    return df[[column for column in df.columns if usecols(column)]]
+
+def quarantine_bad_lines(file_path: str, bad_lines: list, quarantine_dir: str):
+    """
+    Complete the line numbers and raw text of bad lines from the file and
+    append them to its quarantine file.
+    """
+    with open_binary(file_path) as stream:
+        locate_bad_lines(stream, bad_lines)
+    write_quarantine(file_path, bad_lines, quarantine_dir)
+
+def _parse(file_path: str, schema: dict, engine: str, typed: bool, tolerant: bool):
+    bad_lines = [] if tolerant else None
+    if engine == 'pyarrow':
+        return read_arrow(file_path, schema, typed, bad_lines), bad_lines
+    return read_pandas(file_path, read_options(file_path, schema, typed), bad_lines), bad_lines
+
+def parse_source(file_path: str, schema: dict, engine: str = 'c',
+                 quarantine_dir: Optional[str] = None) -> pd.DataFrame:
     """
-    Extract customer data from a CSV file.
+    Parse a whole CSV file with its declared schema, falling back to inferred
+    column types if the values do not fit the declared dtypes. With a
+    quarantine_dir, malformed lines are diverted to a quarantine file there
+    instead of failing the file.
     """
+    tolerant = quarantine_dir is not None
+    try:
+        df, bad_lines = _parse(file_path, schema, engine, True, tolerant)
+    except (ValueError, TypeError) as e:
+        if not _is_type_mismatch(e):
+            raise
+        logger.warning(f"{file_path} does not match its declared column types ({e}), inferring types")
+        df, bad_lines = _parse(file_path, schema, engine, False, tolerant)
+
+    if bad_lines:
+        quarantine_bad_lines(file_path, bad_lines, quarantine_dir)
+    return df
+
+def read_source(file_path: str, schema: dict, engine: str = 'c', cache_dir: Optional[str] = None,
+                cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+                quarantine_dir: Optional[str] = None) -> pd.DataFrame:
+    """
+    Read a whole CSV file with its declared schema. With a cache_dir, the
+    parsed frame is cached there and reused while the file is unchanged.
+    """
+    engine = resolve_engine(engine)
+    if quarantine_dir is not None:
+        engine = tolerant_engine(engine)
+    if cache_dir is None:
+        return parse_source(file_path, schema, engine, quarantine_dir)
+    return cached_read(partial(parse_source, file_path, schema, engine, quarantine_dir), file_path,
+                       {"schema": schema, "engine": engine, "quarantine": quarantine_dir is not None},
+                       cache_dir, cache_max_bytes)
+
+def extract_file(file_path: str, table: str, engine: str = 'c', cache_dir: Optional[str] = None,
+                 cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+                 sample_rows: int = DEFAULT_SAMPLE_ROWS,
+                 quarantine_dir: Optional[str] = None) -> pd.DataFrame:
+    """
+    Extract one CSV file of a table in SOURCE_SCHEMAS with the given CSV
+    engine, through the extract cache when a cache_dir is given. The header
+    and the first sample_rows rows are checked before the whole file is
+    parsed. With a quarantine_dir, malformed lines are quarantined there
+    rather than failing the file.
+    """
+    columns = SOURCE_SCHEMAS[table]['columns']
     try:
         # Validate file exists
         if not validate_file_exists(file_path):
             return pd.DataFrame()
+
+        # Fail fast on structural problems before the full parse
+        if not validate_csv_header(file_path, columns):
+            return pd.DataFrame()
+        if not validate_csv_sample(file_path, sample_rows, skip_bad_lines=quarantine_dir is not None):
+            return pd.DataFrame()
         
         # Read CSV
-        df = pd.read_csv(file_path)
+        df = read_source(file_path, SOURCE_SCHEMAS[table], engine, cache_dir, cache_max_bytes, quarantine_dir)
         logger.info(f"Successfully extracted {len(df)} rows from {file_path}")
         
         # Validate structure
-        expected_columns = ['id', 'name', 'email', 'join_date']
-        if not validate_csv_structure(df, expected_columns, file_path):
+        if not validate_csv_structure(df, columns, file_path):
             return pd.DataFrame()
         
         return df
@@ -63,35 +421,365 @@ def extract_customers(file_path: str) -> pd.DataFrame:
         logger.error(f"Error parsing CSV file {file_path}: {e}")
         return pd.DataFrame()
     except Exception as e:
-        logger.error(f"Unexpected error extracting customers from {file_path}: {e}")
+        logger.error(f"Unexpected error extracting {table} from {file_path}: {e}")
         return pd.DataFrame()
 
-def extract_orders(file_path: str) -> pd.DataFrame:
+def has_data_rows(file_path: str) -> bool:
     """
-    Extract order data from a CSV file.
+    Whether a shard holds any data rows. Unreadable shards count as having
+    rows so that extracting them reports the problem.
     """
     try:
-        # Validate file exists
-        if not validate_file_exists(file_path):
-            return pd.DataFrame()
-        
-        # Read CSV
-        df = pd.read_csv(file_path)
-        logger.info(f"Successfully extracted {len(df)} rows from {file_path}")
-        
-        # Validate structure
-        expected_columns = ['id', 'customer_id', 'order_date', 'total_amount']
-        if not validate_csv_structure(df, expected_columns, file_path):
-            return pd.DataFrame()
-        
-        return df
-        
+        with open_source(file_path) as source:
+            return not pd.read_csv(source, nrows=1).empty
     except pd.errors.EmptyDataError:
-        logger.error(f"File {file_path} is empty")
+        return False
+    except Exception:
+        return True
+
+def table_shards(file_path: str, table: str, start_date=None, end_date=None) -> Optional[List[str]]:
+    """
+    Non-empty shards of a multi-file input (see resolve_sources), or None
+    if there are none.
+    """
+    shards = []
+    for shard in resolve_sources(file_path, start_date, end_date):
+        if has_data_rows(shard):
+            shards.append(shard)
+        else:
+            logger.info(f"Skipping empty {table} file {shard}")
+    if not shards:
+        logger.error(f"No {table} input files with data at {file_path}")
+        return None
+    return shards
+
+def extract_table(file_path: str, table: str, max_workers: int = 1, start_date=None, end_date=None,
+                  **options) -> pd.DataFrame:
+    """
+    Extract a table from a single CSV file, a glob pattern or a partitioned
+    directory. Shards are read at most max_workers at a time, optionally
+    pruned to date partitions between start_date and end_date, and
+    concatenated in path order. Extraction fails if any shard does. options
+    are passed on to extract_file.
+    """
+    if not is_multi_source(file_path):
+        return extract_file(file_path, table, **options)
+
+    shards = table_shards(file_path, table, start_date, end_date)
+    if shards is None:
+        return pd.DataFrame()
+
+    tasks = {shard: partial(extract_file, shard, table, **options) for shard in shards}
+    results = run_tasks(tasks, max_workers, failed=lambda df: df.empty)
+    if len(results) < len(tasks) or any(df.empty for df in results.values()):
+        logger.error(f"Failed to extract {table} from {file_path}")
         return pd.DataFrame()
+
+    df = pd.concat([results[shard] for shard in shards], ignore_index=True)
+    logger.info(f"Successfully extracted {len(df)} rows from {len(shards)} files at {file_path}")
+    return df
+
+def extract_customers(file_path: str, **options) -> pd.DataFrame:
+    """
+    Extract customer data from a CSV file, glob pattern or partitioned
+    directory (see extract_table for the options).
+    """
+    return extract_table(file_path, 'customers', **options)
+
+def extract_orders(file_path: str, **options) -> pd.DataFrame:
+    """
+    Extract order data from a CSV file, glob pattern or partitioned
+    directory (see extract_table for the options).
+    """
+    return extract_table(file_path, 'orders', **options)
+
+def validate_csv_header(file_path: str, expected_columns: list) -> bool:
+    """
+    Validate the CSV header without parsing any data rows.
+    """
+    try:
+        columns = read_header(file_path)
+    except pd.errors.EmptyDataError:
+        logger.error(f"File {file_path} is empty")
+        return False
+
+    missing_columns = set(expected_columns) - set(columns)
+    if missing_columns:
+        logger.error(f"Missing required columns in {file_path}: {missing_columns}")
+        return False
+
+    return True
+
+def validate_csv_sample(file_path: str, sample_rows: int = DEFAULT_SAMPLE_ROWS,
+                        skip_bad_lines: bool = False) -> bool:
+    """
+    Parse the first sample_rows data rows to catch malformed or empty files
+    before committing to a full parse. A sample_rows of 0 skips the check.
+    skip_bad_lines ignores malformed lines, for files read tolerantly.
+    """
+    if sample_rows <= 0:
+        return True
+
+    try:
+        with open_source(file_path) as source:
+            sample = pd.read_csv(source, nrows=sample_rows, on_bad_lines='skip' if skip_bad_lines else 'error')
     except pd.errors.ParserError as e:
         logger.error(f"Error parsing CSV file {file_path}: {e}")
-        return pd.DataFrame()
+        return False
+
+    if sample.empty:
+        logger.warning(f"File {file_path} is empty")
+        return False
+
+    return True
+
+def average_row_bytes(file_path: str) -> Optional[float]:
+    """
+    Average width in bytes of the rows sampled from the start of a file,
+    after decompression, or None if the sample holds no complete row.
+    """
+    with open_binary(file_path) as f:
+        sample = f.read(CHUNK_SAMPLE_BYTES)
+    sample = sample[sample.find(b'\n') + 1:]  # skip header
+
+    line_count = sample.count(b'\n')
+    if line_count == 0:
+        return None
+    return len(sample) / line_count
+
+def estimate_rows_per_chunk(file_path: str, chunk_bytes: int) -> int:
+    """
+    Estimate how many rows fit in roughly chunk_bytes of input.
+    """
+    avg_row_bytes = average_row_bytes(file_path)
+    if avg_row_bytes is None:
+        return 1
+    return max(1, int(chunk_bytes // avg_row_bytes))
+
+def extract_chunks(file_path: str, expected_columns: list, chunksize: Optional[int] = None,
+                   chunk_bytes: Optional[int] = None,
+                   schema: Optional[dict] = None, engine: str = 'c',
+                   sample_rows: int = DEFAULT_SAMPLE_ROWS,
+                   quarantine_dir: Optional[str] = None) -> Optional[Iterator[pd.DataFrame]]:
+    """
+    Stream a CSV file as DataFrame chunks of bounded size.
+
+    The header and the first sample_rows rows are validated once before
+    streaming starts. Returns None if the file is missing or malformed,
+    otherwise an iterator of chunks. chunk_bytes, when given, takes
+    precedence over chunksize. A schema (see SOURCE_SCHEMAS) is applied to
+    every chunk. engine picks the CSV reader (see CSV_ENGINES); both yield
+    the same chunk boundaries. With a quarantine_dir, malformed lines are
+    quarantined there and streaming carries on.
+    """
+    try:
+        engine = resolve_engine(engine)
+        if not validate_file_exists(file_path):
+            return None
+
+        if not validate_csv_header(file_path, expected_columns):
+            return None
+
+        if not validate_csv_sample(file_path, sample_rows, skip_bad_lines=quarantine_dir is not None):
+            return None
+
+        if engine == 'c' and pa is not None:
+            # pandas' chunked C reader does not check the field count of the
+            # first rows it tokenizes for each chunk, so it truncates
+            # malformed lines there instead of failing or quarantining them
+            engine = 'pyarrow'
+        elif engine == 'c':
+            logger.warning(f"Without pyarrow, malformed lines at chunk boundaries of {file_path} "
+                           f"may be truncated rather than {'quarantined' if quarantine_dir else 'reported'}")
+
+        if chunk_bytes:
+            chunksize = estimate_rows_per_chunk(file_path, chunk_bytes)
+        if not chunksize or chunksize < 1:
+            logger.error(f"Invalid chunk size for {file_path}: {chunksize}")
+            return None
+
+        logger.info(f"Streaming {file_path} in chunks of {chunksize} rows")
+        if engine == 'pyarrow':
+            if schema is None:
+                schema = {'columns': expected_columns, 'dtypes': {}, 'date_formats': {}}
+            return _iter_chunks(file_path, chunksize, arrow_convert_options(file_path, schema),
+                                arrow_convert_options(file_path, schema, typed=False), engine, quarantine_dir)
+        if schema is None:
+            return _iter_chunks(file_path, chunksize, {}, quarantine_dir=quarantine_dir)
+        return _iter_chunks(file_path, chunksize, read_options(file_path, schema),
+                            read_options(file_path, schema, typed=False), quarantine_dir=quarantine_dir)
+
+    except pd.errors.ParserError as e:
+        logger.error(f"Error parsing CSV file {file_path}: {e}")
+        return None
     except Exception as e:
-        logger.error(f"Unexpected error extracting orders from {file_path}: {e}")
-        return pd.DataFrame()
+        logger.error(f"Unexpected error opening {file_path} for streaming: {e}")
+        return None
+
+def _arrow_chunks(file_path: str, chunksize: int, convert_options,
+                  bad_lines: Optional[list] = None) -> Iterator[pd.DataFrame]:
+    """
+    Stream a CSV file with pyarrow in chunks of exactly chunksize rows.
+
+    Arrow reads in blocks of bytes, so record batches are regrouped by row
+    count. Each chunk is indexed by its row position in the file, like the
+    chunks of the C reader.
+    """
+    avg_row_bytes = average_row_bytes(file_path) or ARROW_MIN_BLOCK_BYTES
+    block_size = max(int(chunksize * avg_row_bytes), ARROW_MIN_BLOCK_BYTES)
+    read_options = pa_csv.ReadOptions(block_size=block_size)
+
+    start = 0
+    pending = []
+    pending_rows = 0
+
+    def to_frame(table):
+        chunk = arrow_to_pandas(table)
+        chunk.index = pd.RangeIndex(start, start + len(chunk))
+        return chunk
+
+    try:
+        with open_source(file_path) as source, pa_csv.open_csv(
+                source, read_options=read_options, convert_options=convert_options,
+                parse_options=arrow_parse_options(bad_lines)) as reader:
+            for batch in reader:
+                pending.append(batch)
+                pending_rows += batch.num_rows
+                while pending_rows >= chunksize:
+                    table = pa.Table.from_batches(pending)
+                    yield to_frame(table.slice(0, chunksize))
+                    start += chunksize
+                    rest = table.slice(chunksize)
+                    pending = rest.to_batches()
+                    pending_rows = rest.num_rows
+    except pa.ArrowInvalid as e:
+        raise _arrow_error(e) from e
+
+    if pending_rows:
+        yield to_frame(pa.Table.from_batches(pending))
+
+def _read_chunks(file_path: str, chunksize: int, options, engine: str,
+                 bad_lines: Optional[list] = None) -> Iterator[pd.DataFrame]:
+    """
+    Chunks from the given engine; options are read_csv keyword arguments
+    for the C engine and ConvertOptions for pyarrow. With a bad_lines list,
+    malformed lines are skipped and collected there.
+    """
+    if engine == 'pyarrow':
+        yield from _arrow_chunks(file_path, chunksize, options, bad_lines)
+        return
+    options, usecols = _split_usecols(options)
+    if bad_lines is None:
+        with open_source(file_path) as source, pd.read_csv(source, chunksize=chunksize, **options) as reader:
+            for chunk in reader:
+                yield _select_columns(chunk, usecols)
+        return
+
+    with open_source(file_path) as source, pd.read_csv(source, chunksize=chunksize, on_bad_lines='warn',
+                                                       **options) as reader:
+        while True:
+            # Only the parse holds the capture, never the consumer's work
+            with capture_bad_lines(bad_lines):
+                chunk = next(reader, None)
+            if chunk is None:
+                return
+            yield _select_columns(chunk, usecols)
+
+def _iter_chunks(file_path: str, chunksize: int, options, fallback_options=None,
+                 engine: str = 'c', quarantine_dir: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Yield chunks from the CSV reader, logging progress.
+
+    If a chunk does not fit the declared dtypes, the rest of the file is
+    streamed with fallback_options instead, skipping the rows already
+    yielded. Parser errors part-way through the file are logged and
+    re-raised so the caller can abort the run. With a quarantine_dir,
+    malformed lines are skipped and quarantined once the stream ends.
+    """
+    total_rows = 0
+    bad_lines = None if quarantine_dir is None else []
+    try:
+        try:
+            for chunk in _read_chunks(file_path, chunksize, options, engine, bad_lines):
+                total_rows += len(chunk)
+                yield chunk
+        except (ValueError, TypeError) as e:
+            if fallback_options is None or not _is_type_mismatch(e):
+                raise
+            logger.warning(f"{file_path} does not match its declared column types after "
+                           f"{total_rows} rows ({e}), inferring types")
+            skip = total_rows
+            for chunk in _read_chunks(file_path, chunksize, fallback_options, engine, bad_lines):
+                if skip >= len(chunk):
+                    skip -= len(chunk)
+                    continue
+                chunk = chunk.iloc[skip:]
+                skip = 0
+                total_rows += len(chunk)
+                yield chunk
+    except pd.errors.ParserError as e:
+        logger.error(f"Error parsing CSV file {file_path} after {total_rows} rows: {e}")
+        raise
+    finally:
+        if bad_lines:
+            # A re-read after a type mismatch meets the same lines again
+            unique = list({entry['line']: entry for entry in bad_lines}.values())
+            quarantine_bad_lines(file_path, unique, quarantine_dir)
+
+    logger.info(f"Successfully streamed {total_rows} rows from {file_path}")
+
+def _chain_chunks(streams: List[Iterator[pd.DataFrame]]) -> Iterator[pd.DataFrame]:
+    """
+    Stream several chunk streams one after another as a single dataset,
+    indexing rows by their position across all of them.
+    """
+    offset = 0
+    for stream in streams:
+        rows = 0
+        for chunk in stream:
+            rows += len(chunk)
+            chunk.index = chunk.index + offset
+            yield chunk
+        offset += rows
+
+def extract_table_chunks(file_path: str, table: str, chunksize: Optional[int] = None,
+                         chunk_bytes: Optional[int] = None, engine: str = 'c',
+                         sample_rows: int = DEFAULT_SAMPLE_ROWS, start_date=None,
+                         end_date=None, quarantine_dir: Optional[str] = None) -> Optional[Iterator[pd.DataFrame]]:
+    """
+    Stream a table from a single CSV file, a glob pattern or a partitioned
+    directory in bounded-size chunks. Every shard is validated before
+    streaming starts; shards are then streamed in path order so memory stays
+    bounded. Returns None if any shard is missing or malformed.
+    """
+    schema = SOURCE_SCHEMAS[table]
+    if not is_multi_source(file_path):
+        return extract_chunks(file_path, schema['columns'], chunksize, chunk_bytes, schema, engine, sample_rows,
+                              quarantine_dir)
+
+    shards = table_shards(file_path, table, start_date, end_date)
+    if shards is None:
+        return None
+
+    streams = []
+    for shard in shards:
+        stream = extract_chunks(shard, schema['columns'], chunksize, chunk_bytes, schema, engine, sample_rows,
+                                quarantine_dir)
+        if stream is None:
+            return None
+        streams.append(stream)
+    return _chain_chunks(streams)
+
+def extract_customers_chunks(file_path: str, chunksize: Optional[int] = None,
+                             chunk_bytes: Optional[int] = None, **options) -> Optional[Iterator[pd.DataFrame]]:
+    """
+    Stream customer data in bounded-size chunks (see extract_table_chunks).
+    """
+    return extract_table_chunks(file_path, 'customers', chunksize, chunk_bytes, **options)
+
+def extract_orders_chunks(file_path: str, chunksize: Optional[int] = None,
+                          chunk_bytes: Optional[int] = None, **options) -> Optional[Iterator[pd.DataFrame]]:
+    """
+    Stream order data in bounded-size chunks (see extract_table_chunks).
+    """
+    return extract_table_chunks(file_path, 'orders', chunksize, chunk_bytes, **options)
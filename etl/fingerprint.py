@@ -0,0 +1,37 @@
+import hashlib
+import json
+import os
+
+# Bytes read at a time while hashing file contents
+HASH_BLOCK_BYTES = 1 << 20
+
+def file_digest(file_path: str) -> str:
+    """
+    BLAKE2b digest of a file's contents, read in fixed-size blocks.
+    """
+    digest = hashlib.blake2b(digest_size=32)
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def file_fingerprint(file_path: str) -> dict:
+    """
+    Identity of an input file: absolute path, size, modification time and
+    content digest.
+    """
+    stat = os.stat(file_path)
+    return {
+        "path": os.path.abspath(file_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "digest": file_digest(file_path),
+    }
+
+def fingerprint_key(*parts) -> str:
+    """
+    Stable hex key for JSON-serializable parts, e.g. a file fingerprint plus
+    the options it was read with.
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
@@ -0,0 +1,104 @@
+import logging
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Ids spanning at most this many values per id get a direct lookup table,
+# one byte per value in their range, instead of a hash table
+DENSE_SPAN_FACTOR = 8
+
+def int_ids(values) -> tuple:
+    """
+    Integer form of a column of ids and a mask of the values that are whole
+    numbers. Missing, non-numeric and fractional values are masked out.
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_integer_dtype(values) and not values.hasnans:
+        return values.to_numpy(dtype=np.int64), np.ones(len(values), dtype=bool)
+
+    if not pd.api.types.is_numeric_dtype(values):
+        values = pd.to_numeric(values, errors='coerce')
+    numbers = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = np.isfinite(numbers) & (numbers == np.floor(numbers))
+    return np.where(valid, numbers, 0).astype(np.int64), valid
+
+class IdIndex:
+    """
+    Compact set of integer ids for validating foreign keys, stored as a
+    sorted array of the distinct ids. Lookups go through a direct table over
+    the id range when the ids are dense, or a hash table otherwise. Either is
+    built once and reused for every chunk. The index pickles to the id array
+    alone for worker processes and can be saved and memory-mapped back.
+    """
+
+    def __init__(self, ids: np.ndarray):
+        # ids must be sorted and distinct; use from_values otherwise
+        self.ids = ids
+        self.table = None
+        self.hashed = None
+        if len(ids):
+            span = int(ids[-1]) - int(ids[0]) + 1
+            if span <= DENSE_SPAN_FACTOR * len(ids):
+                self.table = np.zeros(span, dtype=bool)
+                self.table[ids - ids[0]] = True
+
+    def __reduce__(self):
+        # Ship only the ids; lookup structures are rebuilt on the other side
+        return (IdIndex, (np.asarray(self.ids),))
+
+    @classmethod
+    def from_values(cls, values) -> 'IdIndex':
+        """
+        Index of the distinct whole-number values of a column of ids.
+        """
+        ids, valid = int_ids(values)
+        return cls(np.unique(ids[valid]))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def contains(self, values: pd.Series) -> pd.Series:
+        """
+        Mask of the values that are ids in the index, with the index of
+        values. Missing and non-integer values are never contained.
+        """
+        ids, valid = int_ids(values)
+        if self.table is not None:
+            offsets = ids - self.ids[0]
+            valid &= (offsets >= 0) & (offsets < len(self.table))
+            valid &= self.table[np.where(valid, offsets, 0)]
+        else:
+            if self.hashed is None:
+                # pandas builds the hash table on first lookup and keeps it
+                self.hashed = pd.Index(self.ids)
+            valid &= self.hashed.get_indexer(ids) >= 0
+        return pd.Series(valid, index=values.index)
+
+    def save(self, path: str):
+        """
+        Write the index to path as a NumPy array, atomically.
+        """
+        index_dir = os.path.dirname(path)
+        if index_dir:
+            os.makedirs(index_dir, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as f:
+            np.save(f, self.ids)
+        os.replace(temp_path, path)
+        logger.info(f"Saved index of {len(self)} ids to {path}")
+
+    @classmethod
+    def load(cls, path: str) -> Optional['IdIndex']:
+        """
+        Memory-map an index saved with save, or None if it cannot be read.
+        Processes loading the same file share its pages.
+        """
+        try:
+            return cls(np.load(path, mmap_mode='r'))
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not load id index {path}: {e}")
+            return None
@@ -1,12 +1,72 @@
+import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, inspect, text
 import json
 import os
 import logging
+import tempfile
+import threading
+import time
 from typing import Optional
+from etl.schema import has_schema, create_table, create_indexes
+from etl.id_index import int_ids
 
 logger = logging.getLogger(__name__)
 
+# 'replace' rewrites the table, 'append' adds rows, 'upsert' inserts new rows
+# and updates changed ones keyed on UPSERT_KEY, 'swap' loads a staging table
+# and atomically renames it over the live one
+LOAD_MODES = ('replace', 'append', 'upsert', 'swap')
+
+UPSERT_KEY = 'id'
+
+# How rows are written: 'to_sql' uses pandas inserts, 'bulk' uses the
+# database's native bulk path (LOAD DATA LOCAL INFILE on MySQL), 'batched'
+# sends INSERTs of batch_size rows, one transaction per batch
+LOAD_STRATEGIES = ('to_sql', 'bulk', 'batched')
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Rows formatted per write when serializing a frame for LOAD DATA
+BULK_WRITE_ROWS = 100000
+
+# Connection pool settings for MySQL engines, overridable under "pool" in db_config.json
+DEFAULT_POOL_OPTIONS = {
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pool_pre_ping": True,
+    "pool_recycle": 3600
+}
+
+# Engines shared by every load in this process, keyed by database URL
+_engines = {}
+_engines_lock = threading.RLock()
+
+# Engine resolved by get_engine() for the current run
+_run_engine = None
+
+def get_pooled_engine(db_url: str, **pool_options):
+    """
+    Return the process-wide engine for db_url, creating it on first use.
+    """
+    with _engines_lock:
+        engine = _engines.get(db_url)
+        if engine is None:
+            engine = create_engine(db_url, **pool_options)
+            _engines[db_url] = engine
+        return engine
+
+def dispose_engines():
+    """
+    Close every pooled connection and forget all registered engines.
+    """
+    global _run_engine
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+        _run_engine = None
+
 def get_db_config():
     """
     Create a SQLAlchemy engine for db_config.json
@@ -31,8 +91,12 @@ def get_db_config():
         password = config.get('password', '')
         db_url = f"mysql+pymysql://{config['user']}:{password}@{config['host']}/{config['database']}"
         
-        # Create engine and test connection
-        engine = create_engine(db_url)
+        # Create (or reuse) the pooled engine and test connection
+        pool_options = {**DEFAULT_POOL_OPTIONS, **config.get('pool', {})}
+        if config.get('local_infile'):
+            # Required by the 'bulk' load strategy (LOAD DATA LOCAL INFILE)
+            pool_options['connect_args'] = {'local_infile': True}
+        engine = get_pooled_engine(db_url, **pool_options)
         
         # Test the connection immediately
         try:
@@ -57,13 +121,48 @@ def get_mock_db_config():
     """
     try:
         db_url = "sqlite:///etl_test.db"
-        engine = create_engine(db_url)
+        engine = get_pooled_engine(db_url)
         logger.info("Created SQLite engine for testing")
         return engine
     except Exception as e:
         logger.error(f"Error creating SQLite engine: {e}")
         return None
 
+def get_engine():
+    """
+    Return the engine shared by every table load in this run.
+    The first call connects to MySQL, falling back to SQLite, and verifies
+    the connection; later calls reuse the same engine and pool without
+    another round trip.
+    """
+    global _run_engine
+    with _engines_lock:
+        if _run_engine is not None:
+            return _run_engine
+
+        engine = get_db_config()
+        if engine is None:
+            logger.warning("MySQL connection failed, trying SQLite for testing")
+            engine = get_mock_db_config()
+            if engine is None:
+                return None
+
+            if not test_database_connection(engine):
+                logger.warning("Database connection test failed, but continuing...")
+
+        _run_engine = engine
+        return engine
+
+def max_concurrent_loads(requested: int) -> int:
+    """
+    Number of tables that may be loaded at once on this run's engine.
+    SQLite allows a single writer, so its loads run one at a time.
+    """
+    engine = get_engine()
+    if engine is not None and engine.dialect.name == 'sqlite':
+        return 1
+    return requested
+
 def test_database_connection(engine):
     """
     Test database connection separately.
@@ -101,9 +200,13 @@ def validate_dataframe(df: pd.DataFrame, table_name: str) -> bool:
     
     return True
 
-def create_table_if_not_exists(engine, table_name: str, df: pd.DataFrame):
+def create_table_if_not_exists(engine, table_name: str, df: pd.DataFrame,
+                               schema_name: Optional[str] = None) -> bool:
     """
     Create table with proper schema if it doesn't exist.
+    The typed schema of schema_name (default table_name) is used when it
+    covers the frame's columns, otherwise column types are inferred from the
+    frame. Returns True if the table was created.
     """
     try:
         with engine.connect() as conn:
@@ -124,50 +227,538 @@ def create_table_if_not_exists(engine, table_name: str, df: pd.DataFrame):
             if not table_exists:
                 logger.info(f"Creating table {table_name}")
                 
-                # Create table based on dataframe structure
-                df.head(0).to_sql(name=table_name, con=engine, if_exists='replace', index=False)
+                schema_name = schema_name or table_name
+                if has_schema(schema_name, df.columns):
+                    create_table(engine, schema_name, table_name)
+                else:
+                    # Create table based on dataframe structure
+                    logger.warning(f"No schema covers the columns of {table_name}, inferring types")
+                    df.head(0).to_sql(name=table_name, con=engine, if_exists='replace', index=False)
                 logger.info(f"Table {table_name} created successfully")
+                return True
             else:
                 logger.info(f"Table {table_name} already exists")
+                return False
                 
     except Exception as e:
         logger.error(f"Error creating table {table_name}: {e}")
         raise
 
-def load_to_mysql(df: pd.DataFrame, table_name: str) -> bool:
+def _format_bulk_column(series: pd.Series) -> pd.Series:
+    """
+    Render a column as text for MySQL's LOAD DATA default escaping rules.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        text_values = series.dt.strftime('%Y-%m-%d %H:%M:%S')
+    elif pd.api.types.is_bool_dtype(series):
+        text_values = series.astype(int).astype(str)
+    elif pd.api.types.is_numeric_dtype(series):
+        text_values = series.astype(str)
+    else:
+        text_values = (series.astype(str)
+                       .str.replace('\\', '\\\\', regex=False)
+                       .str.replace('\t', '\\t', regex=False)
+                       .str.replace('\n', '\\n', regex=False)
+                       .str.replace('\r', '\\r', regex=False))
+    return text_values.where(series.notna(), '\\N').astype(object)
+
+def write_bulk_file(df: pd.DataFrame, file_obj):
+    """
+    Write a DataFrame as tab-delimited text that LOAD DATA reads with its
+    default FIELDS/LINES options.
+    """
+    for start in range(0, len(df), BULK_WRITE_ROWS):
+        part = df.iloc[start:start + BULK_WRITE_ROWS]
+        columns = [_format_bulk_column(part[column]) for column in part.columns]
+        lines = columns[0].str.cat(columns[1:], sep='\t') if len(columns) > 1 else columns[0]
+        file_obj.write('\n'.join(lines))
+        file_obj.write('\n')
+
+def _bulk_load_mysql(engine, df: pd.DataFrame, table_name: str):
+    """
+    Load a DataFrame through a temporary file and LOAD DATA LOCAL INFILE.
+    """
+    # Closed before loading so the client can reopen it on every platform
+    with tempfile.NamedTemporaryFile('w', suffix='.tsv', encoding='utf-8', newline='\n', delete=False) as f:
+        write_bulk_file(df, f)
+
+    try:
+        file_path = f.name.replace('\\', '/').replace("'", "\\'")
+        columns = ', '.join(f"`{column}`" for column in df.columns)
+        sql = (f"LOAD DATA LOCAL INFILE '{file_path}' INTO TABLE `{table_name}` "
+               f"CHARACTER SET utf8mb4 ({columns})")
+        with engine.begin() as conn:
+            conn.exec_driver_sql(sql)
+    finally:
+        os.remove(f.name)
+
+def _insert_values(df: pd.DataFrame, dialect: str) -> list:
+    """
+    Convert a DataFrame to a list of plain Python row tuples for executemany.
+    Datetimes become text in the format each backend stores, NaN becomes None.
+    """
+    # SQLite gets the text format SQLAlchemy uses for its DATETIME columns
+    date_format = '%Y-%m-%d %H:%M:%S.%f' if dialect == 'sqlite' else '%Y-%m-%d %H:%M:%S'
+    values = df.copy()
+    for column in values.columns:
+        if pd.api.types.is_datetime64_any_dtype(values[column]):
+            values[column] = values[column].dt.strftime(date_format)
+    values = values.astype(object).where(values.notna(), None)
+    return list(values.itertuples(index=False, name=None))
+
+def _insert_sql(engine, df: pd.DataFrame, table_name: str) -> str:
+    """
+    Parameterized INSERT statement for all columns of df.
+    """
+    quote = engine.dialect.identifier_preparer.quote
+    columns = ', '.join(quote(column) for column in df.columns)
+    marker = '?' if engine.dialect.paramstyle == 'qmark' else '%s'
+    placeholders = ', '.join(marker for _ in df.columns)
+    return f"INSERT INTO {quote(table_name)} ({columns}) VALUES ({placeholders})"
+
+def _bulk_load_sqlite(engine, df: pd.DataFrame, table_name: str):
+    """
+    Load a DataFrame with one executemany over the raw SQLite connection,
+    bypassing per-row type processing in SQLAlchemy.
+    """
+    raw_conn = engine.raw_connection()
+    try:
+        cursor = raw_conn.cursor()
+        cursor.executemany(_insert_sql(engine, df, table_name), _insert_values(df, 'sqlite'))
+        raw_conn.commit()
+    except Exception:
+        raw_conn.rollback()
+        raise
+    finally:
+        raw_conn.close()
+
+def bulk_load(engine, df: pd.DataFrame, table_name: str, mode: str = 'replace'):
+    """
+    Load a DataFrame using the database's native bulk path.
+    The table must already exist; with mode='replace' it is emptied first.
+    """
+    if mode == 'replace':
+        df.head(0).to_sql(name=table_name, con=engine, if_exists='replace', index=False)
+
+    dialect = engine.dialect.name
+    if dialect == 'mysql':
+        _bulk_load_mysql(engine, df, table_name)
+    elif dialect == 'sqlite':
+        _bulk_load_sqlite(engine, df, table_name)
+    else:
+        logger.warning(f"No bulk load path for {dialect}, falling back to to_sql")
+        df.to_sql(name=table_name, con=engine, if_exists='append', index=False)
+
+def batched_load(engine, df: pd.DataFrame, table_name: str, mode: str = 'replace',
+                 batch_size: int = DEFAULT_BATCH_SIZE) -> list:
+    """
+    Insert a DataFrame in batches of batch_size rows.
+    Each batch is sent as one executemany, which pymysql turns into multi-row
+    INSERT statements, and is committed in its own transaction. Per-batch
+    throughput is logged and returned as a list of dicts with rows, seconds
+    and rows_per_second.
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+
+    if mode == 'replace':
+        df.head(0).to_sql(name=table_name, con=engine, if_exists='replace', index=False)
+
+    sql = _insert_sql(engine, df, table_name)
+    stats = []
+    for start in range(0, len(df), batch_size):
+        batch = df.iloc[start:start + batch_size]
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            conn.exec_driver_sql(sql, _insert_values(batch, engine.dialect.name))
+        seconds = time.perf_counter() - started
+
+        rows_per_second = len(batch) / seconds if seconds > 0 else float('inf')
+        stats.append({"rows": len(batch), "seconds": seconds, "rows_per_second": rows_per_second})
+        logger.info(f"Loaded batch {len(stats)} of {table_name}: {len(batch)} rows "
+                    f"in {seconds:.3f}s ({rows_per_second:,.0f} rows/s)")
+
+    return stats
+
+def ensure_unique_key(conn, table_name: str, key: str = UPSERT_KEY):
+    """
+    Make sure key is a primary key or has a unique index, which the
+    database needs to detect conflicting rows on upsert. Runs in the
+    caller's transaction on conn.
+    """
+    inspector = inspect(conn)
+    if inspector.get_pk_constraint(table_name).get('constrained_columns') == [key]:
+        return
+    for index in inspector.get_indexes(table_name):
+        if index.get('unique') and index.get('column_names') == [key]:
+            return
+
+    index_name = f"ux_{table_name}_{key}"
+    quote = conn.dialect.identifier_preparer.quote
+    logger.info(f"Creating unique index {index_name} on {table_name}({key})")
+    conn.exec_driver_sql(f"CREATE UNIQUE INDEX {quote(index_name)} ON {quote(table_name)} ({quote(key)})")
+
+def _upsert_sql(engine, df: pd.DataFrame, table_name: str, key: str = UPSERT_KEY) -> str:
+    """
+    INSERT statement that updates the existing row on a key conflict.
+    Rows whose values are unchanged are left untouched.
+    """
+    quote = engine.dialect.identifier_preparer.quote
+    insert = _insert_sql(engine, df, table_name)
+    update_columns = [quote(column) for column in df.columns if column != key]
+    dialect = engine.dialect.name
+
+    if dialect == 'mysql':
+        # MySQL skips the write when every assigned value is unchanged
+        assignments = ', '.join(f"{column} = VALUES({column})" for column in update_columns)
+        return f"{insert} ON DUPLICATE KEY UPDATE {assignments}"
+    if dialect == 'sqlite':
+        assignments = ', '.join(f"{column} = excluded.{column}" for column in update_columns)
+        changed = ' OR '.join(f"{quote(table_name)}.{column} IS NOT excluded.{column}"
+                              for column in update_columns)
+        return f"{insert} ON CONFLICT ({quote(key)}) DO UPDATE SET {assignments} WHERE {changed}"
+    raise ValueError(f"Upsert is not supported for {dialect}")
+
+def upsert_load(engine, df: pd.DataFrame, table_name: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                key: str = UPSERT_KEY) -> int:
+    """
+    Insert new rows and update changed rows keyed on key, leaving unchanged
+    and absent rows alone. Each batch is committed in its own transaction.
+    Returns the number of rows sent.
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+
+    sql = _upsert_sql(engine, df, table_name, key)
+
+    # Check the key and upsert on one connection: SQLite rejects ON CONFLICT
+    # on a connection whose cached schema predates the unique index
+    with engine.connect() as conn:
+        with conn.begin():
+            ensure_unique_key(conn, table_name, key)
+        for start in range(0, len(df), batch_size):
+            batch = df.iloc[start:start + batch_size]
+            with conn.begin():
+                conn.exec_driver_sql(sql, _insert_values(batch, engine.dialect.name))
+
+    logger.info(f"Upserted {len(df)} rows into {table_name} on {key}")
+    return len(df)
+
+def write_dataframe(engine, df: pd.DataFrame, table_name: str, mode: str = 'replace',
+                    strategy: str = 'to_sql', batch_size: int = DEFAULT_BATCH_SIZE):
+    """
+    Write a DataFrame to an existing table with the given load strategy.
+    Upserts always go through batched statements whatever the strategy.
+    """
+    if mode == 'upsert':
+        upsert_load(engine, df, table_name, batch_size)
+    elif strategy == 'bulk':
+        bulk_load(engine, df, table_name, mode)
+    elif strategy == 'batched':
+        batched_load(engine, df, table_name, mode, batch_size)
+    else:
+        df.to_sql(name=table_name, con=engine, if_exists=mode, index=False)
+
+def table_exists(engine, table_name: str) -> bool:
+    """
+    Check whether a table exists.
+    """
+    return inspect(engine).has_table(table_name)
+
+def staging_table_name(table_name: str) -> str:
+    """
+    Unique name for a staging table that will replace table_name.
+    """
+    return f"{table_name}_staging_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S_%f')}"
+
+def backup_table_name(table_name: str) -> str:
+    """
+    Name under which a swap keeps the previous version of table_name.
+    """
+    return f"{table_name}_backup"
+
+def drop_table(engine, table_name: str):
+    """
+    Drop a table if it exists.
+    """
+    quote = engine.dialect.identifier_preparer.quote
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"DROP TABLE IF EXISTS {quote(table_name)}")
+
+def swap_in_staging(engine, table_name: str, staging_name: str):
+    """
+    Index a fully loaded staging table and atomically swap it in.
+    The previous live table becomes the backup, replacing the old backup, so
+    readers never see a missing or partially loaded table and nothing is
+    copied. On SQLite the backup keeps no secondary indexes.
+    """
+    create_indexes(engine, table_name, staging_name)
+
+    quote = engine.dialect.identifier_preparer.quote
+    live, staging = quote(table_name), quote(staging_name)
+    backup_name = backup_table_name(table_name)
+    backup = quote(backup_name)
+    live_exists = table_exists(engine, table_name)
+
+    if engine.dialect.name == 'sqlite':
+        # SQLite DDL is transactional, but pysqlite only opens transactions
+        # for DML, so begin one explicitly around the drop and both renames
+        raw_conn = engine.raw_connection()
+        try:
+            cursor = raw_conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(f"DROP TABLE IF EXISTS {backup}")
+            if live_exists:
+                # Index names move with a renamed table; drop the outgoing
+                # table's indexes so the next load can reuse their names
+                cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' "
+                               "AND tbl_name = ? AND sql IS NOT NULL", (table_name,))
+                for (name,) in cursor.fetchall():
+                    cursor.execute(f"DROP INDEX {quote(name)}")
+                cursor.execute(f"ALTER TABLE {live} RENAME TO {backup}")
+            cursor.execute(f"ALTER TABLE {staging} RENAME TO {live}")
+            raw_conn.commit()
+        except Exception:
+            raw_conn.rollback()
+            raise
+        finally:
+            raw_conn.close()
+    else:
+        # MySQL applies a multi-table RENAME atomically
+        drop_table(engine, backup_name)
+        renames = f"{live} TO {backup}, {staging} TO {live}" if live_exists else f"{staging} TO {live}"
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"RENAME TABLE {renames}")
+
+    logger.info(f"Swapped {staging_name} in as {table_name}" +
+                (f", previous version kept as {backup_name}" if live_exists else ""))
+
+def swap_load(engine, df: pd.DataFrame, table_name: str, strategy: str = 'to_sql',
+              batch_size: int = DEFAULT_BATCH_SIZE):
+    """
+    Load a DataFrame into a new staging table and swap it in for table_name.
+    The staging table is dropped if anything fails before the swap.
+    """
+    staging_name = staging_table_name(table_name)
+    try:
+        create_table_if_not_exists(engine, staging_name, df, table_name)
+        write_dataframe(engine, df, staging_name, 'append', strategy, batch_size)
+        swap_in_staging(engine, table_name, staging_name)
+    except Exception:
+        drop_table(engine, staging_name)
+        raise
+
+def finish_swap(table_name: str, staging_name: str, success: bool = True) -> bool:
+    """
+    Complete a swap whose staging table was loaded piece by piece, as chunked
+    runs do: swap it in on success, otherwise drop it. A staging table that
+    cannot be swapped in is dropped too. Returns True only if it was swapped in.
+    """
+    engine = get_engine()
+    if engine is None:
+        return False
+
+    if success:
+        try:
+            swap_in_staging(engine, table_name, staging_name)
+            return True
+        except Exception as e:
+            logger.error(f"Error swapping in {staging_name} for {table_name}: {e}")
+
+    try:
+        drop_table(engine, staging_name)
+    except Exception as e:
+        logger.error(f"Error dropping staging table {staging_name}: {e}")
+    return False
+
+def build_table_indexes(table_name: str, physical_name: Optional[str] = None) -> bool:
+    """
+    Build a table's secondary indexes once loading has finished, as chunked
+    runs do after their last chunk.
+    """
+    try:
+        engine = get_engine()
+        if engine is None:
+            return False
+
+        create_indexes(engine, table_name, physical_name)
+        return True
+
+    except Exception as e:
+        logger.error(f"Error building indexes for {table_name}: {e}")
+        return False
+
+def load_to_mysql(df: pd.DataFrame, table_name: str, mode: str = 'replace',
+                  strategy: str = 'to_sql', batch_size: int = DEFAULT_BATCH_SIZE,
+                  target_table: Optional[str] = None, build_indexes: bool = True) -> bool:
     """
     Load a DataFrame to a MySQL table.
-    If the table exists, it will be replaced.
+    With mode='replace' an existing table is replaced; with mode='append'
+    rows are added to it, which is how chunked runs load every chunk after
+    the first; with mode='upsert' new rows are inserted and changed rows
+    updated by id, so unchanged rows cost no writes; with mode='swap' rows
+    go to a staging table that atomically replaces the live one.
+    strategy selects how rows are written (see LOAD_STRATEGIES) and
+    batch_size applies to batched writes. target_table writes to a different
+    physical table, such as a staging table, while validating the data as
+    table_name.
+    Tables are created with typed columns and a primary key on id. Secondary
+    indexes are built after the rows are written, whenever this call created
+    the table; pass build_indexes=False to defer them to build_table_indexes.
     """
     try:
+        if mode not in LOAD_MODES:
+            logger.error(f"Unknown load mode for {table_name}: {mode}")
+            return False
+
+        if strategy not in LOAD_STRATEGIES:
+            logger.error(f"Unknown load strategy for {table_name}: {strategy}")
+            return False
+
         # Validate dataframe
         if not validate_dataframe(df, table_name):
             return False
         
-        # Get database connection
-        engine = get_db_config()
+        # Get the shared database connection
+        engine = get_engine()
         if engine is None:
-            logger.warning("MySQL connection failed, trying SQLite for testing")
-            engine = get_mock_db_config()
-            if engine is None:
-                return False
+            return False
         
-        # Test connection
-        if not test_database_connection(engine):
-            logger.warning("Database connection test failed, but continuing...")
+        if mode == 'swap':
+            swap_load(engine, df, table_name, strategy, batch_size)
+            logger.info(f"Successfully loaded {len(df)} rows to {table_name}")
+            return True
         
-        # Create table if needed
-        create_table_if_not_exists(engine, table_name, df)
+        # Create table if needed; replace recreates it with the typed schema
+        target_table = target_table or table_name
+        if mode == 'replace':
+            drop_table(engine, target_table)
+            mode = 'append'
+        created = create_table_if_not_exists(engine, target_table, df, table_name)
         
-        # Load data
-        df.to_sql(name=table_name, con=engine, if_exists='replace', index=False)
-        logger.info(f"Successfully loaded {len(df)} rows to {table_name}")
+        # Load data, then index it
+        write_dataframe(engine, df, target_table, mode, strategy, batch_size)
+        if created and build_indexes:
+            create_indexes(engine, table_name, target_table)
+        logger.info(f"Successfully loaded {len(df)} rows to {target_table}")
         return True
         
     except Exception as e:
         logger.error(f"Error loading data to {table_name}: {e}")
         return False
 
+def delete_rows(engine, table_name: str, keys, key: str = UPSERT_KEY,
+                batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Delete rows whose key is in keys, batch_size keys per statement, each
+    in its own transaction. Returns the number of keys requested for
+    deletion.
+    """
+    keys = pd.Index(keys).tolist()
+    quote = engine.dialect.identifier_preparer.quote
+    marker = '?' if engine.dialect.paramstyle == 'qmark' else '%s'
+
+    for start in range(0, len(keys), batch_size):
+        batch = keys[start:start + batch_size]
+        placeholders = ', '.join(marker for _ in batch)
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"DELETE FROM {quote(table_name)} WHERE {quote(key)} IN ({placeholders})",
+                                 tuple(batch))
+
+    logger.info(f"Deleted {len(keys)} rows from {table_name}")
+    return len(keys)
+
+class TableIdLookup:
+    """
+    Membership test for ids against the key column of a loaded table, with
+    the same contains interface as etl.id_index.IdIndex, so clean_orders can
+    validate customer ids without the customers input. Each call queries
+    only the distinct ids it has not seen before, batch_size per IN query on
+    the indexed key, and remembers the answers, so a stream of chunks looks
+    each id up once.
+    """
+
+    def __init__(self, engine, table_name: str, key: str = UPSERT_KEY,
+                 batch_size: int = DEFAULT_BATCH_SIZE):
+        self.engine = engine
+        self.table_name = table_name
+        self.key = key
+        self.batch_size = batch_size
+        # Sorted distinct ids already looked up, and those of them found
+        self.checked = np.empty(0, dtype=np.int64)
+        self.found = np.empty(0, dtype=np.int64)
+        self._lock = threading.Lock()
+
+    def _query(self, ids: np.ndarray) -> np.ndarray:
+        quote = self.engine.dialect.identifier_preparer.quote
+        marker = '?' if self.engine.dialect.paramstyle == 'qmark' else '%s'
+        found = []
+        with self.engine.connect() as conn:
+            for start in range(0, len(ids), self.batch_size):
+                batch = ids[start:start + self.batch_size].tolist()
+                placeholders = ', '.join(marker for _ in batch)
+                result = conn.exec_driver_sql(f"SELECT {quote(self.key)} FROM {quote(self.table_name)} "
+                                              f"WHERE {quote(self.key)} IN ({placeholders})", tuple(batch))
+                found.extend(row[0] for row in result)
+        return np.unique(np.asarray(found, dtype=np.int64))
+
+    def contains(self, values: pd.Series) -> pd.Series:
+        """
+        Mask of the values that are keys in the table, with the index of
+        values. Missing and non-integer values are never contained.
+        """
+        ids, valid = int_ids(values)
+        with self._lock:
+            new = np.setdiff1d(np.unique(ids[valid]), self.checked, assume_unique=True)
+            if len(new):
+                hits = self._query(new)
+                self.checked = np.union1d(self.checked, new)
+                self.found = np.union1d(self.found, hits)
+                logger.info(f"Looked up {len(new)} ids in {self.table_name}: {len(hits)} found")
+            found = self.found
+        valid &= np.isin(ids, found)
+        return pd.Series(valid, index=values.index)
+
+def table_id_lookup(table_name: str, key: str = UPSERT_KEY,
+                    batch_size: int = DEFAULT_BATCH_SIZE) -> Optional[TableIdLookup]:
+    """
+    Id lookup against a loaded table on this run's engine, or None if there
+    is no connection or the table has not been loaded.
+    """
+    engine = get_engine()
+    if engine is None:
+        logger.error(f"No database connection to validate against {table_name}")
+        return None
+    if not table_exists(engine, table_name):
+        logger.error(f"Cannot validate against {table_name}: the table has not been loaded")
+        return None
+    return TableIdLookup(engine, table_name, key, batch_size)
+
+def apply_changes(changes: dict, table_name: str, batch_size: int = DEFAULT_BATCH_SIZE) -> bool:
+    """
+    Load only the rows that changed since the last run: upsert inserted and
+    updated rows and delete removed ones. changes comes from
+    etl.changes.detect_changes.
+    """
+    try:
+        changed = pd.concat([changes['inserted'], changes['updated']])
+        if not changed.empty:
+            if not load_to_mysql(changed, table_name, 'upsert', batch_size=batch_size):
+                return False
+
+        if len(changes['deleted']):
+            engine = get_engine()
+            if engine is None:
+                return False
+            delete_rows(engine, table_name, changes['deleted'], batch_size=batch_size)
+
+        logger.info(f"Applied changes to {table_name}: {changes['counts']}")
+        return True
+
+    except Exception as e:
+        logger.error(f"Error applying changes to {table_name}: {e}")
+        return False
+
 def backup_table(engine, table_name: str) -> bool:
     """
     Create a backup of the existing table before replacing it.
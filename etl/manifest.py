@@ -0,0 +1,94 @@
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Dict, Iterable, Set
+
+from etl.fingerprint import file_fingerprint, fingerprint_key
+from etl.sources import resolve_sources
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MANIFEST_PATH = '.etl_state/run_manifest.json'
+
+# Input files each table is built from. Orders are validated against the
+# customers file, so they depend on both.
+TABLE_INPUTS = {
+    "customers": ("customers",),
+    "orders": ("customers", "orders")
+}
+
+# Config sections that cannot change what ends up in the tables
+IGNORED_CONFIG_KEYS = ('skip_unchanged', 'cache')
+
+def config_hash(config: dict) -> str:
+    """
+    Hash of the settings that affect the loaded data.
+    """
+    relevant = {key: value for key, value in config.items() if key not in IGNORED_CONFIG_KEYS}
+    return fingerprint_key(relevant)
+
+def table_keys(data_paths: dict, config: dict) -> Dict[str, str]:
+    """
+    Key per table covering the contents of its input files, every shard of
+    a multi-file input included, and the config. Modification times are
+    left out, so touching a file does not force a reload; only different
+    bytes do.
+    """
+    extract_config = config.get('extract', {})
+    contents = {}
+    for name, path in data_paths.items():
+        shards = resolve_sources(path, extract_config.get('partition_start'), extract_config.get('partition_end'))
+        contents[name] = [
+            (fingerprint['path'], fingerprint['size'], fingerprint['digest'])
+            for fingerprint in map(file_fingerprint, shards)
+        ]
+
+    settings = config_hash(config)
+    return {
+        table: fingerprint_key(settings, [contents[name] for name in inputs])
+        for table, inputs in TABLE_INPUTS.items()
+    }
+
+def load_manifest(manifest_path: str = DEFAULT_MANIFEST_PATH) -> dict:
+    """
+    Load the manifest of the last successful run, or an empty one.
+    """
+    if not os.path.exists(manifest_path):
+        return {"tables": {}}
+
+    try:
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+        manifest.setdefault("tables", {})
+        return manifest
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read run manifest {manifest_path}, treating inputs as changed: {e}")
+        return {"tables": {}}
+
+def unchanged_tables(manifest: dict, keys: Dict[str, str]) -> Set[str]:
+    """
+    Tables whose key matches the one recorded by the last successful run.
+    """
+    recorded = manifest.get("tables", {})
+    return {table for table, key in keys.items() if recorded.get(table, {}).get("key") == key}
+
+def record_run(keys: Dict[str, str], tables: Iterable[str],
+               manifest_path: str = DEFAULT_MANIFEST_PATH):
+    """
+    Record the keys of the tables a successful run left up to date,
+    keeping the entries of tables it did not touch. Written atomically.
+    """
+    manifest = load_manifest(manifest_path)
+    completed_at = datetime.now().isoformat(timespec='seconds')
+    for table in tables:
+        manifest["tables"][table] = {"key": keys[table], "completed_at": completed_at}
+
+    manifest_dir = os.path.dirname(manifest_path)
+    if manifest_dir:
+        os.makedirs(manifest_dir, exist_ok=True)
+    temp_path = f"{manifest_path}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(manifest, f, indent=4, sort_keys=True)
+    os.replace(temp_path, manifest_path)
+    logger.info(f"Recorded run manifest for {sorted(tables)}")
@@ -0,0 +1,100 @@
+import logging
+import queue
+import threading
+from typing import Callable, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the stream on an inter-stage queue
+_DONE = object()
+
+# How often blocked threads wake up to check whether the pipeline was aborted
+_POLL_SECONDS = 0.1
+
+class PipelineAbort(Exception):
+    """
+    Raised by a stage to stop the pipeline because of an expected failure,
+    such as a chunk that could not be loaded.
+    """
+
+def run_pipeline(source: Iterable, stages: List[Callable], max_in_flight: int = 2) -> None:
+    """
+    Push items from source through stages, each running in its own thread.
+
+    Stages are connected by queues holding at most max_in_flight items, so
+    reading the next chunk overlaps with cleaning and loading earlier ones
+    while memory stays bounded regardless of input size. Items keep their
+    order, and a stage may return None to drop an item. The first exception
+    raised by the source or any stage stops every thread and is re-raised
+    here.
+    """
+    if max_in_flight < 1:
+        raise ValueError(f"max_in_flight must be at least 1, got {max_in_flight}")
+
+    stop = threading.Event()
+    errors = []
+    queues = [queue.Queue(maxsize=max_in_flight) for _ in stages]
+
+    def put(q, item) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(q):
+        while not stop.is_set():
+            try:
+                return q.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def fail(e: BaseException):
+        errors.append(e)
+        stop.set()
+
+    def produce():
+        try:
+            for item in source:
+                if not put(queues[0], item):
+                    return
+            put(queues[0], _DONE)
+        except BaseException as e:
+            fail(e)
+        finally:
+            close = getattr(source, 'close', None)
+            if close is not None:
+                close()
+
+    def work(stage: Callable, inbox: queue.Queue, outbox):
+        try:
+            while True:
+                item = get(inbox)
+                if item is _DONE:
+                    break
+                result = stage(item)
+                if result is None or outbox is None:
+                    continue
+                if not put(outbox, result):
+                    return
+            if outbox is not None:
+                put(outbox, _DONE)
+        except BaseException as e:
+            fail(e)
+
+    threads = [threading.Thread(target=produce, name='pipeline-source', daemon=True)]
+    for i, stage in enumerate(stages):
+        outbox = queues[i + 1] if i + 1 < len(queues) else None
+        name = f"pipeline-{getattr(stage, '__name__', i)}"
+        threads.append(threading.Thread(target=work, args=(stage, queues[i], outbox), name=name, daemon=True))
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        raise errors[0]
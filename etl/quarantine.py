@@ -0,0 +1,149 @@
+import csv
+import io
+import json
+import logging
+import os
+import re
+import threading
+import warnings
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+import pandas as pd
+
+from etl.fingerprint import fingerprint_key
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUARANTINE_DIR = '.etl_quarantine'
+
+# What extract does with malformed lines: fail the file, or divert them to
+# a quarantine file and keep parsing
+BAD_LINE_MODES = ('fail', 'quarantine')
+
+# How the pandas C parser reports a skipped line; one warning can report
+# several
+_SKIPPED_LINE = re.compile(r'Skipping line (\d+): (.*)')
+
+# warnings.catch_warnings swaps process-wide state, so C parser reads that
+# collect bad lines take turns
+_capture_lock = threading.Lock()
+
+def quarantine_dir_for(extract_config: dict) -> Optional[str]:
+    """
+    Quarantine directory named by an extract config, or None when its
+    bad_lines mode fails files with malformed lines.
+    """
+    mode = extract_config.get('bad_lines', 'fail')
+    if mode not in BAD_LINE_MODES:
+        raise ValueError(f"Unknown bad_lines mode: {mode}, expected one of {BAD_LINE_MODES}")
+    if mode == 'fail':
+        return None
+    return extract_config.get('quarantine_dir', DEFAULT_QUARANTINE_DIR)
+
+def bad_line(line, error: str, raw=None) -> dict:
+    """
+    A malformed line: its 1-based record number in the file (the header is
+    record 1), the parser's complaint and the raw text, when known.
+    """
+    return {"line": line, "error": error, "raw": raw}
+
+@contextmanager
+def capture_bad_lines(bad_lines: List[dict]):
+    """
+    Collect the lines the pandas C parser skips with on_bad_lines='warn'
+    into bad_lines. Other warnings raised meanwhile are passed on.
+    """
+    with _capture_lock:
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always', pd.errors.ParserWarning)
+            yield
+
+    for warning in caught:
+        matches = list(_SKIPPED_LINE.finditer(str(warning.message)))
+        if issubclass(warning.category, pd.errors.ParserWarning) and matches:
+            bad_lines.extend(bad_line(int(match.group(1)), match.group(2).strip()) for match in matches)
+        else:
+            warnings.showwarning(warning.message, warning.category, warning.filename, warning.lineno)
+
+def arrow_bad_line_handler(bad_lines: List[dict]):
+    """
+    pyarrow invalid_row_handler that skips malformed rows, collecting them
+    into bad_lines.
+    """
+    def handle(row):
+        bad_lines.append(bad_line(row.number, f"expected {row.expected_columns} fields, "
+                                              f"saw {row.actual_columns}", row.text))
+        return 'skip'
+    return handle
+
+def raw_records(stream) -> Iterator[str]:
+    """
+    Raw text of every CSV record in a binary stream, header first. Records
+    with quoted line breaks span several lines.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8', errors='backslashreplace', newline='')
+    consumed = []
+
+    def lines():
+        for line in text:
+            consumed.append(line)
+            yield line
+
+    try:
+        for _ in csv.reader(lines()):
+            raw = ''.join(consumed).rstrip('\r\n')
+            consumed.clear()
+            yield raw
+    finally:
+        # Leave the stream to its owner
+        text.detach()
+
+def locate_bad_lines(stream, bad_lines: List[dict]):
+    """
+    Fill in the raw text of bad lines known only by number, and the number
+    of those known only by text, in one pass over the file.
+    """
+    by_number = {entry['line']: entry for entry in bad_lines if entry['raw'] is None}
+    by_text = {}
+    for entry in bad_lines:
+        if entry['line'] is None:
+            by_text.setdefault(entry['raw'], []).append(entry)
+    if not by_number and not by_text:
+        return
+
+    records = raw_records(stream)
+    for number, raw in enumerate(records, start=1):
+        if number in by_number:
+            by_number.pop(number)['raw'] = raw
+        if raw in by_text:
+            by_text[raw].pop(0)['line'] = number
+            if not by_text[raw]:
+                del by_text[raw]
+        if not by_number and not by_text:
+            break
+    records.close()
+
+def quarantine_path(file_path: str, quarantine_dir: str = DEFAULT_QUARANTINE_DIR) -> str:
+    """
+    Quarantine file for a source. Shards with the same name in different
+    partitions get different files.
+    """
+    name = os.path.basename(file_path)
+    return os.path.join(quarantine_dir, f"{name}-{fingerprint_key(os.path.abspath(file_path))[:8]}.jsonl")
+
+def write_quarantine(file_path: str, bad_lines: List[dict], quarantine_dir: str = DEFAULT_QUARANTINE_DIR) -> str:
+    """
+    Append bad lines to the source's quarantine file as JSON Lines, in line
+    order, and return its path.
+    """
+    os.makedirs(quarantine_dir, exist_ok=True)
+    path = quarantine_path(file_path, quarantine_dir)
+    quarantined_at = datetime.now().isoformat(timespec='seconds')
+    with open(path, 'a', encoding='utf-8') as f:
+        for entry in sorted(bad_lines, key=lambda entry: entry['line'] or 0):
+            record = {"source": os.path.abspath(file_path), **entry, "quarantined_at": quarantined_at}
+            f.write(json.dumps(record) + '\n')
+    logger.warning(f"Quarantined {len(bad_lines)} malformed lines from {file_path} to {path}")
+    return path
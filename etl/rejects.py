@@ -0,0 +1,67 @@
+import glob
+import itertools
+import logging
+import os
+from datetime import datetime
+from typing import Callable, Iterable, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REJECTS_DIR = '.etl_rejects'
+REJECTS_SUFFIX = '.parquet'
+
+def rejects_table_dir(table: str, rejects_dir: str = DEFAULT_REJECTS_DIR) -> str:
+    """
+    Directory holding the reject parts of a table.
+    """
+    return os.path.join(rejects_dir, table)
+
+def reject_sink(table: str, rejects_dir: str = DEFAULT_REJECTS_DIR) -> Optional[Callable[[pd.DataFrame], None]]:
+    """
+    Reject sink for clean_customers or clean_orders that writes every frame
+    of rejected rows it is given to a new Parquet part under rejects_dir,
+    one directory per table. Parts are named by run and sequence number, so
+    the rejects of a run can be picked up on their own. Returns None when
+    pyarrow is not installed.
+    """
+    if pyarrow is None:
+        logger.warning(f"pyarrow is not installed, rejected {table} rows are not written")
+        return None
+
+    table_dir = rejects_table_dir(table, rejects_dir)
+    run = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+    parts = itertools.count()
+
+    def write(rejects: pd.DataFrame):
+        os.makedirs(table_dir, exist_ok=True)
+        path = os.path.join(table_dir, f"{run}-{next(parts):05d}{REJECTS_SUFFIX}")
+        temp_path = f"{path}.tmp"
+        rejects.to_parquet(temp_path)
+        os.replace(temp_path, path)
+        counts = rejects['reject_reason'].value_counts()
+        logger.info(f"Wrote {len(rejects)} rejected {table} rows to {path}: {counts[counts > 0].to_dict()}")
+
+    return write
+
+def read_rejects(table: str, rejects_dir: str = DEFAULT_REJECTS_DIR,
+                 reasons: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    Rejected rows of a table from every part in write order, optionally only
+    those with the given reasons. Each row keeps the index it had in its
+    input, so it can be traced back to the source.
+    """
+    paths = sorted(glob.glob(os.path.join(rejects_table_dir(table, rejects_dir), f"*{REJECTS_SUFFIX}")))
+    if not paths:
+        return pd.DataFrame()
+
+    rejects = pd.concat([pd.read_parquet(path) for path in paths])
+    if reasons is not None:
+        rejects = rejects[rejects['reject_reason'].isin(list(reasons))]
+    return rejects
@@ -0,0 +1,92 @@
+import logging
+from typing import Iterable, List, Optional
+from sqlalchemy import BigInteger, Column, Date, Integer, MetaData, Numeric, String, Table
+
+logger = logging.getLogger(__name__)
+
+# BIGINT on MySQL; INTEGER on SQLite so the primary key aliases the rowid
+ID_TYPE = BigInteger().with_variant(Integer(), 'sqlite')
+
+# Typed columns per table: (name, type, nullable). 'id' is the primary key.
+TABLE_COLUMNS = {
+    "customers": [
+        ("id", ID_TYPE, False),
+        ("name", String(255), False),
+        ("email", String(255), False),
+        ("join_date", Date(), True)
+    ],
+    "orders": [
+        ("id", ID_TYPE, False),
+        ("customer_id", ID_TYPE, False),
+        ("order_date", Date(), True),
+        ("total_amount", Numeric(12, 2), True)
+    ]
+}
+
+# Secondary indexes: (column, unique). They are built after the data is
+# loaded, which is much faster than maintaining them row by row. There are
+# no foreign keys, so tables can be loaded in any order.
+SECONDARY_INDEXES = {
+    "customers": [("email", True)],
+    "orders": [("customer_id", False)]
+}
+
+def has_schema(table_name: str, columns: Optional[Iterable[str]] = None) -> bool:
+    """
+    Check whether table_name has a typed schema covering the given columns.
+    """
+    if table_name not in TABLE_COLUMNS:
+        return False
+    if columns is None:
+        return True
+    known = {name for name, _, _ in TABLE_COLUMNS[table_name]}
+    return set(columns) <= known
+
+def table_definition(table_name: str, physical_name: Optional[str] = None) -> Table:
+    """
+    SQLAlchemy table for table_name's schema, named physical_name if given.
+    Secondary indexes are not part of the definition.
+    """
+    columns = [
+        Column(name, column_type, primary_key=(name == 'id'), autoincrement=False, nullable=nullable)
+        for name, column_type, nullable in TABLE_COLUMNS[table_name]
+    ]
+    return Table(physical_name or table_name, MetaData(), *columns)
+
+def create_table(engine, table_name: str, physical_name: Optional[str] = None):
+    """
+    Create the typed table, with its primary key but no secondary indexes.
+    """
+    table_definition(table_name, physical_name).create(engine)
+
+def index_name(physical_name: str, column: str, unique: bool) -> str:
+    """
+    Name of a secondary index. It includes the physical table name because
+    SQLite index names are database-wide and survive table renames.
+    """
+    return f"{'ux' if unique else 'ix'}_{physical_name}_{column}"
+
+def index_statements(engine, table_name: str, physical_name: Optional[str] = None) -> List[str]:
+    """
+    CREATE INDEX statements for table_name's secondary indexes.
+    """
+    quote = engine.dialect.identifier_preparer.quote
+    physical_name = physical_name or table_name
+    return [
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX {quote(index_name(physical_name, column, unique))} "
+        f"ON {quote(physical_name)} ({quote(column)})"
+        for column, unique in SECONDARY_INDEXES.get(table_name, [])
+    ]
+
+def create_indexes(engine, table_name: str, physical_name: Optional[str] = None):
+    """
+    Build table_name's secondary indexes on the physical table.
+    """
+    statements = index_statements(engine, table_name, physical_name)
+    if not statements:
+        return
+
+    with engine.begin() as conn:
+        for statement in statements:
+            conn.exec_driver_sql(statement)
+    logger.info(f"Built indexes for {table_name} on {physical_name or table_name}")
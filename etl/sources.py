@@ -0,0 +1,89 @@
+import glob
+import logging
+import os
+import re
+from datetime import date
+from typing import List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Data files picked up from a partitioned directory, plain or compressed
+DATA_FILE_PATTERN = re.compile(r'\.csv(\.(gz|bz2|xz|zst))?$', re.IGNORECASE)
+
+# A date partition directory: 2026-10-17, or Hive-style date=2026-10-17
+PARTITION_DATE_PATTERN = re.compile(r'^(?:\w+=)?(\d{4}-\d{2}-\d{2})$')
+
+def is_pattern(path: str) -> bool:
+    """
+    Whether path is a glob pattern rather than a literal path.
+    """
+    return glob.has_magic(path)
+
+def is_multi_source(path: str) -> bool:
+    """
+    Whether path names a set of shards (a glob pattern or a directory)
+    rather than a single file.
+    """
+    return is_pattern(path) or os.path.isdir(path)
+
+def partition_date(file_path: str) -> Optional[date]:
+    """
+    Date of the innermost date partition directory a file sits in, or None.
+    """
+    for part in reversed(os.path.normpath(os.path.dirname(file_path)).split(os.sep)):
+        match = PARTITION_DATE_PATTERN.match(part)
+        if match:
+            try:
+                return date.fromisoformat(match.group(1))
+            except ValueError:
+                return None
+    return None
+
+def _as_date(value: Union[str, date, None]) -> Optional[date]:
+    if value is None or isinstance(value, date):
+        return value
+    return date.fromisoformat(value)
+
+def resolve_sources(path: str, start_date: Union[str, date, None] = None,
+                    end_date: Union[str, date, None] = None) -> List[str]:
+    """
+    Files making up an input, ordered by date partition and then by path.
+
+    path is a single file, a glob pattern (with ** for any depth) or a
+    directory, which is searched recursively for data files. With a start or
+    end date, shards in date partitions outside the inclusive range are
+    pruned; shards outside any date partition are kept. A single file is
+    returned as given, even if it does not exist, so that the caller can
+    report it.
+    """
+    if not is_multi_source(path):
+        return [path]
+
+    if is_pattern(path):
+        files = [match for match in glob.glob(path, recursive=True) if os.path.isfile(match)]
+    else:
+        files = [
+            os.path.join(root, name)
+            for root, _, names in os.walk(path)
+            for name in names
+            if DATA_FILE_PATTERN.search(name)
+        ]
+    # Chronological across partition naming styles, then by path
+    files.sort(key=lambda file_path: (partition_date(file_path) or date.min, file_path))
+
+    start_date, end_date = _as_date(start_date), _as_date(end_date)
+    if start_date is None and end_date is None:
+        return files
+
+    kept = []
+    for file_path in files:
+        shard_date = partition_date(file_path)
+        if shard_date is not None and (
+                (start_date is not None and shard_date < start_date)
+                or (end_date is not None and shard_date > end_date)):
+            continue
+        kept.append(file_path)
+    if len(kept) < len(files):
+        logger.info(f"Pruned {len(files) - len(kept)} of {len(files)} files at {path} outside "
+                    f"{start_date or '...'} to {end_date or '...'}")
+    return kept
@@ -1,74 +1,294 @@
 import pandas as pd
+import numpy as np
 import logging
 import re
-from typing import Optional
+from functools import partial
+from typing import Callable, List, Optional
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # public from pandas 2.2 on
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+from etl.concurrency import run_tasks
 
 logger = logging.getLogger(__name__)
 
+# Strict pattern requiring proper domain extension
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# The same rule for whole-string matching. Python's $ also matches before a
+# single trailing newline while Arrow's regex engine does not, so the newline
+# is spelled out to give identical results on every string backend.
+EMAIL_FULLMATCH_PATTERN = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\n?'
+
+# Why a row was dropped. A row is rejected for the first rule it fails, in
+# the order the rules are applied; its code is the reason's position + 1,
+# with 0 meaning kept.
+REJECT_REASONS = (
+    'missing_field',
+    'bad_id',
+    'duplicate_id',
+    'bad_name',
+    'bad_email',
+    'duplicate_email',
+    'bad_customer_id',
+    'bad_date',
+    'bad_amount',
+    'orphan_customer',
+    'nonpositive_amount',
+    'future_date',
+    'stale_date'
+)
+REJECT_CODES = {reason: code for code, reason in enumerate(REJECT_REASONS, start=1)}
+
 def validate_email(email: str) -> bool:
     """
     Validate email format using regex.
     """
-    # Strict pattern requiring proper domain extension
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+    return bool(EMAIL_PATTERN.match(email))
 
-def clean_customers(df: pd.DataFrame) -> pd.DataFrame:
+def validate_emails(emails: pd.Series) -> pd.Series:
     """
-    Clean and standardize customer data.
+    Vectorized form of validate_email over a whole column.
+    Returns a boolean mask identical to applying validate_email to each
+    value; missing and non-string values are treated as invalid.
+    """
+    return emails.str.fullmatch(EMAIL_FULLMATCH_PATTERN, na=False).astype(bool)
+
+def first_occurrence_mask(values: pd.Series, eligible: pd.Series, key: str,
+                          seen_keys: Optional[dict] = None) -> pd.Series:
+    """
+    Mask of eligible rows holding the first occurrence of their value.
+
+    When seen_keys is given, values already recorded under seen_keys[key]
+    by earlier chunks are masked out too, and the surviving values are added
+    so that deduplication holds across a whole chunked stream.
+    """
+    mask = eligible & ~values.where(eligible).duplicated()
+    if seen_keys is None:
+        return mask
+
+    seen = seen_keys.setdefault(key, set())
+    if seen:
+        mask &= ~values.isin(seen)
+    seen.update(values[mask].tolist())
+    return mask
+
+def drop_duplicate_keys(df: pd.DataFrame, column: str, seen_keys: Optional[dict] = None) -> pd.DataFrame:
+    """
+    Remove duplicate values of column, keeping the first occurrence.
+    See first_occurrence_mask for how seen_keys is used.
+    """
+    eligible = pd.Series(True, index=df.index)
+    return df[first_occurrence_mask(df[column], eligible, column, seen_keys)]
+
+def apply_rule(keep: pd.Series, mask: pd.Series, reasons: Optional[np.ndarray], reason: str) -> pd.Series:
+    """
+    Narrow keep to the rows passing a rule. With a reasons array, the rows
+    the rule removes are marked with its reject code.
+    """
+    if reasons is not None:
+        reasons[(keep & ~mask).to_numpy()] = REJECT_CODES[reason]
+    return keep & mask
+
+def reject_frame(df: pd.DataFrame, keep: pd.Series, reasons: np.ndarray) -> pd.DataFrame:
+    """
+    The rows of df not kept, as read, with a categorical reject_reason
+    column.
+    """
+    rejected = ~keep.to_numpy()
+    rejects = df[rejected].copy()
+    rejects['reject_reason'] = pd.Categorical.from_codes(reasons[rejected] - 1, categories=REJECT_REASONS)
+    return rejects
+
+def emit_rejects(df: pd.DataFrame, keep: pd.Series, reasons: Optional[np.ndarray],
+                 reject_sink: Optional[Callable[[pd.DataFrame], None]]):
+    """
+    Pass the rows of df not kept to reject_sink, if there are any and a
+    sink is given.
+    """
+    if reject_sink is not None and not keep.all():
+        reject_sink(reject_frame(df, keep, reasons))
+
+def infer_date_format(values: pd.Series) -> Optional[str]:
+    """
+    Date format pandas would infer when parsing the whole column: the format
+    of its first non-null value, or 'mixed' (parse each value on its own)
+    when that cannot be guessed. None leaves non-string columns to pandas.
+
+    Parsing parts of a column with this format gives the same result as
+    parsing the whole column at once.
+    """
+    non_null = values.dropna()
+    if non_null.empty or not isinstance(non_null.iloc[0], str):
+        return None
+    return guess_datetime_format(non_null.iloc[0]) or 'mixed'
+
+def coerce_numeric(values: pd.Series) -> pd.Series:
+    """
+    Numeric form of a column with invalid values as NaN. Columns already
+    typed at read time are returned as they are.
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return values
+    return pd.to_numeric(values, errors='coerce')
+
+def truncate_ids(ids: pd.Series) -> pd.Series:
+    """
+    Numeric ids as the integers they are loaded as: fractional ids are
+    truncated toward zero like astype(int), so that deduplication and
+    customer validation compare the final keys. Missing ids stay NaN.
+    """
+    if pd.api.types.is_integer_dtype(ids):
+        return ids
+    return np.trunc(ids)
+
+def coerce_dates(values: pd.Series, date_format: Optional[str] = None) -> pd.Series:
+    """
+    Datetime form of a column with invalid values as NaT. Columns already
+    parsed at read time are returned as they are.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    return pd.to_datetime(values, errors='coerce', format=date_format)
+
+def partition_positions(keys: pd.Series, partitions: int) -> List[np.ndarray]:
+    """
+    Row positions of each partition. Rows are assigned by a hash of their
+    key, so rows with equal keys share a partition.
+    """
+    buckets = pd.util.hash_pandas_object(keys, index=False).to_numpy() % partitions
+    return [np.flatnonzero(buckets == i) for i in range(partitions)]
+
+def map_partitions(func: Callable, df: pd.DataFrame, key: str, partitions: int,
+                   executor: str = 'process') -> pd.DataFrame:
+    """
+    Apply a row-local function to hash partitions of df in parallel and
+    reassemble the results in the original row order.
+    func must return one row per input row with the input's index.
+    """
+    positions = [pos for pos in partition_positions(df[key], partitions) if len(pos)]
+    tasks = {i: partial(func, df.iloc[pos]) for i, pos in enumerate(positions)}
+    results = run_tasks(tasks, len(tasks), failed=lambda result: False, executor=executor)
+
+    combined = pd.concat([results[i] for i in range(len(positions))])
+    return combined.iloc[np.argsort(np.concatenate(positions), kind='stable')]
+
+def customer_row_rules(df: pd.DataFrame, date_format: Optional[str] = None) -> pd.DataFrame:
+    """
+    Row-local part of clean_customers: the coerced columns plus one mask
+    per rule. Each row depends only on itself, so this can run on
+    partitions of the input.
+    """
+    present = df['id'].notna() & df['name'].notna() & df['email'].notna()
+    ids = truncate_ids(coerce_numeric(df['id']))
+    names = df['name'].str.strip()
+    emails = df['email'].str.lower().str.strip()
+    join_dates = coerce_dates(df['join_date'], date_format)
+
+    return pd.DataFrame({
+        'id': ids,
+        'name': names,
+        'email': emails,
+        'join_date': join_dates,
+        'present': present,
+        'id_valid': present & ids.notna(),
+        'name_valid': names.str.len() > 0,
+        'email_valid': validate_emails(emails),
+        'date_valid': join_dates.notna()
+    }, index=df.index)
+
+def merge_customer_rules(df: pd.DataFrame, rules: pd.DataFrame, seen_keys: Optional[dict] = None,
+                         reject_sink: Optional[Callable[[pd.DataFrame], None]] = None) -> pd.DataFrame:
+    """
+    Cross-row part of clean_customers: deduplicate ids and emails over the
+    whole input, then filter once and write back the cleaned columns.
     """
-    if df.empty:
-        logger.warning("Empty customers dataframe provided")
-        return df
-    
-    df = df.copy()
     original_count = len(df)
+    reasons = np.zeros(original_count, dtype=np.int8) if reject_sink is not None else None
     
     # Drop rows with missing critical fields
-    df = df.dropna(subset=['id', 'name', 'email'])
-    logger.info(f"Removed {original_count - len(df)} rows with missing critical fields")
+    keep = apply_rule(pd.Series(True, index=df.index), rules['present'], reasons, 'missing_field')
+    logger.info(f"Removed {original_count - int(keep.sum())} rows with missing critical fields")
     
     # Ensure id is numeric and unique
-    df['id'] = pd.to_numeric(df['id'], errors='coerce')
-    df = df.dropna(subset=['id'])
-    df['id'] = df['id'].astype(int)
-    
-    # Remove duplicates based on id
-    df = df.drop_duplicates(subset=['id'])
-    logger.info(f"Removed {original_count - len(df)} duplicate customer IDs")
-    
-    # Clean name field
-    df['name'] = df['name'].str.strip()
-    df = df[df['name'].str.len() > 0]
+    keep = apply_rule(keep, rules['id_valid'], reasons, 'bad_id')
+    keep = apply_rule(keep, first_occurrence_mask(rules['id'], keep, 'id', seen_keys), reasons, 'duplicate_id')
+    logger.info(f"Removed {original_count - int(keep.sum())} duplicate customer IDs")
     
-    # Clean and validate email
-    df['email'] = df['email'].str.lower().str.strip()
-    df['email'] = df['email'].apply(lambda x: x if validate_email(x) else None)
-    df = df.dropna(subset=['email'])
+    # Require a name and a valid email, then remove duplicate emails
+    keep = apply_rule(keep, rules['name_valid'], reasons, 'bad_name')
+    keep = apply_rule(keep, rules['email_valid'], reasons, 'bad_email')
+    keep = apply_rule(keep, first_occurrence_mask(rules['email'], keep, 'email', seen_keys),
+                      reasons, 'duplicate_email')
     
-    # Remove duplicate emails
-    df = df.drop_duplicates(subset=['email'])
+    # Require a valid join_date
+    keep = apply_rule(keep, rules['date_valid'], reasons, 'bad_date')
     
-    # Convert join_date to datetime
-    df['join_date'] = pd.to_datetime(df['join_date'], errors='coerce')
-    df = df.dropna(subset=['join_date'])
+    emit_rejects(df, keep, reasons, reject_sink)
+    df = df[keep]
+    df['id'] = rules['id'][keep].astype(int)
+    df['name'] = rules['name'][keep]
+    df['email'] = rules['email'][keep]
+    df['join_date'] = rules['join_date'][keep]
     
     logger.info(f"Final cleaned customers: {len(df)} rows (from {original_count})")
     return df
 
-def validate_customer_ids(orders_df: pd.DataFrame, customers_df: pd.DataFrame) -> pd.DataFrame:
+def clean_customers(df: pd.DataFrame, seen_keys: Optional[dict] = None,
+                    workers: int = 1, executor: str = 'process',
+                    reject_sink: Optional[Callable[[pd.DataFrame], None]] = None) -> pd.DataFrame:
+    """
+    Clean and standardize customer data.
+
+    Pass the same seen_keys dict for every chunk of a stream to deduplicate
+    ids and emails across chunks.
+
+    With a reject_sink, the dropped rows are passed to it as read, with a
+    reject_reason column (see REJECT_REASONS).
+
+    With workers > 1 the row-local rules run on that many partitions of the
+    input in parallel and the deduplication runs once over the merged
+    result; the output is identical to the serial path.
+    """
+    if df.empty:
+        logger.warning("Empty customers dataframe provided")
+        return df
+    
+    row_rules = partial(customer_row_rules, date_format=infer_date_format(df['join_date']))
+    if workers > 1:
+        rules = map_partitions(row_rules, df, 'id', workers, executor)
+    else:
+        rules = row_rules(df)
+    return merge_customer_rules(df, rules, seen_keys, reject_sink)
+
+def customer_id_mask(customer_ids: pd.Series, customers_df) -> pd.Series:
+    """
+    Mask of orders whose customer_id exists in the customers dataframe.
+    customers_df may also be a customer id index (see etl.id_index.IdIndex),
+    which is built once and reused instead of hashing the ids on every call.
+    """
+    if not isinstance(customers_df, pd.DataFrame):
+        return customers_df.contains(customer_ids)
+
+    if customers_df.empty:
+        logger.warning("Empty dataframe provided for customer ID validation")
+        return pd.Series(True, index=customer_ids.index)
+
+    return customer_ids.isin(customers_df['id'].unique())
+
+def validate_customer_ids(orders_df: pd.DataFrame, customers_df) -> pd.DataFrame:
     """
     Validate that all customer_ids in orders exist in customers table.
+    customers_df may be a dataframe or a customer id index.
     """
-    if orders_df.empty or customers_df.empty:
+    if orders_df.empty or (isinstance(customers_df, pd.DataFrame) and customers_df.empty):
         logger.warning("Empty dataframe provided for customer ID validation")
         return orders_df
     
-    valid_customer_ids = customers_df['id'].unique()
     original_count = len(orders_df)
     
     # Filter orders to only include valid customer IDs
-    orders_df = orders_df[orders_df['customer_id'].isin(valid_customer_ids)]
+    orders_df = orders_df[customer_id_mask(orders_df['customer_id'], customers_df)]
     
     filtered_count = len(orders_df)
     if original_count != filtered_count:
@@ -76,6 +296,33 @@ def validate_customer_ids(orders_df: pd.DataFrame, customers_df: pd.DataFrame) -
     
     return orders_df
 
+def order_data_masks(total_amount: pd.Series, order_date: pd.Series,
+                     current_date: Optional[pd.Timestamp] = None) -> dict:
+    """
+    One mask per business logic rule as of current_date (default now),
+    keyed by the reject reason of the rows failing it.
+    """
+    if current_date is None:
+        current_date = pd.Timestamp.now()
+    ten_years_ago = current_date - pd.DateOffset(years=10)
+    return {
+        # Ensure total_amount is positive
+        'nonpositive_amount': total_amount > 0,
+        # Ensure order_date is not in the future
+        'future_date': order_date <= current_date,
+        # Ensure order_date is not too old (e.g., not older than 10 years)
+        'stale_date': order_date >= ten_years_ago
+    }
+
+def order_data_mask(total_amount: pd.Series, order_date: pd.Series,
+                    current_date: Optional[pd.Timestamp] = None) -> pd.Series:
+    """
+    Mask of orders passing the business logic rules as of current_date
+    (default now).
+    """
+    amount_valid, not_future, not_stale = order_data_masks(total_amount, order_date, current_date).values()
+    return amount_valid & not_future & not_stale
+
 def validate_order_data(df: pd.DataFrame) -> pd.DataFrame:
     """
     Validate order data for business logic.
@@ -84,17 +331,7 @@ def validate_order_data(df: pd.DataFrame) -> pd.DataFrame:
         return df
     
     original_count = len(df)
-    
-    # Ensure total_amount is positive
-    df = df[df['total_amount'] > 0]
-    
-    # Ensure order_date is not in the future
-    current_date = pd.Timestamp.now()
-    df = df[df['order_date'] <= current_date]
-    
-    # Ensure order_date is not too old (e.g., not older than 10 years)
-    ten_years_ago = current_date - pd.DateOffset(years=10)
-    df = df[df['order_date'] >= ten_years_ago]
+    df = df[order_data_mask(df['total_amount'], df['order_date'])]
     
     filtered_count = len(df)
     if original_count != filtered_count:
@@ -102,49 +339,118 @@ def validate_order_data(df: pd.DataFrame) -> pd.DataFrame:
     
     return df
 
-def clean_orders(df: pd.DataFrame, customers_df: pd.DataFrame = None) -> pd.DataFrame:
+def order_row_rules(df: pd.DataFrame, date_format: Optional[str] = None,
+                    current_date: Optional[pd.Timestamp] = None) -> pd.DataFrame:
     """
-    Clean and standardize order data.
+    Row-local part of clean_orders: the coerced columns plus one mask per
+    rule. Each row depends only on itself, so this can run on partitions of
+    the input; pass the same current_date to every partition.
     """
-    if df.empty:
-        logger.warning("Empty orders dataframe provided")
-        return df
+    present = df['id'].notna() & df['customer_id'].notna() & df['total_amount'].notna()
     
-    df = df.copy()
+    # Coerce each column once unless typed at read time; invalid values become NaN/NaT
+    ids = truncate_ids(coerce_numeric(df['id']))
+    customer_ids = truncate_ids(coerce_numeric(df['customer_id']))
+    order_dates = coerce_dates(df['order_date'], date_format)
+    total_amounts = coerce_numeric(df['total_amount'])
+    business = order_data_masks(total_amounts, order_dates, current_date)
+
+    return pd.DataFrame({
+        'id': ids,
+        'customer_id': customer_ids,
+        'order_date': order_dates,
+        'total_amount': total_amounts,
+        'present': present,
+        'id_valid': present & ids.notna(),
+        'customer_id_valid': customer_ids.notna(),
+        'date_valid': order_dates.notna(),
+        'amount_valid': total_amounts.notna(),
+        **{f'{reason}_valid': mask for reason, mask in business.items()}
+    }, index=df.index)
+
+def merge_order_rules(df: pd.DataFrame, rules: pd.DataFrame, customers_df=None,
+                      seen_keys: Optional[dict] = None,
+                      reject_sink: Optional[Callable[[pd.DataFrame], None]] = None) -> pd.DataFrame:
+    """
+    Cross-row part of clean_orders: deduplicate ids over the whole input and
+    validate customer ids, then filter once and write back the coerced
+    columns.
+    """
     original_count = len(df)
+    reasons = np.zeros(original_count, dtype=np.int8) if reject_sink is not None else None
     
     # Drop rows with missing critical fields
-    df = df.dropna(subset=['id', 'customer_id', 'total_amount'])
-    logger.info(f"Removed {original_count - len(df)} rows with missing critical fields")
-    
-    # Ensure id is numeric and unique
-    df['id'] = pd.to_numeric(df['id'], errors='coerce')
-    df = df.dropna(subset=['id'])
-    df['id'] = df['id'].astype(int)
-    
-    # Remove duplicates based on id
-    df = df.drop_duplicates(subset=['id'])
-    
-    # Convert customer_id to numeric and drop invalid values
-    df['customer_id'] = pd.to_numeric(df['customer_id'], errors='coerce')
-    df = df.dropna(subset=['customer_id'])
-    df['customer_id'] = df['customer_id'].astype(int)
+    keep = apply_rule(pd.Series(True, index=df.index), rules['present'], reasons, 'missing_field')
+    logger.info(f"Removed {original_count - int(keep.sum())} rows with missing critical fields")
     
-    # Convert order_date to datetime
-    df['order_date'] = pd.to_datetime(df['order_date'], errors='coerce')
-    df = df.dropna(subset=['order_date'])
+    # Ensure id is numeric and unique, keeping the first valid occurrence
+    keep = apply_rule(keep, rules['id_valid'], reasons, 'bad_id')
+    keep = apply_rule(keep, first_occurrence_mask(rules['id'], keep, 'id', seen_keys), reasons, 'duplicate_id')
     
-    # Ensure total_amount is numeric and positive
-    df['total_amount'] = pd.to_numeric(df['total_amount'], errors='coerce')
-    df = df.dropna(subset=['total_amount'])
-    df = df[df['total_amount'] > 0]
+    # Drop invalid customer_id, order_date and total_amount values
+    keep = apply_rule(keep, rules['customer_id_valid'], reasons, 'bad_customer_id')
+    keep = apply_rule(keep, rules['date_valid'], reasons, 'bad_date')
+    keep = apply_rule(keep, rules['amount_valid'], reasons, 'bad_amount')
     
     # Validate customer IDs if customers dataframe is provided
     if customers_df is not None:
-        df = validate_customer_ids(df, customers_df)
+        before = int(keep.sum())
+        keep = apply_rule(keep, customer_id_mask(rules['customer_id'], customers_df), reasons, 'orphan_customer')
+        removed = before - int(keep.sum())
+        if removed:
+            logger.info(f"Removed {removed} orders with invalid customer IDs")
     
     # Apply business logic validation
-    df = validate_order_data(df)
+    before = int(keep.sum())
+    for reason in ('nonpositive_amount', 'future_date', 'stale_date'):
+        keep = apply_rule(keep, rules[f'{reason}_valid'], reasons, reason)
+    removed = before - int(keep.sum())
+    if removed:
+        logger.info(f"Removed {removed} orders with invalid business logic")
+    
+    # Filter once and write back the coerced columns
+    emit_rejects(df, keep, reasons, reject_sink)
+    df = df[keep]
+    df['id'] = rules['id'][keep].astype(int)
+    df['customer_id'] = rules['customer_id'][keep].astype(int)
+    df['order_date'] = rules['order_date'][keep]
+    df['total_amount'] = rules['total_amount'][keep]
     
     logger.info(f"Final cleaned orders: {len(df)} rows (from {original_count})")
     return df
+
+def clean_orders(df: pd.DataFrame, customers_df=None,
+                 seen_keys: Optional[dict] = None, workers: int = 1,
+                 executor: str = 'process',
+                 reject_sink: Optional[Callable[[pd.DataFrame], None]] = None) -> pd.DataFrame:
+    """
+    Clean and standardize order data.
+
+    Every rule contributes to a single boolean mask over the coerced columns,
+    and the input is filtered once at the end, so the number of copies does
+    not grow with the number of rules. Rows are kept or dropped exactly as by
+    applying the rules one after another.
+
+    Pass the same seen_keys dict for every chunk of a stream to deduplicate
+    order ids across chunks. customers_df is the customers dataframe or,
+    to validate many chunks against the same customers, a customer id index
+    built once (see etl.id_index.IdIndex).
+
+    With a reject_sink, the dropped rows are passed to it as read, with a
+    reject_reason column (see REJECT_REASONS).
+
+    With workers > 1 the row-local rules run on that many partitions of the
+    input in parallel, and id deduplication and customer validation run once
+    over the merged result; the output is identical to the serial path.
+    """
+    if df.empty:
+        logger.warning("Empty orders dataframe provided")
+        return df
+    
+    row_rules = partial(order_row_rules, date_format=infer_date_format(df['order_date']),
+                        current_date=pd.Timestamp.now())
+    if workers > 1:
+        rules = map_partitions(row_rules, df, 'id', workers, executor)
+    else:
+        rules = row_rules(df)
+    return merge_order_rules(df, rules, customers_df, seen_keys, reject_sink)
@@ -1,9 +1,23 @@
 import logging
 import sys
 import traceback
-from etl.load import load_to_mysql
-from etl.extract import extract_customers, extract_orders
+from functools import partial
+import pandas as pd
+from etl.config import load_etl_config, get_load_options
+from etl.load import (load_to_mysql, apply_changes, dispose_engines, staging_table_name,
+                      finish_swap, build_table_indexes, max_concurrent_loads, get_engine, table_exists,
+                      table_id_lookup, DEFAULT_BATCH_SIZE)
+from etl.changes import detect_changes, save_hash_index, database_state_dir
+from etl.extract import (extract_customers, extract_orders, extract_customers_chunks, extract_orders_chunks,
+                         DEFAULT_SAMPLE_ROWS)
 from etl.transform import clean_customers, clean_orders
+from etl.pipeline import run_pipeline, PipelineAbort
+from etl.concurrency import run_tasks
+from etl.cache import DEFAULT_CACHE_DIR, DEFAULT_CACHE_MAX_BYTES
+from etl.quarantine import quarantine_dir_for
+from etl.rejects import reject_sink, DEFAULT_REJECTS_DIR
+from etl.id_index import IdIndex
+from etl.manifest import table_keys, load_manifest, unchanged_tables, record_run, DEFAULT_MANIFEST_PATH
 
 # Configure logging
 logging.basicConfig(
@@ -16,41 +30,245 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def run_etl():
+def load_table(df: pd.DataFrame, table_name: str, config: dict) -> bool:
+    """
+    Load a cleaned table, writing only changed rows when change detection
+    is enabled. Hash indexes are kept per target database, and a table
+    missing from the database is loaded in full whatever its index says.
+    """
+    load_options = get_load_options(config, table_name)
+    change_detection = config['change_detection']
+    if not change_detection['enabled']:
+        return load_to_mysql(df, table_name, **load_options)
+
+    engine = get_engine()
+    if engine is None:
+        return False
+    state_dir = database_state_dir(change_detection['state_dir'], engine.url.render_as_string(hide_password=True))
+    changes = detect_changes(df, table_name, state_dir)
+    if changes['first_run'] or not table_exists(engine, table_name):
+        # No index from a previous run, or the table it describes is gone:
+        # the table must be loaded in full
+        if not changes['first_run']:
+            logger.warning(f"{table_name} is missing from the database, loading it in full")
+        loaded = load_to_mysql(df, table_name, **load_options)
+    else:
+        loaded = apply_changes(changes, table_name, load_options.get('batch_size', DEFAULT_BATCH_SIZE))
+
+    if loaded:
+        save_hash_index(table_name, changes['hashes'], state_dir)
+    return loaded
+
+def extract_tables(data_paths: dict, config: dict, table_names=("customers", "orders")) -> dict:
+    """
+    Extract the customers and orders inputs, or those in table_names,
+    concurrently, using the pool type and size from the extract config.
+    Inputs split into shards also read their shards extract.max_workers at
+    a time.
+    Returns the extracted frames by table. After an extraction fails no
+    further file is started, so a table may be missing from the result.
+    """
+    extract_config = config['extract']
+    options = {
+        "engine": extract_config.get('engine', 'c'),
+        "sample_rows": extract_config.get('sample_rows', DEFAULT_SAMPLE_ROWS),
+        "max_workers": extract_config.get('max_workers', 1),
+        "start_date": extract_config.get('partition_start'),
+        "end_date": extract_config.get('partition_end'),
+        "quarantine_dir": quarantine_dir_for(extract_config)
+    }
+    cache_config = config.get('cache', {})
+    if cache_config.get('enabled', False):
+        options["cache_dir"] = cache_config.get('dir', DEFAULT_CACHE_DIR)
+        options["cache_max_bytes"] = cache_config.get('max_bytes', DEFAULT_CACHE_MAX_BYTES)
+    extractors = {"customers": extract_customers, "orders": extract_orders}
+    tasks = {
+        table_name: partial(extractors[table_name], data_paths[table_name], **options)
+        for table_name in table_names
+    }
+    return run_tasks(tasks, extract_config.get('max_workers', 1),
+                     failed=lambda df: df.empty, executor=extract_config.get('executor', 'thread'))
+
+def reject_sinks(config: dict) -> dict:
+    """
+    Reject sink per table when the rejects output is enabled, else none.
+    """
+    rejects_config = config.get('rejects', {})
+    if not rejects_config.get('enabled', False):
+        return {}
+    rejects_dir = rejects_config.get('dir', DEFAULT_REJECTS_DIR)
+    return {table_name: reject_sink(table_name, rejects_dir) for table_name in ("customers", "orders")}
+
+def build_customer_index(customer_ids: pd.Series, config: dict) -> IdIndex:
+    """
+    Index of the valid customer ids for order validation, saved to
+    transform.customer_index when that is set.
+    """
+    index = IdIndex.from_values(customer_ids)
+    index_path = config['transform'].get('customer_index')
+    if index_path:
+        index.save(index_path)
+    return index
+
+def validates_orders_only(config: dict) -> bool:
+    """
+    Whether orders are validated against customers loaded by an earlier
+    run, either the customers table in the database or the saved customer
+    id index, in which case the customers input is not read at all.
+    """
+    return config['transform'].get('customer_ids', 'input') in ('database', 'index')
+
+def stored_customer_ids(config: dict):
+    """
+    Customer ids to validate an orders-only run against: a lookup on the
+    customers table, or the index saved at transform.customer_index by an
+    earlier run. Returns None if they are not available.
+    """
+    if config['transform'].get('customer_ids') == 'database':
+        return table_id_lookup("customers")
+
+    index_path = config['transform'].get('customer_index')
+    if not index_path:
+        logger.error("transform.customer_ids is 'index' but no transform.customer_index is set")
+        return None
+    customer_index = IdIndex.load(index_path)
+    if customer_index is not None:
+        logger.info(f"Validating orders against {len(customer_index)} customer ids from {index_path}")
+    return customer_index
+
+def load_table_task(df: pd.DataFrame, table_name: str, config: dict) -> bool:
+    """
+    Load one table, logging failures.
+    """
+    try:
+        loaded = load_table(df, table_name, config)
+        if not loaded:
+            logger.error(f"Failed to load {table_name} to database")
+        return loaded
+    except Exception as e:
+        logger.error(f"Error loading {table_name}: {e}")
+        logger.error(traceback.format_exc())
+        return False
+
+def load_tables(tables: dict, config: dict) -> bool:
+    """
+    Load several cleaned tables concurrently over the shared engine pool,
+    at most load.max_parallel_tables at a time, in the order given.
+    Returns True only if every table loaded; after a failure no further
+    tables are started.
+    """
+    max_workers = max_concurrent_loads(config['load'].get('max_parallel_tables', 1))
+    tasks = {
+        table_name: partial(load_table_task, df, table_name, config)
+        for table_name, df in tables.items()
+    }
+    results = run_tasks(tasks, max_workers)
+    return len(results) == len(tasks) and all(results.values())
+
+def unchanged_since_last_run(config: dict):
+    """
+    Keys of this run's tables and the set of tables that can be skipped:
+    those whose input files and config match the last successful run and
+    that still exist in the database. Returns (None, empty set) when
+    skipping is disabled, the inputs cannot be fingerprinted or orders are
+    validated on their own.
+    """
+    skip_config = config.get('skip_unchanged', {})
+    if not skip_config.get('enabled', False):
+        return None, set()
+    if validates_orders_only(config):
+        logger.info("Orders are validated against customers from an earlier run, which the run "
+                    "manifest does not track, so unchanged inputs are not skipped")
+        return None, set()
+
+    try:
+        keys = table_keys(config['data_paths'], config)
+    except OSError as e:
+        logger.warning(f"Could not fingerprint inputs, running all tables: {e}")
+        return None, set()
+
+    manifest = load_manifest(skip_config.get('manifest', DEFAULT_MANIFEST_PATH))
+    unchanged = unchanged_tables(manifest, keys)
+    engine = get_engine() if unchanged else None
+    skipped = set()
+    for table_name in sorted(unchanged):
+        if engine is not None and table_exists(engine, table_name):
+            skipped.add(table_name)
+        else:
+            logger.warning(f"{table_name} is unchanged since the last successful run "
+                           f"but missing from the database, reloading it")
+    return keys, skipped
+
+def run_etl(config: dict = None):
     """
     Run the complete ETL pipeline with comprehensive error handling.
+    With skip_unchanged enabled, a run whose inputs and config match the
+    last successful run is a successful no-op, and tables whose own inputs
+    are unchanged are not reloaded.
     """
+    if config is None:
+        config = load_etl_config()
+
+    keys, skipped = unchanged_since_last_run(config)
+    if keys is not None and skipped == set(keys):
+        logger.info("Inputs and config unchanged since the last successful run, nothing to do")
+        return True
+
+    if config['extract']['mode'] == 'chunked':
+        if config['change_detection']['enabled']:
+            logger.warning("Change detection needs whole tables and is ignored in chunked mode")
+        success = run_etl_chunked(config)
+        if success and keys is not None:
+            record_run(keys, keys, config['skip_unchanged'].get('manifest', DEFAULT_MANIFEST_PATH))
+        return success
+
+    data_paths = config['data_paths']
     try:
         logger.info("Starting ETL pipeline")
         
-        # Extract phase
+        # Extract phase: both files are read concurrently, or only orders
+        # when they are validated against customers from an earlier run
         logger.info("=== EXTRACT PHASE ===")
-        customers = extract_customers("data/customers.csv")
-        if customers.empty:
+        orders_only = validates_orders_only(config)
+        extracted = extract_tables(data_paths, config, ("orders",) if orders_only else ("customers", "orders"))
+        customers = extracted.get('customers', pd.DataFrame())
+        if customers.empty and not orders_only:
             logger.error("Failed to extract customers data")
             return False
             
-        orders = extract_orders("data/orders.csv")
+        orders = extracted.get('orders', pd.DataFrame())
         if orders.empty:
             logger.error("Failed to extract orders data")
             return False
         
-        # Transform phase
+        # Transform phase, optionally partitioned over a pool of workers
         logger.info("=== TRANSFORM PHASE ===")
-        try:
-            customers_clean = clean_customers(customers)
-            logger.info(f"Customers cleaned: {len(customers_clean)} rows")
-        except Exception as e:
-            logger.error(f"Error cleaning customers: {e}")
-            logger.error(traceback.format_exc())
-            return False
+        workers = config['transform'].get('workers', 1)
+        executor = config['transform'].get('executor', 'process')
+        sinks = reject_sinks(config)
+        if orders_only:
+            customers_clean = None
+            customer_index = stored_customer_ids(config)
+            if customer_index is None:
+                return False
+        else:
+            try:
+                customers_clean = clean_customers(customers, workers=workers, executor=executor,
+                                                  reject_sink=sinks.get('customers'))
+                logger.info(f"Customers cleaned: {len(customers_clean)} rows")
+            except Exception as e:
+                logger.error(f"Error cleaning customers: {e}")
+                logger.error(traceback.format_exc())
+                return False
             
-        if customers_clean.empty:
-            logger.error("No valid customers data after transformation")
-            return False
+            if customers_clean.empty:
+                logger.error("No valid customers data after transformation")
+                return False
+            customer_index = build_customer_index(customers_clean['id'], config)
             
         try:
-            orders_clean = clean_orders(orders, customers_clean)
+            orders_clean = clean_orders(orders, customer_index, workers=workers, executor=executor,
+                                        reject_sink=sinks.get('orders'))
             logger.info(f"Orders cleaned: {len(orders_clean)} rows")
         except Exception as e:
             logger.error(f"Error cleaning orders: {e}")
@@ -61,34 +279,160 @@ def run_etl():
             logger.warning("No valid orders data after transformation")
             # Continue with just customers
         
-        # Load phase
+        # Load phase: the tables are independent, so load them in parallel
         logger.info("=== LOAD PHASE ===")
-        try:
-            customers_loaded = load_to_mysql(customers_clean, "customers")
-            if not customers_loaded:
-                logger.error("Failed to load customers to database")
-                return False
-        except Exception as e:
-            logger.error(f"Error loading customers: {e}")
-            logger.error(traceback.format_exc())
+        tables = {} if orders_only else {"customers": customers_clean}
+        if not orders_clean.empty:
+            tables["orders"] = orders_clean
+        for table_name in sorted(skipped & set(tables)):
+            logger.info(f"Skipping {table_name}: unchanged since the last successful run")
+            del tables[table_name]
+        if not load_tables(tables, config):
             return False
+        if keys is not None:
+            record_run(keys, tables, config['skip_unchanged'].get('manifest', DEFAULT_MANIFEST_PATH))
+        
+        logger.info("ETL pipeline completed successfully")
+        return True
+        
+    except Exception as e:
+        logger.error(f"Unexpected error in ETL pipeline: {e}")
+        logger.error(traceback.format_exc())
+        return False
+
+def load_chunk_stream(chunks, table_name: str, clean_chunk, max_in_flight: int,
+                      load_options: dict = None, on_loaded=None) -> int:
+    """
+    Clean and load a stream of chunks as a pipeline.
+    Parsing, cleaning and loading run concurrently with at most max_in_flight
+    chunks queued between stages. The first loaded chunk replaces the table
+    and later ones are appended, unless the table is configured to upsert.
+    In swap mode chunks are appended to a staging table that is swapped in
+    once the whole stream has loaded. A table rebuilt by the stream gets its
+    secondary indexes after the last chunk. Returns the number of rows loaded.
+    """
+    load_options = dict(load_options or {})
+    table_mode = load_options.pop('mode', 'replace')
+    staging_name = staging_table_name(table_name) if table_mode == 'swap' else None
+    if staging_name is not None:
+        load_options['target_table'] = staging_name
+    if table_mode in ('replace', 'swap'):
+        load_options['build_indexes'] = False
+    rows_loaded = 0
+
+    def clean(chunk):
+        chunk_clean = clean_chunk(chunk)
+        return None if chunk_clean.empty else chunk_clean
+
+    def load(chunk_clean):
+        nonlocal rows_loaded
+        if table_mode in ('replace', 'swap'):
+            mode = 'replace' if rows_loaded == 0 else 'append'
+        else:
+            mode = table_mode
+        if not load_to_mysql(chunk_clean, table_name, mode, **load_options):
+            raise PipelineAbort(f"Failed to load {table_name} to database")
+        rows_loaded += len(chunk_clean)
+        if on_loaded is not None:
+            on_loaded(chunk_clean)
+
+    if staging_name is None:
+        run_pipeline(chunks, [clean, load], max_in_flight)
+        if table_mode == 'replace' and rows_loaded and not build_table_indexes(table_name):
+            raise PipelineAbort(f"Failed to index {table_name}")
+        return rows_loaded
+
+    try:
+        run_pipeline(chunks, [clean, load], max_in_flight)
+    except BaseException:
+        finish_swap(table_name, staging_name, success=False)
+        raise
+    if rows_loaded == 0:
+        finish_swap(table_name, staging_name, success=False)
+    elif not finish_swap(table_name, staging_name):
+        raise PipelineAbort(f"Failed to swap in {table_name}")
+    return rows_loaded
+
+def run_etl_chunked(config: dict):
+    """
+    Run the ETL pipeline over bounded-size chunks so that neither input file
+    is ever held in memory in full.
+    Each chunk flows through cleaning and loading as soon as it is parsed.
+    """
+    data_paths = config['data_paths']
+    chunksize = config['extract'].get('chunksize')
+    chunk_bytes = config['extract'].get('chunk_bytes')
+    max_in_flight = config['extract'].get('max_in_flight', 2)
+    try:
+        logger.info("Starting chunked ETL pipeline")
+        options = {
+            "engine": config['extract'].get('engine', 'c'),
+            "sample_rows": config['extract'].get('sample_rows', DEFAULT_SAMPLE_ROWS),
+            "start_date": config['extract'].get('partition_start'),
+            "end_date": config['extract'].get('partition_end'),
+            "quarantine_dir": quarantine_dir_for(config['extract'])
+        }
+        
+        # Open both streams up front so header problems fail fast
+        orders_only = validates_orders_only(config)
+        if not orders_only:
+            customer_chunks = extract_customers_chunks(data_paths['customers'], chunksize, chunk_bytes, **options)
+            if customer_chunks is None:
+                logger.error("Failed to extract customers data")
+                return False
             
-        if not orders_clean.empty:
-            try:
-                orders_loaded = load_to_mysql(orders_clean, "orders")
-                if not orders_loaded:
-                    logger.error("Failed to load orders to database")
-                    return False
-            except Exception as e:
-                logger.error(f"Error loading orders: {e}")
-                logger.error(traceback.format_exc())
+        order_chunks = extract_orders_chunks(data_paths['orders'], chunksize, chunk_bytes, **options)
+        if order_chunks is None:
+            logger.error("Failed to extract orders data")
+            return False
+        
+        sinks = reject_sinks(config)
+        
+        if orders_only:
+            # Orders are validated against the customers already loaded
+            customer_index = stored_customer_ids(config)
+            if customer_index is None:
+                return False
+        else:
+            # Customers: keep only the valid ids for order validation
+            logger.info("=== CUSTOMERS ===")
+            customer_seen_keys = {}
+            customer_ids = []
+            customers_loaded = load_chunk_stream(
+                customer_chunks, "customers",
+                lambda chunk: clean_customers(chunk, customer_seen_keys, reject_sink=sinks.get('customers')),
+                max_in_flight,
+                load_options=get_load_options(config, "customers"),
+                on_loaded=lambda chunk: customer_ids.append(chunk['id'])
+            )
+            if customers_loaded == 0:
+                logger.error("No valid customers data after transformation")
                 return False
+            logger.info(f"Customers loaded: {customers_loaded} rows")
+            customer_index = build_customer_index(pd.concat(customer_ids, ignore_index=True), config)
+        
+        # Orders: validate each chunk against the customer ids
+        logger.info("=== ORDERS ===")
+        order_seen_keys = {}
+        orders_loaded = load_chunk_stream(
+            order_chunks, "orders",
+            lambda chunk: clean_orders(chunk, customer_index, order_seen_keys, reject_sink=sinks.get('orders')),
+            max_in_flight,
+            load_options=get_load_options(config, "orders")
+        )
+        if orders_loaded == 0:
+            logger.warning("No valid orders data after transformation")
+        else:
+            logger.info(f"Orders loaded: {orders_loaded} rows")
         
         logger.info("ETL pipeline completed successfully")
         return True
         
+    except PipelineAbort as e:
+        logger.error(str(e))
+        return False
     except Exception as e:
-        logger.error(f"Unexpected error in ETL pipeline: {e}")
+        logger.error(f"Unexpected error in chunked ETL pipeline: {e}")
         logger.error(traceback.format_exc())
         return False
 
@@ -96,7 +440,10 @@ def main():
     """
     Main entry point with proper exit codes.
     """
-    success = run_etl()
+    try:
+        success = run_etl()
+    finally:
+        dispose_engines()
     if success:
         logger.info("ETL pipeline completed successfully")
         sys.exit(0)
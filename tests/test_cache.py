@@ -0,0 +1,114 @@
+import unittest
+import pandas as pd
+import tempfile
+import os
+import importlib.util
+from unittest import mock
+from etl.cache import cached_read, evict_cache, CACHE_SUFFIX
+from etl.fingerprint import file_fingerprint, fingerprint_key
+
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+class TestFingerprint(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a source file."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.temp_dir, 'orders.csv')
+        with open(self.source, 'w') as f:
+            f.write('id,total_amount\n1,10.0\n')
+
+    def tearDown(self):
+        """Clean up test files."""
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def test_fingerprint_tracks_content(self):
+        """Test that the fingerprint changes with the content but not between reads."""
+        first = file_fingerprint(self.source)
+        self.assertEqual(file_fingerprint(self.source), first)
+
+        stat = os.stat(self.source)
+        with open(self.source, 'w') as f:
+            f.write('id,total_amount\n1,20.0\n')
+        # Same size and mtime: only the digest can tell the files apart
+        os.utime(self.source, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        second = file_fingerprint(self.source)
+        self.assertEqual(second['size'], first['size'])
+        self.assertNotEqual(second['digest'], first['digest'])
+
+    def test_fingerprint_key_ignores_dict_order(self):
+        """Test that keys are stable across dict ordering."""
+        self.assertEqual(fingerprint_key({'a': 1, 'b': 2}), fingerprint_key({'b': 2, 'a': 1}))
+        self.assertNotEqual(fingerprint_key({'a': 1}), fingerprint_key({'a': 2}))
+
+@unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a source file and a cache directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, 'cache')
+        self.source = os.path.join(self.temp_dir, 'orders.csv')
+        with open(self.source, 'w') as f:
+            f.write('id,order_date,total_amount\n1,2024-09-09,10.0\n2,2024-09-10,20.0\n')
+        self.read = mock.Mock(side_effect=lambda: pd.read_csv(self.source, parse_dates=['order_date']))
+
+    def tearDown(self):
+        """Clean up test files."""
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def entries(self):
+        return [name for name in os.listdir(self.cache_dir) if name.endswith(CACHE_SUFFIX)]
+
+    def test_cached_read_hit(self):
+        """Test that an unchanged file is read from the cache with the same frame."""
+        first = cached_read(self.read, self.source, 'orders', self.cache_dir)
+        second = cached_read(self.read, self.source, 'orders', self.cache_dir)
+
+        self.assertEqual(self.read.call_count, 1)
+        pd.testing.assert_frame_equal(second, first)
+
+    def test_cached_read_invalidated_by_change(self):
+        """Test that changing the file or read key misses and replaces the old entry."""
+        cached_read(self.read, self.source, 'orders', self.cache_dir)
+        with open(self.source, 'a') as f:
+            f.write('3,2024-09-11,30.0\n')
+
+        result = cached_read(self.read, self.source, 'orders', self.cache_dir)
+
+        self.assertEqual(self.read.call_count, 2)
+        self.assertEqual(len(result), 3)
+        self.assertEqual(len(self.entries()), 1)
+
+        cached_read(self.read, self.source, 'orders-pyarrow', self.cache_dir)
+        self.assertEqual(self.read.call_count, 3)
+
+    def test_cached_read_corrupt_entry(self):
+        """Test that an unreadable entry is treated as a miss."""
+        cached_read(self.read, self.source, 'orders', self.cache_dir)
+        with open(os.path.join(self.cache_dir, self.entries()[0]), 'wb') as f:
+            f.write(b'not feather')
+
+        result = cached_read(self.read, self.source, 'orders', self.cache_dir)
+
+        self.assertEqual(self.read.call_count, 2)
+        self.assertEqual(len(result), 2)
+
+    def test_evict_cache_least_recently_used(self):
+        """Test that eviction removes the least recently used entries first."""
+        os.makedirs(self.cache_dir)
+        for age, name in enumerate(['old', 'mid', 'new']):
+            path = os.path.join(self.cache_dir, f"{name}{CACHE_SUFFIX}")
+            with open(path, 'wb') as f:
+                f.write(b'x' * 100)
+            os.utime(path, (age, age))
+
+        self.assertEqual(evict_cache(self.cache_dir, max_bytes=250), 1)
+        self.assertListEqual(sorted(self.entries()), ['mid.feather', 'new.feather'])
+        self.assertEqual(evict_cache(self.cache_dir, max_bytes=250), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import pandas as pd
+import numpy as np
+import tempfile
+from etl.changes import row_hashes, detect_changes, save_hash_index, load_hash_index, hash_index_path
+
+class TestChanges(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up test data."""
+        self.state_dir = tempfile.mkdtemp()
+        self.customers = pd.DataFrame({
+            'id': [1, 2, 3],
+            'name': ['Alice Borderland', 'Agustin Chan', 'John Doe'],
+            'email': ['alice@gmail.com', 'chan@gmail.com', 'john@example.com'],
+            'join_date': pd.to_datetime(['2024-09-08', '2024-09-07', '2024-09-06'])
+        })
+    
+    def tearDown(self):
+        """Clean up test files."""
+        import shutil
+        shutil.rmtree(self.state_dir)
+    
+    def test_row_hashes_stable(self):
+        """Test that hashes ignore column order, numeric width and datetime unit."""
+        hashes = row_hashes(self.customers)
+        
+        reordered = self.customers[['email', 'id', 'join_date', 'name']].copy()
+        reordered['join_date'] = reordered['join_date'].dt.as_unit('s')
+        reordered['id'] = reordered['id'].astype('int32')
+        
+        pd.testing.assert_series_equal(row_hashes(reordered), hashes)
+        self.assertListEqual(list(hashes.index), [1, 2, 3])
+    
+    def test_row_hashes_detect_value_change(self):
+        """Test that changing one value changes only that row's hash."""
+        changed = self.customers.copy()
+        changed.loc[1, 'email'] = 'agustin@gmail.com'
+        
+        equal = row_hashes(changed) == row_hashes(self.customers)
+        self.assertListEqual(list(equal), [True, False, True])
+    
+    def test_row_hashes_detect_large_integer_change(self):
+        """Test that a change in an integer column above 2**53 changes the row's hash."""
+        orders = pd.DataFrame({'id': [1, 2], 'customer_id': [1234567890123456789, 7]})
+        changed = orders.assign(customer_id=[1234567890123456788, 7])
+        
+        equal = row_hashes(changed) == row_hashes(orders)
+        self.assertListEqual(list(equal), [False, True])
+    
+    def test_detect_changes_first_run(self):
+        """Test that every row is new when there is no saved index."""
+        changes = detect_changes(self.customers, 'customers', self.state_dir)
+        
+        self.assertTrue(changes['first_run'])
+        self.assertEqual(changes['counts'], {'inserted': 3, 'updated': 0, 'deleted': 0, 'unchanged': 0})
+    
+    def test_detect_changes_classes(self):
+        """Test classification of inserted, updated, deleted and unchanged rows."""
+        first = detect_changes(self.customers, 'customers', self.state_dir)
+        save_hash_index('customers', first['hashes'], self.state_dir)
+        
+        current = pd.concat([self.customers.iloc[1:], pd.DataFrame({
+            'id': [4], 'name': ['Jane Smith'], 'email': ['jane@example.com'],
+            'join_date': pd.to_datetime(['2024-09-05'])
+        })], ignore_index=True)
+        current.loc[current['id'] == 3, 'name'] = 'Johnny Doe'
+        
+        changes = detect_changes(current, 'customers', self.state_dir)
+        
+        self.assertFalse(changes['first_run'])
+        self.assertEqual(changes['counts'], {'inserted': 1, 'updated': 1, 'deleted': 1, 'unchanged': 1})
+        self.assertListEqual(list(changes['inserted']['id']), [4])
+        self.assertListEqual(list(changes['updated']['id']), [3])
+        self.assertListEqual(list(changes['deleted']), [1])
+    
+    def test_hash_index_roundtrip(self):
+        """Test saving and loading a hash index."""
+        hashes = row_hashes(self.customers)
+        save_hash_index('customers', hashes, self.state_dir)
+        
+        loaded = load_hash_index('customers', self.state_dir)
+        
+        np.testing.assert_array_equal(loaded.to_numpy(), hashes.to_numpy())
+        np.testing.assert_array_equal(loaded.index.to_numpy(), hashes.index.to_numpy())
+    
+    def test_load_hash_index_corrupt_file(self):
+        """Test that an unreadable index is treated as missing."""
+        with open(hash_index_path('customers', self.state_dir), 'w') as f:
+            f.write('not an index')
+        
+        self.assertIsNone(load_hash_index('customers', self.state_dir))
+        self.assertIsNone(load_hash_index('orders', self.state_dir))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import threading
+import time
+from functools import partial
+from etl.concurrency import run_tasks
+
+class TestConcurrency(unittest.TestCase):
+    
+    def test_run_tasks_results(self):
+        """Test that every task runs and results are keyed by name."""
+        results = run_tasks({'a': lambda: 1, 'b': lambda: 2, 'c': lambda: 3}, max_workers=2)
+        self.assertEqual(results, {'a': 1, 'b': 2, 'c': 3})
+    
+    def test_run_tasks_concurrency_cap(self):
+        """Test that no more than max_workers tasks run at once."""
+        lock = threading.Lock()
+        active = []
+        peak = []
+        
+        def task():
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.pop()
+            return True
+        
+        results = run_tasks({str(i): task for i in range(6)}, max_workers=2)
+        
+        self.assertEqual(len(results), 6)
+        self.assertEqual(max(peak), 2)
+    
+    def test_run_tasks_overlap(self):
+        """Test that independent tasks run concurrently."""
+        barrier = threading.Barrier(2, timeout=5)
+        results = run_tasks({'a': barrier.wait, 'b': barrier.wait}, max_workers=2,
+                            failed=lambda result: False)
+        self.assertEqual(len(results), 2)
+    
+    def test_run_tasks_stops_after_failure(self):
+        """Test that a failed task prevents later ones from starting."""
+        started = []
+        
+        def task(name, result):
+            def run():
+                started.append(name)
+                return result
+            return run
+        
+        results = run_tasks({'a': task('a', False), 'b': task('b', True)}, max_workers=1)
+        
+        self.assertEqual(results, {'a': False})
+        self.assertEqual(started, ['a'])
+    
+    def test_run_tasks_custom_failure(self):
+        """Test a custom failure predicate."""
+        results = run_tasks({'a': lambda: [], 'b': lambda: [1]}, max_workers=1,
+                            failed=lambda result: result is None)
+        self.assertEqual(results, {'a': [], 'b': [1]})
+    
+    def test_run_tasks_reraises(self):
+        """Test that an exception from a task is re-raised."""
+        def boom():
+            raise RuntimeError("boom")
+        
+        with self.assertRaises(RuntimeError):
+            run_tasks({'a': boom, 'b': lambda: True}, max_workers=2)
+    
+    def test_run_tasks_process_executor(self):
+        """Test running picklable tasks on a process pool."""
+        results = run_tasks({'a': partial(pow, 2, 10), 'b': partial(pow, 3, 2)}, max_workers=2,
+                            executor='process')
+        self.assertEqual(results, {'a': 1024, 'b': 9})
+    
+    def test_run_tasks_unknown_executor(self):
+        """Test that an unknown pool type is rejected."""
+        with self.assertRaises(ValueError):
+            run_tasks({'a': lambda: True}, executor='fiber')
+    
+    def test_run_tasks_invalid_workers(self):
+        """Test that max_workers must be positive."""
+        with self.assertRaises(ValueError):
+            run_tasks({'a': lambda: True}, max_workers=0)
+
+if __name__ == '__main__':
+    unittest.main()
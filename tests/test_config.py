@@ -0,0 +1,59 @@
+import unittest
+import tempfile
+import os
+import json
+from etl.config import load_etl_config, get_load_options, DEFAULT_CONFIG
+
+class TestConfig(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a temporary config directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.temp_dir, 'etl_config.json')
+    
+    def tearDown(self):
+        """Clean up test files."""
+        import shutil
+        shutil.rmtree(self.temp_dir)
+    
+    def test_load_etl_config_merges_defaults(self):
+        """Test that missing keys are filled in from defaults."""
+        with open(self.config_file, 'w') as f:
+            json.dump({"extract": {"mode": "chunked"}}, f)
+        
+        config = load_etl_config(self.config_file)
+        
+        self.assertEqual(config['extract']['mode'], 'chunked')
+        self.assertEqual(config['extract']['chunksize'], DEFAULT_CONFIG['extract']['chunksize'])
+        self.assertEqual(config['data_paths'], DEFAULT_CONFIG['data_paths'])
+    
+    def test_load_etl_config_file_not_found(self):
+        """Test that a missing config file yields the defaults."""
+        config = load_etl_config(os.path.join(self.temp_dir, 'missing.json'))
+        self.assertEqual(config, DEFAULT_CONFIG)
+    
+    def test_load_etl_config_invalid_json(self):
+        """Test that invalid JSON yields the defaults."""
+        with open(self.config_file, 'w') as f:
+            f.write('{not json')
+        
+        config = load_etl_config(self.config_file)
+        self.assertEqual(config, DEFAULT_CONFIG)
+    
+    def test_get_load_options_table_override(self):
+        """Test that per-table load settings override the defaults."""
+        config = {"load": {"strategy": "to_sql", "max_parallel_tables": 2,
+                           "tables": {"orders": {"strategy": "bulk"}}}}
+        
+        self.assertEqual(get_load_options(config, "orders"), {"strategy": "bulk"})
+        self.assertEqual(get_load_options(config, "customers"), {"strategy": "to_sql"})
+        self.assertEqual(get_load_options({}, "customers"), {})
+    
+    def test_repository_config_is_valid(self):
+        """Test that the shipped etl_config.json loads cleanly."""
+        config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'etl_config.json')
+        config = load_etl_config(config_path)
+        self.assertIn(config['extract']['mode'], ('full', 'chunked'))
+
+if __name__ == '__main__':
+    unittest.main()
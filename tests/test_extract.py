@@ -2,7 +2,27 @@ import unittest
 import pandas as pd
 import tempfile
 import os
-from etl.extract import extract_customers, extract_orders, validate_file_exists, validate_csv_structure
+import importlib.util
+import gzip
+import bz2
+import lzma
+import json
+from unittest import mock
+from etl.extract import (
+    extract_customers,
+    extract_orders,
+    validate_file_exists,
+    validate_csv_structure,
+    validate_csv_header,
+    validate_csv_sample,
+    detect_compression,
+    estimate_rows_per_chunk,
+    extract_customers_chunks,
+    extract_orders_chunks
+)
+from etl.transform import clean_orders
+
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
 
 class TestExtract(unittest.TestCase):
     
@@ -80,5 +100,360 @@ class TestExtract(unittest.TestCase):
         result = extract_orders('non_existent_file.csv')
         self.assertTrue(result.empty)
 
+    def test_validate_csv_header(self):
+        """Test header-only structure validation."""
+        self.assertTrue(validate_csv_header(self.orders_file, ['id', 'customer_id', 'order_date', 'total_amount']))
+        self.assertFalse(validate_csv_header(self.orders_file, ['id', 'missing_col']))
+    
+    def test_extract_orders_chunks(self):
+        """Test streaming order extraction in fixed-size chunks."""
+        chunks = list(extract_orders_chunks(self.orders_file, chunksize=1))
+        self.assertEqual(len(chunks), 2)
+        self.assertTrue(all(len(chunk) == 1 for chunk in chunks))
+        self.assertListEqual(list(pd.concat(chunks)['id']), [10, 12])
+    
+    def test_extract_customers_chunks_by_bytes(self):
+        """Test streaming customer extraction with a byte budget per chunk."""
+        rows = estimate_rows_per_chunk(self.customers_file, 1)
+        self.assertEqual(rows, 1)
+        
+        chunks = list(extract_customers_chunks(self.customers_file, chunk_bytes=10 * 1024 * 1024))
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(len(chunks[0]), 2)
+    
+    def test_extract_chunks_missing_columns(self):
+        """Test that streaming extraction rejects a bad header before reading rows."""
+        self.assertIsNone(extract_orders_chunks(self.customers_file, chunksize=1))
+        self.assertIsNone(extract_orders_chunks('non_existent_file.csv', chunksize=1))
+
+    def test_extract_orders_declared_types(self):
+        """Test that the declared schema types columns and parses dates at read time."""
+        result = extract_orders(self.orders_file)
+        
+        self.assertEqual(result['customer_id'].dtype, 'int64')
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(result['order_date']))
+    
+    def test_extract_orders_undeclared_columns_dropped(self):
+        """Test that only declared columns are read."""
+        self.orders_data.assign(notes='x').to_csv(self.orders_file, index=False)
+        
+        result = extract_orders(self.orders_file)
+        
+        self.assertListEqual(list(result.columns), ['id', 'customer_id', 'order_date', 'total_amount'])
+    
+    def test_extract_orders_type_mismatch_falls_back(self):
+        """Test that values not fitting the declared dtypes fall back to inference."""
+        self.orders_data.assign(customer_id=['t', '2'], order_date=['2024-09-09', 'garbage']).to_csv(
+            self.orders_file, index=False)
+        
+        result = extract_orders(self.orders_file)
+        
+        self.assertListEqual(list(result['customer_id']), ['t', '2'])
+        # A date column that does not match its format is left as text
+        self.assertListEqual(list(result['order_date']), ['2024-09-09', 'garbage'])
+    
+    def test_extract_orders_chunks_type_mismatch_mid_stream(self):
+        """Test that a C reader chunk not fitting the declared dtypes switches to inference without losing rows."""
+        orders = pd.DataFrame({
+            'id': [1, 2, 3, 4, 5],
+            'customer_id': ['1', '2', '3', 't', '5'],
+            'order_date': ['2024-09-09'] * 5,
+            'total_amount': [1.0, 2.0, 3.0, 4.0, 5.0]
+        })
+        orders.to_csv(self.orders_file, index=False)
+        
+        with mock.patch('etl.extract.pa', None):
+            chunks = list(extract_orders_chunks(self.orders_file, chunksize=2))
+        
+        self.assertEqual(chunks[0]['customer_id'].dtype, 'int64')
+        self.assertListEqual(list(pd.concat(chunks)['id']), [1, 2, 3, 4, 5])
+        self.assertListEqual([str(value) for value in pd.concat(chunks)['customer_id']],
+                             ['1', '2', '3', 't', '5'])
+
+    def test_extract_orders_overlong_line_fails(self):
+        """Test that a line with too many fields past the sample fails the file in full and chunked mode."""
+        lines = [f'{i},1,2024-09-09,3.0\n' for i in range(1, 301)]
+        lines.insert(250, '9999,1,2024-09-09,3.0,EXTRA\n')
+        with open(self.orders_file, 'w') as f:
+            f.write('id,customer_id,order_date,total_amount\n' + ''.join(lines))
+
+        self.assertTrue(extract_orders(self.orders_file).empty)
+        if HAS_PYARROW:
+            # The bad line starts a chunk, where pandas' chunked C reader does not check field counts
+            with self.assertRaises(pd.errors.ParserError):
+                list(extract_orders_chunks(self.orders_file, chunksize=50))
+        with mock.patch('etl.extract.pa', None), self.assertRaises(pd.errors.ParserError):
+            list(extract_orders_chunks(self.orders_file, chunksize=49))
+
+    def test_extract_orders_large_ids_exact(self):
+        """Test that ids above 2**53 are read exactly, with or without missing ids."""
+        big_ids = [1234567890123456789, 1234567890123456788]
+        self.orders_data.assign(id=big_ids, customer_id=big_ids).to_csv(self.orders_file, index=False)
+
+        result = extract_orders(self.orders_file)
+        self.assertListEqual(list(result['id']), big_ids)
+        self.assertListEqual(list(result['customer_id']), big_ids)
+        cleaned = clean_orders(result, pd.DataFrame({'id': big_ids}))
+        self.assertListEqual(list(cleaned['id']), big_ids)
+
+        # A missing customer id falls back to inferred types, keeping the ids exact
+        self.orders_data.assign(id=big_ids, customer_id=[1, None]).to_csv(self.orders_file, index=False)
+        for engine in ('c', 'pyarrow') if HAS_PYARROW else ('c',):
+            result = extract_orders(self.orders_file, engine=engine)
+            self.assertListEqual([int(value) for value in result['id']], big_ids)
+
+    def test_extract_unknown_engine(self):
+        """Test that an unknown CSV engine fails the extraction."""
+        self.assertTrue(extract_orders(self.orders_file, engine='python').empty)
+        self.assertIsNone(extract_orders_chunks(self.orders_file, chunksize=1, engine='python'))
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    def test_extract_pyarrow_engine_matches_c(self):
+        """Test that the pyarrow engine reads the same frames as the C engine, with Arrow-backed strings."""
+        customers = extract_customers(self.customers_file, engine='pyarrow')
+        for column in ('name', 'email'):
+            self.assertIsInstance(customers[column].dtype, pd.StringDtype)
+            self.assertEqual(customers[column].dtype.storage, 'pyarrow')
+        pd.testing.assert_frame_equal(customers, extract_customers(self.customers_file), check_dtype=False)
+        pd.testing.assert_frame_equal(extract_orders(self.orders_file, engine='pyarrow'),
+                                      extract_orders(self.orders_file))
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    def test_extract_pyarrow_engine_chunks(self):
+        """Test that the pyarrow engine yields chunks of exactly chunksize rows."""
+        orders = pd.DataFrame({
+            'id': [1, 2, 3, 4, 5],
+            'customer_id': [1, 2, 3, 4, 5],
+            'order_date': ['2024-09-09'] * 5,
+            'total_amount': [1.0, 2.0, 3.0, 4.0, 5.0]
+        })
+        orders.to_csv(self.orders_file, index=False)
+
+        chunks = list(extract_orders_chunks(self.orders_file, chunksize=2, engine='pyarrow'))
+        expected = list(extract_orders_chunks(self.orders_file, chunksize=2))
+
+        self.assertListEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        for chunk, expected_chunk in zip(chunks, expected):
+            pd.testing.assert_frame_equal(chunk, expected_chunk)
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    def test_extract_pyarrow_engine_type_mismatch_falls_back(self):
+        """Test that the pyarrow engine reads mismatched files as text."""
+        self.orders_data.assign(customer_id=['t', '2']).to_csv(self.orders_file, index=False)
+
+        result = extract_orders(self.orders_file, engine='pyarrow')
+
+        self.assertListEqual(list(result['customer_id']), ['t', '2'])
+        self.assertListEqual(list(result['order_date']), ['2024-09-09', '2024-09-09'])
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    def test_extract_pyarrow_engine_malformed_row(self):
+        """Test that a malformed row fails the pyarrow extraction."""
+        with open(self.orders_file, 'a') as f:
+            f.write('13,1,2024-09-09,5.0,extra\n')
+
+        self.assertTrue(extract_orders(self.orders_file, engine='pyarrow').empty)
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    def test_extract_orders_cached(self):
+        """Test that a cached extraction returns the same frame as parsing."""
+        cache_dir = os.path.join(self.temp_dir, 'cache')
+        first = extract_orders(self.orders_file, cache_dir=cache_dir)
+        second = extract_orders(self.orders_file, cache_dir=cache_dir)
+
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+        pd.testing.assert_frame_equal(first, extract_orders(self.orders_file))
+        pd.testing.assert_frame_equal(second, first)
+
+    def test_extract_orders_missing_column_fails_before_parse(self):
+        """Test that a missing column is rejected from the header alone."""
+        self.orders_data.drop(columns='total_amount').to_csv(self.orders_file, index=False)
+
+        with mock.patch('etl.extract.read_source') as read_source:
+            result = extract_orders(self.orders_file)
+
+        self.assertTrue(result.empty)
+        read_source.assert_not_called()
+
+    def test_validate_csv_sample(self):
+        """Test that malformed or header-only files fail the sample check."""
+        self.assertTrue(validate_csv_sample(self.orders_file))
+
+        with open(self.orders_file, 'a') as f:
+            f.write('13,1,2024-09-09,5.0,extra\n')
+        self.assertFalse(validate_csv_sample(self.orders_file))
+        # Rows past the sample are left to the full parse
+        self.assertTrue(validate_csv_sample(self.orders_file, sample_rows=2))
+        self.assertTrue(validate_csv_sample(self.orders_file, sample_rows=0))
+
+        self.orders_data.head(0).to_csv(self.orders_file, index=False)
+        self.assertFalse(validate_csv_sample(self.orders_file))
+        self.assertTrue(extract_orders(self.orders_file).empty)
+
+    def write_compressed(self, file_name, compress):
+        """Write the test orders compressed under file_name."""
+        path = os.path.join(self.temp_dir, file_name)
+        with open(path, 'wb') as f:
+            f.write(compress(self.orders_data.to_csv(index=False).encode('utf-8')))
+        return path
+
+    def test_detect_compression(self):
+        """Test codec detection by extension and by magic bytes."""
+        self.assertIsNone(detect_compression(self.orders_file))
+        self.assertEqual(detect_compression(self.write_compressed('orders.csv.gz', gzip.compress)), 'gzip')
+        self.assertEqual(detect_compression(self.write_compressed('orders_bz2.dat', bz2.compress)), 'bz2')
+        self.assertEqual(detect_compression(self.write_compressed('orders_xz.dat', lzma.compress)), 'xz')
+
+    def test_extract_orders_compressed(self):
+        """Test that compressed inputs extract to the same frame as the plain file."""
+        expected = extract_orders(self.orders_file)
+        for file_name, compress in (('orders.csv.gz', gzip.compress), ('orders.csv.bz2', bz2.compress),
+                                    ('orders.csv.xz', lzma.compress), ('orders.csv', gzip.compress)):
+            path = self.write_compressed(file_name, compress)
+            pd.testing.assert_frame_equal(extract_orders(path), expected)
+
+    def test_extract_orders_chunks_compressed(self):
+        """Test that compressed inputs stream in the same chunks as the plain file."""
+        path = self.write_compressed('orders.csv.gz', gzip.compress)
+
+        chunks = list(extract_orders_chunks(path, chunksize=1))
+        expected = list(extract_orders_chunks(self.orders_file, chunksize=1))
+
+        self.assertEqual(len(chunks), 2)
+        for chunk, expected_chunk in zip(chunks, expected):
+            pd.testing.assert_frame_equal(chunk, expected_chunk)
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    def test_extract_orders_compressed_pyarrow_engine(self):
+        """Test that the pyarrow engine reads compressed inputs."""
+        path = self.write_compressed('orders.csv.xz', lzma.compress)
+
+        pd.testing.assert_frame_equal(extract_orders(path, engine='pyarrow'),
+                                      extract_orders(self.orders_file, engine='pyarrow'))
+
+    def write_shards(self):
+        """Write the test orders as two date partitions plus an empty shard."""
+        root = os.path.join(self.temp_dir, 'orders')
+        for day, rows in (('2024-09-09', self.orders_data.head(1)), ('2024-09-10', self.orders_data.tail(1))):
+            os.makedirs(os.path.join(root, day))
+            rows.to_csv(os.path.join(root, day, '00.csv'), index=False)
+        self.orders_data.head(0).to_csv(os.path.join(root, '2024-09-10', '01.csv'), index=False)
+        return root
+
+    def test_extract_orders_partitioned_directory(self):
+        """Test that shards extract in parallel to the same frame as the single file."""
+        root = self.write_shards()
+
+        result = extract_orders(root, max_workers=2)
+
+        pd.testing.assert_frame_equal(result, extract_orders(self.orders_file))
+        pd.testing.assert_frame_equal(extract_orders(os.path.join(root, '*', '*.csv')), result)
+
+    def test_extract_orders_partition_pruning(self):
+        """Test that date partitions outside the range are not read."""
+        root = self.write_shards()
+
+        result = extract_orders(root, start_date='2024-09-10')
+
+        self.assertListEqual(list(result['id']), [12])
+        self.assertTrue(extract_orders(root, end_date='2024-09-01').empty)
+
+    def test_extract_orders_bad_shard_fails(self):
+        """Test that one malformed shard fails the whole extraction."""
+        root = self.write_shards()
+        self.orders_data.drop(columns='total_amount').to_csv(os.path.join(root, '2024-09-10', '02.csv'), index=False)
+
+        self.assertTrue(extract_orders(root).empty)
+        self.assertIsNone(extract_orders_chunks(root, chunksize=1))
+
+    def test_extract_orders_chunks_partitioned_directory(self):
+        """Test that shards stream as one dataset indexed by overall row position."""
+        root = self.write_shards()
+
+        chunks = list(extract_orders_chunks(root, chunksize=1))
+
+        self.assertEqual(len(chunks), 2)
+        pd.testing.assert_frame_equal(pd.concat(chunks), extract_orders(self.orders_file))
+
+    def write_bad_lines(self):
+        """Append a row with too many fields and one good row to the test orders."""
+        with open(self.orders_file, 'a') as f:
+            f.write('13,1,2024-09-09,5.0,extra\n14,2,2024-09-10,6.0\n')
+        return os.path.join(self.temp_dir, 'quarantine')
+
+    def read_quarantine(self, quarantine_dir):
+        """Records from every quarantine file."""
+        records = []
+        for name in sorted(os.listdir(quarantine_dir)):
+            with open(os.path.join(quarantine_dir, name)) as f:
+                records.extend(json.loads(line) for line in f)
+        return records
+
+    def assert_quarantined(self, quarantine_dir):
+        records = self.read_quarantine(quarantine_dir)
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['line'], 4)
+        self.assertEqual(records[0]['raw'], '13,1,2024-09-09,5.0,extra')
+
+    def test_extract_orders_quarantine(self):
+        """Test that a malformed line is quarantined and the rest of the file extracted."""
+        quarantine_dir = self.write_bad_lines()
+        self.assertTrue(extract_orders(self.orders_file).empty)
+
+        result = extract_orders(self.orders_file, quarantine_dir=quarantine_dir)
+
+        self.assertListEqual(list(result['id']), [10, 12, 14])
+        self.assert_quarantined(quarantine_dir)
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    def test_extract_orders_quarantine_pyarrow_engine(self):
+        """Test quarantining with the pyarrow engine, in full and chunked mode."""
+        quarantine_dir = self.write_bad_lines()
+
+        result = extract_orders(self.orders_file, engine='pyarrow', quarantine_dir=quarantine_dir)
+        self.assertListEqual(list(result['id']), [10, 12, 14])
+        self.assert_quarantined(quarantine_dir)
+
+        import shutil
+        shutil.rmtree(quarantine_dir)
+        chunks = list(extract_orders_chunks(self.orders_file, chunksize=1, engine='pyarrow',
+                                            quarantine_dir=quarantine_dir))
+        pd.testing.assert_frame_equal(pd.concat(chunks), result)
+        self.assert_quarantined(quarantine_dir)
+
+    def test_extract_orders_quarantine_without_pyarrow(self):
+        """Test that the C parser quarantines malformed lines when pyarrow is not installed."""
+        quarantine_dir = self.write_bad_lines()
+
+        with mock.patch('etl.extract.pa', None):
+            result = extract_orders(self.orders_file, quarantine_dir=quarantine_dir)
+
+        self.assertListEqual(list(result['id']), [10, 12, 14])
+        self.assert_quarantined(quarantine_dir)
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    def test_extract_orders_quarantine_avoids_warning_capture(self):
+        """Test that C engine quarantine reads use pyarrow rather than the process-wide warning capture."""
+        quarantine_dir = self.write_bad_lines()
+
+        with mock.patch('etl.extract.capture_bad_lines') as capture:
+            result = extract_orders(self.orders_file, quarantine_dir=quarantine_dir)
+
+        capture.assert_not_called()
+        self.assertListEqual(list(result['id']), [10, 12, 14])
+        self.assert_quarantined(quarantine_dir)
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    def test_extract_orders_chunks_quarantine(self):
+        """Test that chunked mode quarantines each line once, even across a type fallback."""
+        quarantine_dir = self.write_bad_lines()
+        with open(self.orders_file, 'a') as f:
+            f.write('15,t,2024-09-10,7.0\n')
+
+        chunks = list(extract_orders_chunks(self.orders_file, chunksize=1, quarantine_dir=quarantine_dir))
+
+        self.assertListEqual([str(row_id) for row_id in pd.concat(chunks)['id']], ['10', '12', '14', '15'])
+        self.assert_quarantined(quarantine_dir)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,79 @@
+import unittest
+import pandas as pd
+import numpy as np
+import tempfile
+import os
+import pickle
+from etl.id_index import IdIndex
+from etl.transform import clean_orders, validate_customer_ids
+
+class TestIdIndex(unittest.TestCase):
+
+    def setUp(self):
+        """Set up customer ids and order customer ids of every kind."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.customer_ids = pd.Series([3, 1, 2, 2, 5])
+        self.order_ids = pd.Series([1, 4, 5.0, 2.5, np.nan, -1, 6, 3], index=range(10, 18))
+
+    def tearDown(self):
+        """Clean up test files."""
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def expected(self):
+        return self.order_ids.isin(self.customer_ids.unique())
+
+    def test_contains_dense(self):
+        """Test lookups through the dense table match isin."""
+        index = IdIndex.from_values(self.customer_ids)
+
+        self.assertIsNotNone(index.table)
+        self.assertListEqual(list(index.ids), [1, 2, 3, 5])
+        pd.testing.assert_series_equal(index.contains(self.order_ids), self.expected())
+
+    def test_contains_sparse(self):
+        """Test lookups through the hash table match isin."""
+        self.customer_ids = pd.Series([1, 2, 3, 5, 10 ** 12])
+        index = IdIndex.from_values(self.customer_ids)
+
+        self.assertIsNone(index.table)
+        pd.testing.assert_series_equal(index.contains(self.order_ids), self.expected())
+        pd.testing.assert_series_equal(index.contains(pd.Series([10 ** 12, 4])), pd.Series([True, False]))
+
+    def test_from_values_skips_invalid_ids(self):
+        """Test that missing and non-integer ids are left out, and an empty index matches nothing."""
+        index = IdIndex.from_values(pd.Series(['1', 't', None, '2.5', '4']))
+        self.assertListEqual(list(index.ids), [1, 4])
+
+        empty = IdIndex.from_values(pd.Series([], dtype='float64'))
+        self.assertEqual(len(empty), 0)
+        self.assertFalse(empty.contains(self.order_ids).any())
+
+    def test_save_load_and_pickle(self):
+        """Test that saved and pickled indexes answer the same."""
+        index = IdIndex.from_values(self.customer_ids)
+        path = os.path.join(self.temp_dir, 'state', 'customer_ids.npy')
+        index.save(path)
+
+        loaded = IdIndex.load(path)
+        pd.testing.assert_series_equal(loaded.contains(self.order_ids), self.expected())
+        copied = pickle.loads(pickle.dumps(loaded))
+        pd.testing.assert_series_equal(copied.contains(self.order_ids), self.expected())
+        self.assertIsNone(IdIndex.load(os.path.join(self.temp_dir, 'missing.npy')))
+
+    def test_clean_orders_with_index(self):
+        """Test that cleaning against an index matches cleaning against the customers frame."""
+        customers = pd.DataFrame({'id': [1, 2]})
+        orders = pd.DataFrame({
+            'id': [10, 11, 12],
+            'customer_id': [1, 9, 't'],
+            'order_date': ['2024-09-09'] * 3,
+            'total_amount': [5.0, 5.0, 5.0]
+        })
+        index = IdIndex.from_values(customers['id'])
+
+        pd.testing.assert_frame_equal(clean_orders(orders, index), clean_orders(orders, customers))
+        pd.testing.assert_frame_equal(validate_customer_ids(orders.iloc[:2], index), orders.iloc[:1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,13 +10,35 @@ from etl.load import (
     test_database_connection,
     validate_dataframe, 
     create_table_if_not_exists,
-    load_to_mysql
+    load_to_mysql,
+    get_engine,
+    get_pooled_engine,
+    dispose_engines,
+    write_bulk_file,
+    bulk_load,
+    batched_load,
+    upsert_load,
+    delete_rows,
+    apply_changes,
+    swap_load,
+    swap_in_staging,
+    build_table_indexes,
+    max_concurrent_loads,
+    TableIdLookup,
+    table_id_lookup
 )
+from etl.transform import clean_orders
+from sqlalchemy import create_engine, inspect
+import io
+import numpy as np
 
 class TestLoad(unittest.TestCase):
     
     def setUp(self):
         """Set up test data."""
+        # Start every test with an empty engine registry
+        dispose_engines()
+        
         self.valid_customers = pd.DataFrame({
             'id': [1, 2],
             'name': ['Alice Borderland', 'Agustin Chan'],
@@ -58,6 +80,7 @@ class TestLoad(unittest.TestCase):
         
         # Clean up temp directory
         shutil.rmtree(self.temp_dir)
+        dispose_engines()
     
     def test_validate_dataframe_customers_valid(self):
         """Test customer dataframe validation with valid data."""
@@ -204,11 +227,372 @@ class TestLoad(unittest.TestCase):
         mock_create_table.assert_called_once()
         mock_to_sql.assert_called_once()
     
+    @patch('etl.load.create_engine')
+    def test_get_pooled_engine_reuses_engine(self, mock_create_engine):
+        """Test that one engine is created per database URL."""
+        mock_create_engine.side_effect = lambda *args, **kwargs: MagicMock()
+        
+        first = get_pooled_engine("sqlite:///a.db")
+        second = get_pooled_engine("sqlite:///a.db")
+        other = get_pooled_engine("sqlite:///b.db")
+        
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        self.assertEqual(mock_create_engine.call_count, 2)
+    
+    @patch('etl.load.os.path.exists')
+    @patch('builtins.open')
+    @patch('json.load')
+    def test_get_db_config_pool_options(self, mock_json_load, mock_open, mock_exists):
+        """Test that MySQL engines get tuned pool settings with config overrides."""
+        mock_exists.return_value = True
+        mock_json_load.return_value = {
+            "user": "test_user",
+            "host": "localhost",
+            "database": "test_db",
+            "pool": {"pool_size": 2}
+        }
+        
+        with patch('etl.load.create_engine') as mock_create_engine:
+            get_db_config()
+            
+            kwargs = mock_create_engine.call_args.kwargs
+            self.assertEqual(kwargs['pool_size'], 2)
+            self.assertTrue(kwargs['pool_pre_ping'])
+            self.assertIn('pool_recycle', kwargs)
+    
+    @patch('etl.load.get_db_config')
+    @patch('etl.load.create_table_if_not_exists')
+    @patch('pandas.DataFrame.to_sql')
+    def test_load_to_mysql_reuses_engine(self, mock_to_sql, mock_create_table, mock_get_config):
+        """Test that loading several tables resolves the engine only once."""
+        mock_engine = MagicMock()
+        mock_get_config.return_value = mock_engine
+        
+        self.assertTrue(load_to_mysql(self.valid_customers, "customers"))
+        self.assertTrue(load_to_mysql(self.valid_orders, "orders"))
+        
+        mock_get_config.assert_called_once()
+        self.assertIs(get_engine(), mock_engine)
+        self.assertEqual(mock_to_sql.call_count, 2)
+    
+    def test_write_bulk_file_escaping(self):
+        """Test LOAD DATA serialization of special characters, dates and nulls."""
+        df = pd.DataFrame({
+            'id': [1, 2],
+            'name': ['tab\there', 'back\\slash\nline'],
+            'join_date': pd.to_datetime(['2024-09-08', None]),
+            'amount': [1.5, np.nan]
+        })
+        buffer = io.StringIO()
+        write_bulk_file(df, buffer)
+        
+        self.assertEqual(buffer.getvalue(),
+                         '1\ttab\\there\t2024-09-08 00:00:00\t1.5\n'
+                         '2\tback\\\\slash\\nline\t\\N\t\\N\n')
+    
+    def test_bulk_load_sqlite_matches_to_sql(self):
+        """Test that the SQLite bulk path stores the same rows as to_sql."""
+        engine = create_engine(f"sqlite:///{os.path.join(self.temp_dir, 'bulk.db')}")
+        orders = self.valid_orders.assign(order_date=pd.to_datetime(self.valid_orders['order_date']))
+        
+        orders.to_sql(name='expected', con=engine, index=False)
+        bulk_load(engine, orders, 'orders', 'replace')
+        bulk_load(engine, orders.head(1), 'orders', 'append')
+        
+        expected = pd.read_sql('SELECT * FROM expected', engine)
+        result = pd.read_sql('SELECT * FROM orders', engine)
+        pd.testing.assert_frame_equal(result.head(2), expected)
+        self.assertEqual(len(result), 3)
+        engine.dispose()
+    
+    @patch('pandas.DataFrame.to_sql')
+    def test_bulk_load_mysql_uses_load_data(self, mock_to_sql):
+        """Test that MySQL bulk loads go through LOAD DATA LOCAL INFILE."""
+        mock_engine = MagicMock()
+        mock_engine.dialect.name = 'mysql'
+        mock_conn = mock_engine.begin.return_value.__enter__.return_value
+        
+        bulk_load(mock_engine, self.valid_orders, 'orders', 'replace')
+        
+        sql = mock_conn.exec_driver_sql.call_args.args[0]
+        self.assertIn("LOAD DATA LOCAL INFILE", sql)
+        self.assertIn("INTO TABLE `orders`", sql)
+        mock_to_sql.assert_called_once()
+    
+    @patch('etl.load.get_db_config')
+    @patch('etl.load.create_table_if_not_exists')
+    @patch('etl.load.bulk_load')
+    def test_load_to_mysql_bulk_strategy(self, mock_bulk_load, mock_create_table, mock_get_config):
+        """Test that the bulk strategy is dispatched to bulk_load."""
+        mock_engine = MagicMock()
+        mock_get_config.return_value = mock_engine
+        
+        result = load_to_mysql(self.valid_orders, "orders", 'append', strategy='bulk')
+        
+        self.assertTrue(result)
+        mock_bulk_load.assert_called_once_with(mock_engine, self.valid_orders, "orders", 'append')
+    
+    def test_batched_load_sqlite(self):
+        """Test batched inserts commit every batch and report throughput."""
+        engine = create_engine(f"sqlite:///{os.path.join(self.temp_dir, 'batched.db')}")
+        orders = pd.concat([self.valid_orders.assign(id=self.valid_orders['id'] + i) for i in (0, 100, 200)],
+                           ignore_index=True)
+        
+        stats = batched_load(engine, orders, 'orders', 'replace', batch_size=4)
+        
+        self.assertListEqual([batch['rows'] for batch in stats], [4, 2])
+        self.assertTrue(all(batch['rows_per_second'] > 0 for batch in stats))
+        result = pd.read_sql('SELECT * FROM orders', engine)
+        self.assertListEqual(list(result['id']), list(orders['id']))
+        engine.dispose()
+    
+    def test_batched_load_invalid_batch_size(self):
+        """Test that a non-positive batch size is rejected."""
+        with self.assertRaises(ValueError):
+            batched_load(MagicMock(), self.valid_orders, 'orders', 'append', batch_size=0)
+    
+    def test_upsert_load_sqlite(self):
+        """Test that upserts insert new rows, update changed ones and keep the rest."""
+        engine = create_engine(f"sqlite:///{os.path.join(self.temp_dir, 'upsert.db')}")
+        self.valid_customers.to_sql(name='customers', con=engine, index=False)
+        
+        delta = pd.DataFrame({
+            'id': [2, 3],
+            'name': ['Agustin Chan', 'John Doe'],
+            'email': ['agustin@gmail.com', 'john@example.com'],
+            'join_date': ['2024-09-07', '2024-09-06']
+        })
+        upsert_load(engine, delta, 'customers', batch_size=1)
+        upsert_load(engine, delta, 'customers')
+        
+        result = pd.read_sql('SELECT * FROM customers ORDER BY id', engine)
+        self.assertListEqual(list(result['id']), [1, 2, 3])
+        self.assertListEqual(list(result['email']), ['alice@gmail.com', 'agustin@gmail.com', 'john@example.com'])
+        
+        # A unique index on id was added so conflicts can be detected
+        indexes = pd.read_sql("SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='customers'", engine)
+        self.assertIn('ux_customers_id', list(indexes['name']))
+        engine.dispose()
+    
+    @patch('etl.load.get_db_config')
+    @patch('etl.load.create_table_if_not_exists')
+    @patch('etl.load.upsert_load')
+    def test_load_to_mysql_upsert_mode(self, mock_upsert_load, mock_create_table, mock_get_config):
+        """Test that upsert mode is dispatched to upsert_load."""
+        mock_engine = MagicMock()
+        mock_get_config.return_value = mock_engine
+        
+        result = load_to_mysql(self.valid_orders, "orders", 'upsert', batch_size=50)
+        
+        self.assertTrue(result)
+        mock_upsert_load.assert_called_once_with(mock_engine, self.valid_orders, "orders", 50)
+    
+    def test_delete_rows_sqlite(self):
+        """Test deleting rows by key in batches."""
+        engine = create_engine(f"sqlite:///{os.path.join(self.temp_dir, 'delete.db')}")
+        self.valid_orders.to_sql(name='orders', con=engine, index=False)
+        
+        delete_rows(engine, 'orders', np.array([10, 99]), batch_size=1)
+        
+        result = pd.read_sql('SELECT id FROM orders', engine)
+        self.assertListEqual(list(result['id']), [12])
+        engine.dispose()
+    
+    @patch('etl.load.delete_rows')
+    @patch('etl.load.load_to_mysql')
+    @patch('etl.load.get_engine')
+    def test_apply_changes(self, mock_get_engine, mock_load_to_mysql, mock_delete_rows):
+        """Test that only changed rows are upserted and removed rows deleted."""
+        mock_load_to_mysql.return_value = True
+        changes = {
+            'inserted': self.valid_orders.head(1),
+            'updated': self.valid_orders.tail(1),
+            'deleted': np.array([7]),
+            'counts': {'inserted': 1, 'updated': 1, 'deleted': 1, 'unchanged': 0}
+        }
+        
+        self.assertTrue(apply_changes(changes, 'orders', batch_size=10))
+        
+        upserted = mock_load_to_mysql.call_args.args[0]
+        self.assertListEqual(list(upserted['id']), [10, 12])
+        self.assertEqual(mock_load_to_mysql.call_args.args[2], 'upsert')
+        mock_delete_rows.assert_called_once()
+    
+    @patch('etl.load.load_to_mysql')
+    def test_apply_changes_nothing_changed(self, mock_load_to_mysql):
+        """Test that an unchanged table is a successful no-op."""
+        changes = {
+            'inserted': self.valid_orders.head(0),
+            'updated': self.valid_orders.head(0),
+            'deleted': np.array([]),
+            'counts': {'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 2}
+        }
+        
+        self.assertTrue(apply_changes(changes, 'orders'))
+        mock_load_to_mysql.assert_not_called()
+    
+    def test_swap_load_sqlite(self):
+        """Test that a swap replaces the table and keeps the previous one as the backup."""
+        engine = create_engine(f"sqlite:///{os.path.join(self.temp_dir, 'swap.db')}")
+        
+        swap_load(engine, self.valid_orders, 'orders')
+        swap_load(engine, self.valid_orders.head(1), 'orders', strategy='bulk')
+        
+        live = pd.read_sql('SELECT id FROM orders', engine)
+        backup = pd.read_sql('SELECT id FROM orders_backup', engine)
+        self.assertListEqual(list(live['id']), [10])
+        self.assertListEqual(list(backup['id']), [10, 12])
+        
+        tables = pd.read_sql("SELECT name FROM sqlite_master WHERE type='table'", engine)
+        self.assertListEqual(sorted(tables['name']), ['orders', 'orders_backup'])
+        
+        # The index built on the staging table moved with it
+        indexes = pd.read_sql("SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='orders'", engine)
+        self.assertEqual(len(indexes), 1)
+        self.assertTrue(indexes['name'][0].startswith('ix_orders_staging_'))
+        engine.dispose()
+    
+    @patch('etl.load.write_dataframe')
+    def test_swap_load_failure_drops_staging(self, mock_write):
+        """Test that a failed staging load leaves the live table alone."""
+        engine = create_engine(f"sqlite:///{os.path.join(self.temp_dir, 'swap_fail.db')}")
+        self.valid_orders.to_sql(name='orders', con=engine, index=False)
+        
+        def write_then_fail(engine, df, table_name, *args):
+            df.to_sql(name=table_name, con=engine, if_exists='append', index=False)
+            raise RuntimeError("connection lost")
+        mock_write.side_effect = write_then_fail
+        
+        with self.assertRaises(RuntimeError):
+            swap_load(engine, self.valid_orders, 'orders')
+        
+        tables = pd.read_sql("SELECT name FROM sqlite_master WHERE type='table'", engine)
+        self.assertListEqual(list(tables['name']), ['orders'])
+        engine.dispose()
+    
+    @patch('etl.load.table_exists', return_value=True)
+    @patch('etl.load.create_indexes')
+    def test_swap_in_staging_mysql_single_rename(self, mock_create_indexes, mock_table_exists):
+        """Test that MySQL swaps both tables in one RENAME TABLE statement."""
+        mock_engine = MagicMock()
+        mock_engine.dialect.name = 'mysql'
+        mock_engine.dialect.identifier_preparer.quote = lambda name: f"`{name}`"
+        conn = mock_engine.begin.return_value.__enter__.return_value
+        
+        swap_in_staging(mock_engine, 'orders', 'orders_staging_1')
+        
+        statements = [call.args[0] for call in conn.exec_driver_sql.call_args_list]
+        self.assertEqual(statements, [
+            "DROP TABLE IF EXISTS `orders_backup`",
+            "RENAME TABLE `orders` TO `orders_backup`, `orders_staging_1` TO `orders`"
+        ])
+        mock_create_indexes.assert_called_once_with(mock_engine, 'orders', 'orders_staging_1')
+    
+    @patch('etl.load.get_db_config')
+    @patch('etl.load.swap_load')
+    def test_load_to_mysql_swap_mode(self, mock_swap_load, mock_get_config):
+        """Test that swap mode is dispatched to swap_load."""
+        mock_engine = MagicMock()
+        mock_get_config.return_value = mock_engine
+        
+        result = load_to_mysql(self.valid_orders, "orders", 'swap', strategy='bulk')
+        
+        self.assertTrue(result)
+        mock_swap_load.assert_called_once_with(mock_engine, self.valid_orders, "orders", 'bulk', 1000)
+    
+    @patch('etl.load.get_db_config')
+    def test_load_to_mysql_typed_replace(self, mock_get_config):
+        """Test that replace recreates a typed, indexed table, also after a swap."""
+        engine = create_engine(f"sqlite:///{os.path.join(self.temp_dir, 'typed.db')}")
+        mock_get_config.return_value = engine
+        orders = self.valid_orders.assign(order_date=pd.to_datetime(self.valid_orders['order_date']))
+        
+        self.assertTrue(load_to_mysql(orders, "orders"))
+        self.assertTrue(load_to_mysql(orders, "orders", 'swap'))
+        self.assertTrue(load_to_mysql(orders, "orders", strategy='bulk'))
+        
+        inspector = inspect(engine)
+        columns = {column['name']: str(column['type']) for column in inspector.get_columns('orders')}
+        self.assertEqual(columns['total_amount'], 'NUMERIC(12, 2)')
+        self.assertEqual(inspector.get_pk_constraint('orders')['constrained_columns'], ['id'])
+        self.assertListEqual([index['name'] for index in inspector.get_indexes('orders')],
+                             ['ix_orders_customer_id'])
+        self.assertEqual(len(pd.read_sql('SELECT * FROM orders', engine)), 2)
+        engine.dispose()
+    
+    @patch('etl.load.get_db_config')
+    def test_load_to_mysql_deferred_indexes(self, mock_get_config):
+        """Test that index building can be deferred until loading finishes."""
+        engine = create_engine(f"sqlite:///{os.path.join(self.temp_dir, 'deferred.db')}")
+        mock_get_config.return_value = engine
+        
+        self.assertTrue(load_to_mysql(self.valid_customers, "customers", build_indexes=False))
+        self.assertEqual(inspect(engine).get_indexes('customers'), [])
+        
+        self.assertTrue(build_table_indexes("customers"))
+        self.assertEqual(inspect(engine).get_indexes('customers')[0]['column_names'], ['email'])
+        engine.dispose()
+    
+    @patch('etl.load.get_db_config')
+    def test_max_concurrent_loads(self, mock_get_config):
+        """Test that SQLite loads are serialized while MySQL keeps the requested cap."""
+        mock_engine = MagicMock()
+        mock_engine.dialect.name = 'mysql'
+        mock_get_config.return_value = mock_engine
+        self.assertEqual(max_concurrent_loads(4), 4)
+        
+        dispose_engines()
+        mock_engine.dialect.name = 'sqlite'
+        self.assertEqual(max_concurrent_loads(4), 1)
+    
+    def test_load_to_mysql_unknown_strategy(self):
+        """Test that an unknown load strategy is rejected."""
+        result = load_to_mysql(self.valid_orders, "orders", strategy='carrier_pigeon')
+        self.assertFalse(result)
+    
     def test_load_to_mysql_invalid_dataframe(self):
         """Test data loading with invalid dataframe."""
         result = load_to_mysql(self.invalid_customers, "customers")
         
         self.assertFalse(result)
 
+    def test_table_id_lookup_sqlite(self):
+        """Test validating ids against a loaded table in batches, querying each id once."""
+        engine = create_engine(f"sqlite:///{os.path.join(self.temp_dir, 'lookup.db')}")
+        pd.DataFrame({'id': [1, 2, 3]}).to_sql(name='customers', con=engine, index=False)
+        lookup = TableIdLookup(engine, 'customers', batch_size=2)
+        
+        values = pd.Series([1, 9, 3.0, np.nan, 2.5, 't'], index=range(5, 11), dtype=object)
+        result = lookup.contains(values)
+        
+        pd.testing.assert_series_equal(result, pd.Series([True, False, True, False, False, False], index=range(5, 11)))
+        self.assertListEqual(list(lookup.checked), [1, 3, 9])
+        with patch.object(lookup, '_query') as query:
+            lookup.contains(pd.Series([3, 9]))
+        query.assert_not_called()
+        engine.dispose()
+    
+    def test_clean_orders_with_table_id_lookup(self):
+        """Test that orders validated against the database match validation against the frame."""
+        engine = create_engine(f"sqlite:///{os.path.join(self.temp_dir, 'lookup.db')}")
+        self.valid_customers.to_sql(name='customers', con=engine, index=False)
+        orders = self.valid_orders.assign(customer_id=[1, 99])
+        
+        expected = clean_orders(orders, self.valid_customers)
+        result = clean_orders(orders, TableIdLookup(engine, 'customers'))
+        
+        pd.testing.assert_frame_equal(result, expected)
+        self.assertListEqual(list(result['id']), [10])
+        engine.dispose()
+    
+    @patch('etl.load.get_engine')
+    def test_table_id_lookup_missing_table(self, mock_get_engine):
+        """Test that there is no lookup against a table that has not been loaded."""
+        mock_get_engine.return_value = create_engine(f"sqlite:///{os.path.join(self.temp_dir, 'empty.db')}")
+        self.assertIsNone(table_id_lookup('customers'))
+        mock_get_engine.return_value = None
+        self.assertIsNone(table_id_lookup('customers'))
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,274 @@
+import unittest
+import tempfile
+import copy
+import os
+from unittest.mock import patch
+from sqlalchemy import create_engine, inspect, text
+from etl.config import DEFAULT_CONFIG
+from etl.load import dispose_engines, load_to_mysql
+from main import run_etl, main, load_table
+
+class TestMain(unittest.TestCase):
+
+    def setUp(self):
+        """Set up input files, a SQLite target database and a config using them."""
+        dispose_engines()
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_paths = {
+            'customers': os.path.join(self.temp_dir, 'customers.csv'),
+            'orders': os.path.join(self.temp_dir, 'orders.csv')
+        }
+        self.write('customers', [(1, 'Alice', 'alice@gmail.com', '2024-09-08'),
+                                 (2, 'Agustin', 'chan@gmail.com', '2024-09-07')])
+        self.write('orders', [(10, 1, '2024-09-09', 12.5), (11, 2, '2024-09-09', 7.0),
+                              (12, 9, '2024-09-09', 3.0)])
+
+        self.config = copy.deepcopy(DEFAULT_CONFIG)
+        self.config['data_paths'] = self.data_paths
+        self.config['change_detection']['state_dir'] = os.path.join(self.temp_dir, 'state')
+        self.config['skip_unchanged']['manifest'] = os.path.join(self.temp_dir, 'state', 'run_manifest.json')
+
+        self.engines = []
+        self.engine = self.database('etl.db')
+        patcher = patch('etl.load.get_db_config', side_effect=lambda: self.engine)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """Dispose of the engines and clean up test files."""
+        dispose_engines()
+        for engine in self.engines:
+            engine.dispose()
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def write(self, table, rows):
+        columns = {
+            'customers': 'id,name,email,join_date',
+            'orders': 'id,customer_id,order_date,total_amount'
+        }[table]
+        with open(self.data_paths[table], 'w') as f:
+            f.write(columns + '\n' + ''.join(','.join(map(str, row)) + '\n' for row in rows))
+
+    def database(self, name):
+        engine = create_engine(f"sqlite:///{os.path.join(self.temp_dir, name)}")
+        self.engines.append(engine)
+        return engine
+
+    def run_etl(self):
+        """Run the pipeline as a fresh process would, with no engine left from an earlier run."""
+        dispose_engines()
+        return run_etl(self.config)
+
+    def table_ids(self, table):
+        if not inspect(self.engine).has_table(table):
+            return None
+        with self.engine.connect() as conn:
+            return [row[0] for row in conn.execute(text(f"SELECT id FROM {table} ORDER BY id"))]
+
+    def preload_orders(self):
+        with self.engine.begin() as conn:
+            conn.execute(text("CREATE TABLE orders (id INTEGER PRIMARY KEY, customer_id INTEGER, "
+                              "order_date DATE, total_amount NUMERIC(12, 2))"))
+            conn.execute(text("INSERT INTO orders VALUES (1, 1, '2024-09-01', 5.0)"))
+
+    def test_run_etl_full(self):
+        """Test that a full run loads the cleaned tables, dropping orphan orders."""
+        self.assertTrue(self.run_etl())
+
+        self.assertListEqual(self.table_ids('customers'), [1, 2])
+        self.assertListEqual(self.table_ids('orders'), [10, 11])
+
+    def test_change_detection_reloads_missing_table(self):
+        """Test that a saved hash index is not trusted for a table missing from the database."""
+        self.config['change_detection']['enabled'] = True
+        self.assertTrue(self.run_etl())
+
+        with self.engine.begin() as conn:
+            conn.execute(text("DROP TABLE orders"))
+        self.write('orders', [(10, 1, '2024-09-09', 12.5), (11, 2, '2024-09-09', 8.0)])
+        self.assertTrue(self.run_etl())
+
+        self.assertListEqual(self.table_ids('orders'), [10, 11])
+        self.assertListEqual(self.table_ids('customers'), [1, 2])
+
+    def test_change_detection_state_per_database(self):
+        """Test that state saved for one database does not turn a load into another into a delta."""
+        self.config['change_detection']['enabled'] = True
+        self.assertTrue(self.run_etl())
+
+        self.engine = self.database('other.db')
+        with self.engine.begin() as conn:
+            conn.execute(text("CREATE TABLE customers (id INTEGER PRIMARY KEY, name TEXT, email TEXT, join_date DATE)"))
+            conn.execute(text("CREATE TABLE orders (id INTEGER PRIMARY KEY, customer_id INTEGER, "
+                              "order_date DATE, total_amount NUMERIC(12, 2))"))
+        self.assertTrue(self.run_etl())
+
+        self.assertListEqual(self.table_ids('customers'), [1, 2])
+        self.assertListEqual(self.table_ids('orders'), [10, 11])
+
+    def test_run_etl_chunked(self):
+        """Test that a chunked run replaces each table with its first chunk, appends the rest and validates orders against the loaded customers."""
+        self.config['extract']['mode'] = 'chunked'
+        self.config['extract']['chunksize'] = 1
+        with self.engine.begin() as conn:
+            conn.execute(text("CREATE TABLE customers (id INTEGER PRIMARY KEY, name TEXT)"))
+            conn.execute(text("INSERT INTO customers VALUES (99, 'Stale')"))
+
+        with patch('main.load_to_mysql', wraps=load_to_mysql) as load:
+            self.assertTrue(self.run_etl())
+
+        modes = [(call.args[1], call.args[2]) for call in load.call_args_list]
+        self.assertListEqual(modes, [('customers', 'replace'), ('customers', 'append'),
+                                     ('orders', 'replace'), ('orders', 'append')])
+        self.assertListEqual(self.table_ids('customers'), [1, 2])
+        self.assertListEqual(self.table_ids('orders'), [10, 11])
+
+    def test_run_etl_chunked_load_failure(self):
+        """Test that a chunk that fails to load aborts the chunked run."""
+        self.config['extract']['mode'] = 'chunked'
+        self.config['extract']['chunksize'] = 1
+
+        with patch('main.load_to_mysql', return_value=False) as load:
+            self.assertFalse(self.run_etl())
+
+        self.assertListEqual([call.args[1] for call in load.call_args_list], ['customers'])
+
+    def test_run_etl_chunked_swap(self):
+        """Test that a chunked swap load swaps the staging table in and keeps the old table as the backup."""
+        self.config['extract']['mode'] = 'chunked'
+        self.config['extract']['chunksize'] = 1
+        self.config['load']['tables'] = {'orders': {'mode': 'swap'}}
+        self.preload_orders()
+
+        self.assertTrue(self.run_etl())
+
+        self.assertListEqual(self.table_ids('orders'), [10, 11])
+        self.assertListEqual(self.table_ids('orders_backup'), [1])
+        self.assertListEqual([name for name in inspect(self.engine).get_table_names() if 'staging' in name], [])
+
+    def test_run_etl_chunked_swap_failure(self):
+        """Test that a chunk failing mid-swap drops the staging table and leaves the live table intact."""
+        self.config['extract']['mode'] = 'chunked'
+        self.config['extract']['chunksize'] = 1
+        self.config['load']['tables'] = {'orders': {'mode': 'swap'}}
+        self.preload_orders()
+
+        def fail_second_order_chunk(df, table_name, mode, **options):
+            if table_name == 'orders' and mode == 'append':
+                return False
+            return load_to_mysql(df, table_name, mode, **options)
+
+        with patch('main.load_to_mysql', side_effect=fail_second_order_chunk):
+            self.assertFalse(self.run_etl())
+
+        self.assertListEqual(self.table_ids('orders'), [1])
+        self.assertIsNone(self.table_ids('orders_backup'))
+        self.assertListEqual([name for name in inspect(self.engine).get_table_names() if 'staging' in name], [])
+
+    def test_run_etl_stops_after_failed_table(self):
+        """Test that a table failing to load fails the run and later tables are not started."""
+        for failure in ({'return_value': False}, {'side_effect': RuntimeError("connection lost")}):
+            with self.subTest(**{key: repr(value) for key, value in failure.items()}):
+                with patch('main.load_table', **failure) as load:
+                    self.assertFalse(self.run_etl())
+
+                self.assertListEqual([call.args[1] for call in load.call_args_list], ['customers'])
+                self.assertIsNone(self.table_ids('orders'))
+
+    def test_main_exit_codes(self):
+        """Test that main exits with 0 after a successful run and 1 after a failed one."""
+        for success, code in ((True, 0), (False, 1)):
+            with self.subTest(success=success):
+                with patch('main.run_etl', return_value=success):
+                    with self.assertRaises(SystemExit) as exit_info:
+                        main()
+                self.assertEqual(exit_info.exception.code, code)
+
+    def test_run_etl_missing_input(self):
+        """Test that a missing customers or orders file fails the run before anything is loaded."""
+        for table in ('customers', 'orders'):
+            with self.subTest(table=table):
+                self.config['data_paths'] = dict(self.data_paths, **{table: os.path.join(self.temp_dir, 'missing.csv')})
+                self.assertFalse(self.run_etl())
+
+                self.assertIsNone(self.table_ids('customers'))
+                self.assertIsNone(self.table_ids('orders'))
+
+    def test_skip_unchanged_run(self):
+        """Test that a run with the same inputs and config as the last successful run does nothing."""
+        self.config['skip_unchanged']['enabled'] = True
+        self.assertTrue(self.run_etl())
+
+        with patch('main.extract_tables') as extract:
+            self.assertTrue(self.run_etl())
+
+        extract.assert_not_called()
+        self.assertListEqual(self.table_ids('orders'), [10, 11])
+
+    def test_skip_unchanged_table(self):
+        """Test that only the tables whose inputs changed are reloaded."""
+        self.config['skip_unchanged']['enabled'] = True
+        self.assertTrue(self.run_etl())
+
+        self.write('orders', [(10, 1, '2024-09-09', 12.5), (13, 2, '2024-09-10', 4.0)])
+        with patch('main.load_table', wraps=load_table) as load:
+            self.assertTrue(self.run_etl())
+
+        self.assertListEqual([call.args[1] for call in load.call_args_list], ['orders'])
+        self.assertListEqual(self.table_ids('orders'), [10, 13])
+
+    def test_skip_unchanged_reloads_missing_table(self):
+        """Test that a table recorded by the last run but missing from the database is reloaded."""
+        self.config['skip_unchanged']['enabled'] = True
+        self.assertTrue(self.run_etl())
+
+        with self.engine.begin() as conn:
+            conn.execute(text("DROP TABLE customers"))
+        with patch('main.load_table', wraps=load_table) as load:
+            self.assertTrue(self.run_etl())
+
+        self.assertListEqual([call.args[1] for call in load.call_args_list], ['customers'])
+        self.assertListEqual(self.table_ids('customers'), [1, 2])
+
+    def test_run_etl_customer_ids_from_database(self):
+        """Test that "database" mode validates orders against the loaded customers without reading the customers input."""
+        self.config['transform']['customer_ids'] = 'database'
+        self.config['data_paths']['customers'] = os.path.join(self.temp_dir, 'missing.csv')
+        with self.engine.begin() as conn:
+            conn.execute(text("CREATE TABLE customers (id INTEGER PRIMARY KEY, name TEXT, email TEXT, join_date DATE)"))
+            conn.execute(text("INSERT INTO customers VALUES (1, 'Alice', 'alice@gmail.com', '2024-09-08'), "
+                              "(9, 'Bob', 'bob@gmail.com', '2024-09-01')"))
+
+        with patch('main.load_table', wraps=load_table) as load:
+            self.assertTrue(self.run_etl())
+
+        self.assertListEqual([call.args[1] for call in load.call_args_list], ['orders'])
+        self.assertListEqual(self.table_ids('orders'), [10, 12])
+        self.assertListEqual(self.table_ids('customers'), [1, 9])
+
+    def test_run_etl_customer_ids_from_index(self):
+        """Test that a full run saves the customer id index and an "index" run validates orders against it."""
+        self.config['transform']['customer_index'] = os.path.join(self.temp_dir, 'state', 'customer_ids.npy')
+        self.assertTrue(self.run_etl())
+        self.assertTrue(os.path.exists(self.config['transform']['customer_index']))
+
+        self.config['transform']['customer_ids'] = 'index'
+        self.config['data_paths']['customers'] = os.path.join(self.temp_dir, 'missing.csv')
+        self.write('orders', [(20, 2, '2024-09-10', 4.0), (21, 9, '2024-09-10', 6.0)])
+        with patch('main.load_table', wraps=load_table) as load:
+            self.assertTrue(self.run_etl())
+
+        self.assertListEqual([call.args[1] for call in load.call_args_list], ['orders'])
+        self.assertListEqual(self.table_ids('orders'), [20])
+
+    def test_run_etl_customer_index_unset(self):
+        """Test that an "index" run fails when no customer index path is configured."""
+        self.config['transform']['customer_ids'] = 'index'
+
+        self.assertFalse(self.run_etl())
+
+        self.assertIsNone(self.table_ids('orders'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import tempfile
+import copy
+import os
+from etl.config import DEFAULT_CONFIG
+from etl.manifest import table_keys, load_manifest, unchanged_tables, record_run
+
+class TestManifest(unittest.TestCase):
+
+    def setUp(self):
+        """Set up input files and a manifest location."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.manifest_path = os.path.join(self.temp_dir, 'state', 'run_manifest.json')
+        self.data_paths = {
+            'customers': os.path.join(self.temp_dir, 'customers.csv'),
+            'orders': os.path.join(self.temp_dir, 'orders.csv')
+        }
+        self.write('customers', 'id,name,email,join_date\n1,Alice,alice@gmail.com,2024-09-08\n')
+        self.write('orders', 'id,customer_id,order_date,total_amount\n10,1,2024-09-09,12.5\n')
+        self.config = copy.deepcopy(DEFAULT_CONFIG)
+        self.config['data_paths'] = self.data_paths
+
+    def tearDown(self):
+        """Clean up test files."""
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def write(self, name, content):
+        with open(self.data_paths[name], 'w') as f:
+            f.write(content)
+
+    def test_unchanged_after_recorded_run(self):
+        """Test that a recorded run makes every table unchanged, even after a touch."""
+        keys = table_keys(self.data_paths, self.config)
+        self.assertEqual(unchanged_tables(load_manifest(self.manifest_path), keys), set())
+
+        record_run(keys, keys, self.manifest_path)
+        os.utime(self.data_paths['orders'])
+
+        keys = table_keys(self.data_paths, self.config)
+        self.assertEqual(unchanged_tables(load_manifest(self.manifest_path), keys), {'customers', 'orders'})
+
+    def test_changed_orders_only_affect_orders(self):
+        """Test that changing orders leaves customers unchanged."""
+        record_run(table_keys(self.data_paths, self.config), ['customers', 'orders'], self.manifest_path)
+        self.write('orders', 'id,customer_id,order_date,total_amount\n10,1,2024-09-09,99.0\n')
+
+        keys = table_keys(self.data_paths, self.config)
+        self.assertEqual(unchanged_tables(load_manifest(self.manifest_path), keys), {'customers'})
+
+    def test_changed_customers_affect_orders(self):
+        """Test that orders depend on the customers file they are validated against."""
+        record_run(table_keys(self.data_paths, self.config), ['customers', 'orders'], self.manifest_path)
+        self.write('customers', 'id,name,email,join_date\n2,Agustin,chan@gmail.com,2024-09-07\n')
+
+        keys = table_keys(self.data_paths, self.config)
+        self.assertEqual(unchanged_tables(load_manifest(self.manifest_path), keys), set())
+
+    def test_config_change(self):
+        """Test that data settings change the keys but cache and logging settings do not."""
+        keys = table_keys(self.data_paths, self.config)
+
+        self.config['cache']['enabled'] = True
+        self.assertEqual(table_keys(self.data_paths, self.config), keys)
+
+        self.config['load']['mode'] = 'upsert'
+        self.assertNotEqual(table_keys(self.data_paths, self.config)['customers'], keys['customers'])
+
+    def test_record_run_keeps_untouched_tables(self):
+        """Test that recording some tables keeps the entries of the others."""
+        keys = table_keys(self.data_paths, self.config)
+        record_run(keys, ['customers', 'orders'], self.manifest_path)
+        record_run({'orders': 'new-key'}, ['orders'], self.manifest_path)
+
+        tables = load_manifest(self.manifest_path)['tables']
+        self.assertEqual(tables['customers']['key'], keys['customers'])
+        self.assertEqual(tables['orders']['key'], 'new-key')
+
+    def test_load_manifest_invalid(self):
+        """Test that an unreadable manifest counts as no previous run."""
+        os.makedirs(os.path.dirname(self.manifest_path))
+        with open(self.manifest_path, 'w') as f:
+            f.write('{not json')
+
+        self.assertEqual(load_manifest(self.manifest_path), {'tables': {}})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import threading
+from etl.pipeline import run_pipeline, PipelineAbort
+
+class TestPipeline(unittest.TestCase):
+    
+    def test_run_pipeline_preserves_order(self):
+        """Test that items pass through every stage in order."""
+        results = []
+        run_pipeline(range(20), [lambda x: x * 2, results.append], max_in_flight=1)
+        self.assertListEqual(results, [x * 2 for x in range(20)])
+    
+    def test_run_pipeline_drops_none(self):
+        """Test that a stage returning None drops the item."""
+        results = []
+        run_pipeline(range(10), [lambda x: x if x % 2 else None, results.append], max_in_flight=2)
+        self.assertListEqual(results, [1, 3, 5, 7, 9])
+    
+    def test_run_pipeline_bounds_in_flight_items(self):
+        """Test that the source cannot run far ahead of a slow stage."""
+        produced = []
+        release = threading.Event()
+        
+        def source():
+            for i in range(100):
+                produced.append(i)
+                yield i
+        
+        def slow(item):
+            release.wait(timeout=5)
+        
+        thread = threading.Thread(target=run_pipeline, args=(source(), [slow], 2))
+        thread.start()
+        thread.join(timeout=0.5)
+        
+        # One item in the stage, two queued, one waiting to be queued
+        self.assertLessEqual(len(produced), 4)
+        release.set()
+        thread.join()
+        self.assertEqual(len(produced), 100)
+    
+    def test_run_pipeline_reraises_stage_error(self):
+        """Test that a failing stage stops the pipeline and re-raises."""
+        def fail(item):
+            if item == 3:
+                raise PipelineAbort("stage failed")
+            return item
+        
+        with self.assertRaises(PipelineAbort):
+            run_pipeline(range(1000), [fail, lambda x: x], max_in_flight=1)
+    
+    def test_run_pipeline_reraises_source_error(self):
+        """Test that an error while reading the source is re-raised."""
+        def source():
+            yield 1
+            raise ValueError("bad chunk")
+        
+        with self.assertRaises(ValueError):
+            run_pipeline(source(), [lambda x: x], max_in_flight=1)
+    
+    def test_run_pipeline_invalid_limit(self):
+        """Test that a non-positive in-flight limit is rejected."""
+        with self.assertRaises(ValueError):
+            run_pipeline([], [lambda x: x], max_in_flight=0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import pandas as pd
+import tempfile
+import os
+import io
+import json
+import warnings
+from etl.quarantine import (
+    bad_line,
+    capture_bad_lines,
+    locate_bad_lines,
+    quarantine_path,
+    write_quarantine,
+    quarantine_dir_for,
+    DEFAULT_QUARANTINE_DIR
+)
+
+class TestQuarantine(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a quarantine directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.quarantine_dir = os.path.join(self.temp_dir, 'quarantine')
+
+    def tearDown(self):
+        """Clean up test files."""
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def test_capture_bad_lines(self):
+        """Test that skipped-line warnings are collected and others passed on."""
+        bad_lines = []
+        with warnings.catch_warnings(record=True) as shown:
+            warnings.simplefilter('always')
+            with capture_bad_lines(bad_lines):
+                warnings.warn('Skipping line 3: expected 4 fields, saw 5\n'
+                              'Skipping line 7: expected 4 fields, saw 6\n', pd.errors.ParserWarning)
+                warnings.warn('something else', UserWarning)
+
+        self.assertListEqual(bad_lines, [bad_line(3, 'expected 4 fields, saw 5'),
+                                         bad_line(7, 'expected 4 fields, saw 6')])
+        self.assertListEqual([str(warning.message) for warning in shown], ['something else'])
+
+    def test_locate_bad_lines(self):
+        """Test filling in raw text by record number and numbers by raw text."""
+        data = b'id,note\n1,"two\nlines"\n2,x,y\n3,z,w\n'
+        bad_lines = [bad_line(3, 'by number'), bad_line(None, 'by text', '3,z,w')]
+
+        locate_bad_lines(io.BytesIO(data), bad_lines)
+
+        self.assertEqual(bad_lines[0]['raw'], '2,x,y')
+        self.assertEqual(bad_lines[1]['line'], 4)
+
+    def test_write_quarantine(self):
+        """Test that bad lines are appended in line order as JSON Lines."""
+        source = os.path.join(self.temp_dir, 'orders.csv')
+        write_quarantine(source, [bad_line(9, 'late', 'b'), bad_line(4, 'early', 'a')], self.quarantine_dir)
+        path = write_quarantine(source, [bad_line(12, 'again', 'c')], self.quarantine_dir)
+
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(path, quarantine_path(source, self.quarantine_dir))
+        self.assertListEqual([record['line'] for record in records], [4, 9, 12])
+        self.assertEqual(records[0]['source'], os.path.abspath(source))
+        self.assertIn('quarantined_at', records[0])
+
+    def test_quarantine_path_per_shard(self):
+        """Test that shards with the same name get different quarantine files."""
+        self.assertNotEqual(quarantine_path('orders/2026-10-16/00.csv'), quarantine_path('orders/2026-10-17/00.csv'))
+
+    def test_quarantine_dir_for(self):
+        """Test the quarantine directory named by each bad_lines mode."""
+        self.assertIsNone(quarantine_dir_for({}))
+        self.assertIsNone(quarantine_dir_for({'bad_lines': 'fail'}))
+        self.assertEqual(quarantine_dir_for({'bad_lines': 'quarantine'}), DEFAULT_QUARANTINE_DIR)
+        self.assertEqual(quarantine_dir_for({'bad_lines': 'quarantine', 'quarantine_dir': 'q'}), 'q')
+        with self.assertRaises(ValueError):
+            quarantine_dir_for({'bad_lines': 'ignore'})
+
+if __name__ == '__main__':
+    unittest.main()
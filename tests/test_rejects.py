@@ -0,0 +1,57 @@
+import unittest
+import pandas as pd
+import tempfile
+import os
+import importlib.util
+from etl.rejects import reject_sink, read_rejects, rejects_table_dir
+from etl.transform import clean_orders
+
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+@unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+class TestRejects(unittest.TestCase):
+
+    def setUp(self):
+        """Set up orders with one orphan and one negative amount per chunk."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.rejects_dir = os.path.join(self.temp_dir, 'rejects')
+        self.customers = pd.DataFrame({'id': [1, 2]})
+        self.chunks = [
+            pd.DataFrame({
+                'id': [start, start + 1, start + 2],
+                'customer_id': [1, 9, 2],
+                'order_date': ['2024-09-09'] * 3,
+                'total_amount': [10.0, 10.0, -1.0]
+            }, index=range(start, start + 3))
+            for start in (0, 3)
+        ]
+
+    def tearDown(self):
+        """Clean up test files."""
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def test_reject_sink_writes_parts(self):
+        """Test that each chunk's rejects become a part that reads back in order."""
+        sink = reject_sink('orders', self.rejects_dir)
+        seen_keys = {}
+        for chunk in self.chunks:
+            clean_orders(chunk, self.customers, seen_keys, reject_sink=sink)
+
+        self.assertEqual(len(os.listdir(rejects_table_dir('orders', self.rejects_dir))), 2)
+        rejects = read_rejects('orders', self.rejects_dir)
+        self.assertListEqual(list(rejects.index), [1, 2, 4, 5])
+        self.assertListEqual(list(rejects['reject_reason']), ['orphan_customer', 'nonpositive_amount'] * 2)
+
+    def test_read_rejects_by_reason(self):
+        """Test reprocessing only the rejects with a given reason."""
+        clean_orders(self.chunks[0], self.customers, reject_sink=reject_sink('orders', self.rejects_dir))
+
+        orphans = read_rejects('orders', self.rejects_dir, reasons=['orphan_customer'])
+        recovered = clean_orders(orphans.drop(columns='reject_reason'), pd.DataFrame({'id': [9]}))
+
+        self.assertListEqual(list(recovered['id']), [1])
+        self.assertTrue(read_rejects('customers', self.rejects_dir).empty)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import tempfile
+import os
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.dialects import mysql
+from sqlalchemy.schema import CreateTable
+from etl.schema import has_schema, table_definition, create_table, create_indexes, index_statements
+
+class TestSchema(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a temporary SQLite database."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.temp_dir, 'schema.db')}")
+
+    def tearDown(self):
+        """Clean up test files."""
+        import shutil
+        self.engine.dispose()
+        shutil.rmtree(self.temp_dir)
+
+    def test_has_schema(self):
+        """Test schema lookup by table and columns."""
+        self.assertTrue(has_schema('orders'))
+        self.assertTrue(has_schema('orders', ['id', 'total_amount']))
+        self.assertFalse(has_schema('orders', ['id', 'discount']))
+        self.assertFalse(has_schema('products'))
+
+    def test_mysql_ddl(self):
+        """Test the typed MySQL DDL."""
+        ddl = str(CreateTable(table_definition('orders')).compile(dialect=mysql.dialect()))
+
+        self.assertIn('id BIGINT NOT NULL', ddl)
+        self.assertIn('order_date DATE', ddl)
+        self.assertIn('total_amount NUMERIC(12, 2)', ddl)
+        self.assertIn('PRIMARY KEY (id)', ddl)
+        self.assertNotIn('FOREIGN KEY', ddl)
+
+    def test_create_table_sqlite(self):
+        """Test creating a typed table under another physical name."""
+        create_table(self.engine, 'customers', 'customers_staging')
+
+        inspector = inspect(self.engine)
+        columns = {column['name']: column for column in inspector.get_columns('customers_staging')}
+        self.assertEqual(str(columns['id']['type']), 'INTEGER')
+        self.assertEqual(str(columns['join_date']['type']), 'DATE')
+        self.assertFalse(columns['email']['nullable'])
+        self.assertEqual(inspector.get_pk_constraint('customers_staging')['constrained_columns'], ['id'])
+
+        # Secondary indexes are built separately
+        self.assertEqual(inspector.get_indexes('customers_staging'), [])
+
+    def test_create_indexes_sqlite(self):
+        """Test building secondary indexes after loading."""
+        create_table(self.engine, 'orders')
+        create_table(self.engine, 'customers')
+        create_indexes(self.engine, 'orders')
+        create_indexes(self.engine, 'customers')
+
+        inspector = inspect(self.engine)
+        orders_index = inspector.get_indexes('orders')[0]
+        customers_index = inspector.get_indexes('customers')[0]
+        self.assertEqual(orders_index['column_names'], ['customer_id'])
+        self.assertFalse(orders_index['unique'])
+        self.assertEqual(customers_index['column_names'], ['email'])
+        self.assertTrue(customers_index['unique'])
+
+    def test_index_statements_unknown_table(self):
+        """Test that tables without a schema get no indexes."""
+        self.assertEqual(index_statements(self.engine, 'products'), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import tempfile
+import os
+from datetime import date
+from etl.sources import resolve_sources, partition_date, is_multi_source
+
+class TestSources(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a directory of date-partitioned shards."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.root = os.path.join(self.temp_dir, 'orders')
+        for partition, name in (('2026-10-16', '00.csv'), ('2026-10-16', '01.csv.gz'),
+                                ('date=2026-10-17', '00.csv'), ('2026-10-18', '00.csv'),
+                                ('2026-10-18', 'README.txt'), ('misc', 'extra.csv')):
+            os.makedirs(os.path.join(self.root, partition), exist_ok=True)
+            with open(os.path.join(self.root, partition, name), 'w') as f:
+                f.write('id\n1\n')
+
+    def tearDown(self):
+        """Clean up test files."""
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def relative(self, files):
+        return [os.path.relpath(file_path, self.root) for file_path in files]
+
+    def test_resolve_single_file(self):
+        """Test that a single path is returned as given, even if missing."""
+        self.assertFalse(is_multi_source('data/orders.csv'))
+        self.assertListEqual(resolve_sources('missing.csv'), ['missing.csv'])
+
+    def test_resolve_directory(self):
+        """Test that directories yield data files in date order, then path order."""
+        self.assertListEqual(self.relative(resolve_sources(self.root)), [
+            os.path.join('misc', 'extra.csv'),
+            os.path.join('2026-10-16', '00.csv'),
+            os.path.join('2026-10-16', '01.csv.gz'),
+            os.path.join('date=2026-10-17', '00.csv'),
+            os.path.join('2026-10-18', '00.csv'),
+        ])
+
+    def test_resolve_glob(self):
+        """Test glob patterns, including recursive ones."""
+        files = resolve_sources(os.path.join(self.root, '2026-*', '*.csv'))
+        self.assertListEqual(self.relative(files), [os.path.join('2026-10-16', '00.csv'),
+                                                    os.path.join('2026-10-18', '00.csv')])
+        self.assertEqual(len(resolve_sources(os.path.join(self.root, '**', '*.csv'))), 4)
+        self.assertListEqual(resolve_sources(os.path.join(self.root, 'none-*')), [])
+
+    def test_prune_by_date(self):
+        """Test that date pruning is inclusive and keeps undated shards."""
+        files = self.relative(resolve_sources(self.root, start_date='2026-10-17', end_date=date(2026, 10, 17)))
+        self.assertListEqual(files, [os.path.join('misc', 'extra.csv'),
+                                     os.path.join('date=2026-10-17', '00.csv')])
+
+        files = self.relative(resolve_sources(self.root, start_date='2026-10-18'))
+        self.assertListEqual(files, [os.path.join('misc', 'extra.csv'), os.path.join('2026-10-18', '00.csv')])
+
+    def test_partition_date(self):
+        """Test reading dates from plain and key=value partition directories."""
+        self.assertEqual(partition_date('orders/2026-10-17/00.csv'), date(2026, 10, 17))
+        self.assertEqual(partition_date('orders/dt=2026-10-17/hour=03/00.csv'), date(2026, 10, 17))
+        self.assertIsNone(partition_date('orders/2026-13-45/00.csv'))
+        self.assertIsNone(partition_date('orders.csv'))
+
+if __name__ == '__main__':
+    unittest.main()
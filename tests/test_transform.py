@@ -2,7 +2,7 @@ import unittest
 import pandas as pd
 import tempfile
 import os
-from etl.transform import clean_customers, clean_orders, validate_email, validate_customer_ids, validate_order_data
+from etl.transform import clean_customers, clean_orders, validate_email, validate_customer_ids, validate_order_data, drop_duplicate_keys, validate_emails, infer_date_format, partition_positions, REJECT_REASONS
 
 class TestTransform(unittest.TestCase):
     
@@ -53,6 +53,19 @@ class TestTransform(unittest.TestCase):
         self.assertFalse(validate_email('test@.com'))  # No domain
         self.assertFalse(validate_email('@example.com'))  # No username
     
+    def test_validate_emails_matches_validate_email(self):
+        """Test that the vectorized validator agrees with validate_email."""
+        emails = ['test@example.com', 'user.name@domain.org', 'user+tag@domain.net',
+                  'test@example', 'invalid-email', 'test@.com', '@example.com',
+                  'user@example.c', 'user@example.com\n', 'user@example.com\n\n', 'us er@example.com']
+        expected = [validate_email(email) for email in emails]
+        
+        for series in (pd.Series(emails), pd.Series(emails, dtype=object)):
+            self.assertListEqual(validate_emails(series).tolist(), expected)
+        
+        # Missing values are invalid rather than an error
+        self.assertListEqual(validate_emails(pd.Series(['a@b.com', None])).tolist(), [True, False])
+    
     def test_clean_customers_valid_data(self):
         """Test customer cleaning with valid data."""
         result = clean_customers(self.valid_customers)
@@ -144,5 +157,189 @@ class TestTransform(unittest.TestCase):
         result = clean_orders(empty_df)
         self.assertTrue(result.empty)
 
+    def test_drop_duplicate_keys_across_chunks(self):
+        """Test that seen keys deduplicate across separate chunks."""
+        seen_keys = {}
+        first = drop_duplicate_keys(pd.DataFrame({'id': [1, 2, 2]}), 'id', seen_keys)
+        second = drop_duplicate_keys(pd.DataFrame({'id': [2, 3]}), 'id', seen_keys)
+        
+        self.assertListEqual(list(first['id']), [1, 2])
+        self.assertListEqual(list(second['id']), [3])
+        self.assertSetEqual(seen_keys['id'], {1, 2, 3})
+    
+    def test_clean_orders_chunked_matches_full(self):
+        """Test that cleaning orders chunk by chunk matches a single pass."""
+        orders = pd.concat([self.valid_orders, self.valid_orders.assign(total_amount=1.0)], ignore_index=True)
+        expected = clean_orders(orders, self.valid_customers)
+        
+        seen_keys = {}
+        chunks = [clean_orders(orders.iloc[i:i + 2], self.valid_customers, seen_keys) for i in range(0, len(orders), 2)]
+        result = pd.concat(chunks)
+        
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_clean_orders_duplicate_after_invalid_first(self):
+        """Test that a duplicate id is dropped even when its first occurrence is invalid."""
+        orders = pd.DataFrame({
+            'id': [10, 10, 11],
+            'customer_id': [1, 1, 2],
+            'order_date': ['2024-09-09', '2024-09-09', '2024-09-09'],
+            'total_amount': [-5.00, 50.00, 20.00]
+        })
+        result = clean_orders(orders)
+        
+        # The first id 10 wins deduplication and then fails the amount rule
+        self.assertListEqual(list(result['id']), [11])
+    
+    def test_clean_orders_fractional_ids(self):
+        """Test that ids are deduplicated and validated as the integers they are loaded as."""
+        orders = pd.DataFrame({
+            'id': [10, 10.5, 11.9],
+            'customer_id': [1, 1, 2.5],
+            'order_date': ['2024-09-09', '2024-09-09', '2024-09-09'],
+            'total_amount': [50.00, 60.00, 20.00]
+        })
+        result = clean_orders(orders, self.valid_customers)
+        
+        self.assertListEqual(list(result['id']), [10, 11])
+        self.assertListEqual(list(result['customer_id']), [1, 2])
+        self.assertListEqual(list(result['total_amount']), [50.00, 20.00])
+    
+    def test_clean_orders_does_not_modify_input(self):
+        """Test that cleaning orders leaves the input dataframe untouched."""
+        original = self.invalid_orders.copy()
+        clean_orders(self.invalid_orders, self.valid_customers)
+        pd.testing.assert_frame_equal(self.invalid_orders, original)
+    
+    def test_clean_orders_result_types(self):
+        """Test that cleaned orders carry coerced column types and original index."""
+        result = clean_orders(self.invalid_orders, self.valid_customers)
+        
+        self.assertListEqual(list(result.index), [0, 2])
+        self.assertTrue(pd.api.types.is_integer_dtype(result['id']))
+        self.assertTrue(pd.api.types.is_integer_dtype(result['customer_id']))
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(result['order_date']))
+        self.assertTrue(pd.api.types.is_float_dtype(result['total_amount']))
+
+    def test_clean_customers_does_not_modify_input(self):
+        """Test that cleaning customers leaves the input dataframe untouched."""
+        original = self.invalid_customers.copy()
+        clean_customers(self.invalid_customers)
+        pd.testing.assert_frame_equal(self.invalid_customers, original)
+    
+    def test_clean_customers_fractional_ids(self):
+        """Test that customer ids are deduplicated as the integers they are loaded as."""
+        customers = self.valid_customers.assign(id=[1, 1.5, 3])
+        
+        result = clean_customers(customers)
+        
+        self.assertListEqual(list(result['id']), [1, 3])
+        self.assertListEqual(list(result['name']), ['Alice Borderland', 'John Doe'])
+    
+    def test_clean_customers_parallel_matches_serial(self):
+        """Test that the partitioned transform reproduces the serial output exactly."""
+        customers = pd.DataFrame({
+            'id': ['1', '2', '2', 'x', '3', '4', None, '5'],
+            'name': ['Al', ' Bo ', 'Cy', 'Di', '  ', 'Ed', 'Fi', 'Gu'],
+            'email': ['a@b.com', 'B@C.COM ', 'c@d.com', 'd@e.com', 'e@f.com', 'a@b.com', 'g@h.com', 'bad'],
+            'join_date': ['2024-09-08', '2024-09-07', 'garbage', '2024-09-05', '2024-09-04', '2024-09-03', None, '2024-09-01']
+        })
+        expected = clean_customers(customers)
+        
+        for workers in (2, 3):
+            result = clean_customers(customers, workers=workers, executor='thread')
+            pd.testing.assert_frame_equal(result, expected)
+        self.assertListEqual(list(expected['id']), [1, 2])
+    
+    def test_clean_orders_parallel_matches_serial(self):
+        """Test that partitioned order cleaning reproduces the serial output exactly."""
+        orders = pd.concat([self.invalid_orders, self.valid_orders, self.valid_orders.assign(total_amount=1.0)],
+                           ignore_index=True)
+        expected = clean_orders(orders, self.valid_customers)
+        
+        result = clean_orders(orders, self.valid_customers, workers=2)
+        
+        pd.testing.assert_frame_equal(result, expected)
+    
+    def test_infer_date_format(self):
+        """Test that the date format is guessed once for the whole column."""
+        self.assertEqual(infer_date_format(pd.Series([None, '2024-09-08', '09/07/2024'])), '%Y-%m-%d')
+        self.assertEqual(infer_date_format(pd.Series(['garbage', '2024-09-08'])), 'mixed')
+        self.assertIsNone(infer_date_format(pd.Series([None, None])))
+    
+    def test_partition_positions(self):
+        """Test that equal keys share a partition and every row is assigned once."""
+        keys = pd.Series([5, 1, 5, 2, 3, 1, 5])
+        positions = partition_positions(keys, 3)
+        
+        self.assertListEqual(sorted(pos for part in positions for pos in part), list(range(len(keys))))
+        for part in positions:
+            for key in keys.iloc[part].unique():
+                self.assertTrue(set(keys.index[keys == key]) <= set(part))
+
+    def test_clean_orders_pretyped_matches_text(self):
+        """Test that columns typed at read time clean the same as raw text."""
+        typed = self.valid_orders.assign(
+            customer_id=self.valid_orders['customer_id'].astype('float64'),
+            order_date=pd.to_datetime(self.valid_orders['order_date'], format='%Y-%m-%d'))
+        
+        pd.testing.assert_frame_equal(clean_orders(typed, self.valid_customers),
+                                      clean_orders(self.valid_orders, self.valid_customers))
+
+    def test_clean_customers_reject_sink(self):
+        """Test that every dropped customer reaches the sink with its first failed rule."""
+        customers = pd.DataFrame({
+            'id': [1, 2, 3, 4, 5, 'x', 6],
+            'name': ['A', 'B', ' ', 'D', 'E', 'F', 'G'],
+            'email': ['a@ex.com', 'a@ex.com', 'c@ex.com', 'bad', 'e@ex.com', 'f@ex.com', None],
+            'join_date': ['2024-09-08', '2024-09-07', '2024-09-06', '2024-09-05', 'never', '2024-09-04', '2024-09-03']
+        })
+        rejects = []
+
+        result = clean_customers(customers, reject_sink=rejects.append)
+
+        self.assertEqual(len(rejects), 1)
+        pd.testing.assert_frame_equal(result, clean_customers(customers))
+        self.assertListEqual(list(rejects[0].index), [1, 2, 3, 4, 5, 6])
+        self.assertListEqual(list(rejects[0]['reject_reason']), ['duplicate_email', 'bad_name', 'bad_email',
+                                                                 'bad_date', 'bad_id', 'missing_field'])
+        self.assertListEqual(list(rejects[0]['reject_reason'].cat.categories), list(REJECT_REASONS))
+        # Rejected rows keep their values as read
+        self.assertEqual(rejects[0].loc[5, 'id'], 'x')
+
+    def test_clean_orders_reject_sink(self):
+        """Test order reject reasons, including orphans and business rules."""
+        orders = pd.concat([self.invalid_orders, pd.DataFrame({
+            'id': [10, 15, 16],
+            'customer_id': [1, 2, 2],
+            'order_date': ['2024-09-09', '2001-01-01', 'soon'],
+            'total_amount': [5.0, 5.0, 5.0]
+        })], ignore_index=True)
+        rejects = []
+
+        result = clean_orders(orders, self.valid_customers, reject_sink=rejects.append)
+
+        self.assertListEqual(list(result['id']), [10, 13])
+        reasons = rejects[0]['reject_reason']
+        self.assertDictEqual(dict(zip(rejects[0].index, reasons)), {
+            1: 'orphan_customer', 3: 'bad_customer_id', 4: 'duplicate_id', 5: 'stale_date', 6: 'bad_date'
+        })
+        self.assertEqual(len(result) + len(rejects[0]), len(orders))
+
+    def test_clean_reject_sink_not_called_without_rejects(self):
+        """Test that a clean input sends nothing to the sink."""
+        rejects = []
+        clean_customers(self.valid_customers, reject_sink=rejects.append)
+        clean_orders(self.valid_orders, self.valid_customers, reject_sink=rejects.append)
+        self.assertListEqual(rejects, [])
+
+    def test_clean_orders_parallel_reject_sink(self):
+        """Test that the parallel path rejects the same rows for the same reasons."""
+        serial, parallel = [], []
+        clean_orders(self.invalid_orders, self.valid_customers, reject_sink=serial.append)
+        clean_orders(self.invalid_orders, self.valid_customers, workers=2, executor='thread',
+                     reject_sink=parallel.append)
+        pd.testing.assert_frame_equal(parallel[0], serial[0])
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file